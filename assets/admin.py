@@ -1,6 +1,7 @@
 from django.contrib import admin
-from .models import Truck, Trailer
+from .models import Truck, Trailer, ImportJob
 
 # Register your models here.
 admin.site.register(Trailer)
 admin.site.register(Truck)
+admin.site.register(ImportJob)
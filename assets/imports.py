@@ -0,0 +1,90 @@
+import logging
+from itertools import islice
+
+from django.utils import timezone
+
+from utils.helpers import read_csv
+from .models import Truck, Trailer, ImportJob, IMPORT_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+ASSET_MODELS = {"truck": Truck, "trailer": Trailer}
+
+
+def read_asset_rows(csv_file, owned_by):
+    """
+    Yield `(line_number, kwargs)` for every line of an assets csv file, in the
+    form expected by `AssetManager.import_assets`. Lines numbers start at 1
+    after the header line.
+    """
+
+    for index, details in enumerate(read_csv(csv_file)):
+        if not len(details) == 4:
+            # no registration number, the row is skipped as invalid
+            yield index + 1, {}
+            continue
+        yield index + 1, {
+            "name": details[0],
+            "reg_no": details[1],
+            "type": details[2],
+            "haulage": details[3],
+            "owned_by": owned_by,
+        }
+
+
+def process_import_job(job):
+    """
+    Import the csv file of a claimed job batch by batch, saving the progress
+    after each batch. Every batch is committed on its own, so a job that is
+    picked up again after its worker died resumes after the last saved line.
+    """
+
+    model = ASSET_MODELS[job.asset_type]
+    build = getattr(model.objects, f"build_{job.asset_type}")
+
+    try:
+        with job.csv_file.open("rb") as csv_file:
+            rows = (
+                row
+                for row in read_asset_rows(csv_file, job.owned_by)
+                if row[0] > job.rows_processed
+            )
+            while True:
+                batch = list(islice(rows, IMPORT_BATCH_SIZE))
+                if not batch:
+                    break
+
+                created, skipped = model.objects.import_assets(batch, build)
+
+                job.rows_processed = batch[-1][0]
+                job.created_count += len(created)
+                job.skipped += skipped
+                job.save(
+                    update_fields=[
+                        "rows_processed",
+                        "created_count",
+                        "skipped",
+                        "updated_at",
+                    ]
+                )
+    except Exception as exc:
+        logger.exception("Import job %s failed", job.pk)
+        job.status = ImportJob.FAILED
+        job.error = str(exc)
+    else:
+        job.status = ImportJob.COMPLETED
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+
+
+def run_import_jobs():
+    """
+    Claim and process import jobs until there are none left.
+    """
+
+    while True:
+        job = ImportJob.objects.claim_next()
+        if job is None:
+            return
+        process_import_job(job)
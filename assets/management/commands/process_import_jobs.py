@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from assets.imports import run_import_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Process pending csv import jobs, and running jobs whose worker stopped "
+        "making progress. Useful after a restart or from a separate worker."
+    )
+
+    def handle(self, *args, **options):
+        run_import_jobs()
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.7 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assets", "0003_importjob"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="trailer",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="assets_trai_created_9c1766_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="truck",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="assets_truc_created_c6c76f_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.7 on 2026-10-18 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assets", "0004_auto_20261018_1515"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="truck",
+            index=models.Index(
+                fields=["type", "owned_by"], name="assets_truc_type_2a9044_idx"
+            ),
+        ),
+    ]
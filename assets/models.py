@@ -1,21 +1,31 @@
-from django.db import models
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import models, transaction, IntegrityError
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import Q
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
 from utils.models import AbstractBaseModel, ActiveObjectsQuerySet
 from utils.helpers import enforce_all_required_arguments_are_truthy
 from utils.validators import validate_file_extension
 
+# number of rows inserted per query when importing assets from a csv file
+IMPORT_BATCH_SIZE = 500
+
 
 class AssetManager(models.Manager):
     """
     manager to handele asset methods
     """
 
-    def create_truck(
+    def build_truck(
         self, name=None, owned_by=None, type=None, reg_no=None, haulage=None
     ):
         """
-        method that creates and return truck
+        method that validates and returns an unsaved truck
         """
         REQUIRED_ARGS = ("name", "owned_by", "reg_no", "type", "haulage")
         enforce_all_required_arguments_are_truthy(
@@ -28,17 +38,23 @@ class AssetManager(models.Manager):
             },
             REQUIRED_ARGS,
         )
-        truck = self.model(
+        return self.model(
             name=name, type=type, owned_by=owned_by, reg_no=reg_no, haulage=haulage
         )
+
+    def create_truck(self, **kwargs):
+        """
+        method that creates and return truck
+        """
+        truck = self.build_truck(**kwargs)
         truck.save()
         return truck
 
-    def create_trailer(
+    def build_trailer(
         self, name=None, owned_by=None, type=None, reg_no=None, haulage=None
     ):
         """
-        method that creates and returns trailer
+        method that validates and returns an unsaved trailer
         """
         REQUIRED_ARGS = ("name", "owned_by", "reg_no", "type")
         enforce_all_required_arguments_are_truthy(
@@ -51,12 +67,86 @@ class AssetManager(models.Manager):
             },
             REQUIRED_ARGS,
         )
-        trailer = self.model(
+        return self.model(
             name=name, type=type, owned_by=owned_by, reg_no=reg_no, haulage=haulage
         )
+
+    def create_trailer(self, **kwargs):
+        """
+        method that creates and returns trailer
+        """
+        trailer = self.build_trailer(**kwargs)
         trailer.save()
         return trailer
 
+    def import_assets(self, rows, build, batch_size=IMPORT_BATCH_SIZE):
+        """
+        Create assets from `rows`, an iterable of `(line_number, kwargs)`, where
+        `build` is `build_truck` or `build_trailer`.
+
+        Rows are validated in memory and inserted in batches with
+        `bulk_create`. Rows that fail validation or whose registration number
+        is already taken, in the database or earlier in the rows, are skipped.
+        Returns the created assets and the line numbers of the skipped rows.
+        """
+        created = []
+        skipped = []
+        seen = set()
+        batch = []
+
+        with transaction.atomic():
+            for line, kwargs in rows:
+                batch.append((line, kwargs))
+                if len(batch) >= batch_size:
+                    self._import_batch(batch, build, seen, created, skipped)
+                    batch = []
+
+            if batch:
+                self._import_batch(batch, build, seen, created, skipped)
+
+        return created, skipped
+
+    def _import_batch(self, batch, build, seen, created, skipped):
+        reg_nos = [kwargs.get("reg_no") for _, kwargs in batch]
+        existing = set(
+            self.filter(
+                reg_no__in=[reg_no for reg_no in reg_nos if reg_no]
+            ).values_list("reg_no", flat=True)
+        )
+
+        assets = []
+        lines = []
+        for line, kwargs in batch:
+            reg_no = kwargs.get("reg_no")
+            if reg_no in existing or reg_no in seen:
+                skipped.append(line)
+                continue
+            try:
+                asset = build(**kwargs)
+            except ValidationError:
+                skipped.append(line)
+                continue
+            seen.add(reg_no)
+            assets.append(asset)
+            lines.append(line)
+
+        if not assets:
+            return
+
+        try:
+            with transaction.atomic():
+                created.extend(self.bulk_create(assets))
+        except IntegrityError:
+            # a registration number was taken after it was checked above, fall
+            # back to saving the batch row by row
+            for line, asset in zip(lines, assets):
+                try:
+                    with transaction.atomic():
+                        asset.save()
+                    created.append(asset)
+                except IntegrityError:
+                    skipped.append(line)
+
 
 class Asset(models.Model):
     """
@@ -100,6 +190,14 @@ class Truck(AbstractBaseModel, Asset, models.Model):
     objects = AssetManager()
     active_objects = AssetQuerySet.as_manager()
 
+    class Meta:
+        indexes = [
+            # backs the cursor pagination of list endpoints
+            models.Index(fields=["-created_at", "-id"]),
+            # backs the candidate selection of order matching
+            models.Index(fields=["type", "owned_by"]),
+        ]
+
     def __str__(self):
         return self.reg_no
 
@@ -122,5 +220,133 @@ class Trailer(AbstractBaseModel, Asset):
     objects = AssetManager()
     active_objects = AssetQuerySet.as_manager()
 
+    class Meta:
+        # backs the cursor pagination of list endpoints
+        indexes = [models.Index(fields=["-created_at", "-id"])]
+
     def __str__(self):
         return self.reg_no
+
+
+class ImportJobManager(models.Manager):
+    """
+    manager to handle csv import jobs
+    """
+
+    def create_import_job(
+        self, asset_type=None, csv_file=None, owned_by=None, created_by=None
+    ):
+        """
+        method that stores the uploaded file and creates a pending import job
+        """
+        REQUIRED_ARGS = ("asset_type", "csv_file", "owned_by")
+        enforce_all_required_arguments_are_truthy(
+            {
+                "asset_type": asset_type,
+                "csv_file": csv_file,
+                "owned_by": owned_by,
+                "created_by": created_by,
+            },
+            REQUIRED_ARGS,
+        )
+        job = self.model(
+            asset_type=asset_type,
+            csv_file=csv_file,
+            owned_by=owned_by,
+            created_by=created_by,
+        )
+        job.save()
+        return job
+
+    def claim_next(self):
+        """
+        Lock the oldest pending job, mark it as running and return it, or None
+        if there is nothing to do. Running jobs that have not made progress for
+        IMPORT_JOB_STALE_AFTER seconds (eg their worker died) are claimed
+        again. Jobs locked by another worker are skipped, so several workers
+        can poll the same table.
+        """
+        stale_before = timezone.now() - timedelta(
+            seconds=settings.IMPORT_JOB_STALE_AFTER
+        )
+
+        with transaction.atomic():
+            job = (
+                self.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=ImportJob.PENDING)
+                    | Q(status=ImportJob.RUNNING, updated_at__lt=stale_before),
+                    is_deleted=False,
+                )
+                .order_by("created_at")
+                .first()
+            )
+            if job is None:
+                return None
+
+            job.status = ImportJob.RUNNING
+            if job.started_at is None:
+                job.started_at = timezone.now()
+            job.save(update_fields=["status", "started_at", "updated_at"])
+
+        return job
+
+
+class ImportJobQuerySet(ActiveObjectsQuerySet):
+    """ Filter import jobs by the company they import assets for"""
+
+    def get_company_jobs(self, owned_by=None):
+        return self._active().filter(owned_by=owned_by)
+
+
+class ImportJob(AbstractBaseModel):
+    """
+    model to track csv imports of trucks/trailers processed in the background
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    asset_type = models.CharField(
+        max_length=20, choices=[("truck", "truck"), ("trailer", "trailer")]
+    )
+    csv_file = models.FileField(upload_to="imports/")
+    owned_by = models.ForeignKey(
+        "companies.TransporterCompany",
+        on_delete=models.CASCADE,
+        related_name="import_jobs",
+    )
+    created_by = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="import_jobs",
+    )
+    status = models.CharField(
+        max_length=20,
+        default=PENDING,
+        choices=[
+            (PENDING, PENDING),
+            (RUNNING, RUNNING),
+            (COMPLETED, COMPLETED),
+            (FAILED, FAILED),
+        ],
+    )
+    rows_processed = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    skipped = ArrayField(models.PositiveIntegerField(), default=list, blank=True)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ImportJobManager()
+    active_objects = ImportJobQuerySet.as_manager()
+
+    @property
+    def skipped_count(self):
+        return len(self.skipped)
+
+    def __str__(self):
+        return f"{self.asset_type} import {self.pk} ({self.status})"
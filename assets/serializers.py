@@ -1,35 +1,121 @@
 from rest_framework import serializers
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Truck, Trailer
-from companies.models import TransporterCompany
+from .models import Truck, Trailer, ImportJob
+from .imports import read_asset_rows, run_import_jobs
 from utils.validators import validate_passed_file_extension
-from utils.helpers import read_csv
+from utils.tenancy import get_tenant
+from utils.workers import submit_on_commit
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
-from companies.serializers import TransporterSerializer
+from companies.serializers import TransporterSerializer, TransporterSummarySerializer
 
 
-class TruckSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Truck
-        fields = "__all__"
-
+class AssetSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         response = super().to_representation(instance)
-        response["owned_by"] = TransporterSerializer(instance.owned_by).data
+        response["owned_by"] = self.represent_owner(instance)
         return response
 
+    def represent_owner(self, instance):
+        return TransporterSerializer(instance.owned_by).data
+
 
-class TrailerSerializer(serializers.ModelSerializer):
+class TruckSerializer(AssetSerializer):
+    class Meta:
+        model = Truck
+        fields = "__all__"
+
+
+class TrailerSerializer(AssetSerializer):
     class Meta:
         model = Trailer
         fields = "__all__"
 
-    def to_representation(self, instance):
-        response = super().to_representation(instance)
-        response["owned_by"] = TransporterSerializer(instance.owned_by).data
-        return response
+
+class TruckExportSerializer(serializers.ModelSerializer):
+    """flat truck representation used by exports"""
+
+    class Meta:
+        model = Truck
+        fields = [
+            "id",
+            "name",
+            "reg_no",
+            "type",
+            "haulage",
+            "tracking",
+            "owned_by",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+
+class TrailerExportSerializer(serializers.ModelSerializer):
+    """flat trailer representation used by exports"""
+
+    class Meta:
+        model = Trailer
+        fields = TruckExportSerializer.Meta.fields
+        read_only_fields = fields
+
+
+class OwnerSummaryListSerializer(serializers.ListSerializer):
+    """
+    Serializes a list of assets, computing the summary of each distinct owner
+    only once however many of the assets it owns.
+    """
+
+    def to_representation(self, data):
+        self.owner_summaries = {}
+        return super().to_representation(data)
+
+
+class AssetListSerializerMixin:
+    """
+    Represent `owned_by` with the compact owner summary, shared between all
+    the assets of an owner in the list. Querysets should select_related
+    `owned_by__company__company_director`.
+    """
+
+    def represent_owner(self, instance):
+        summaries = getattr(self.parent, "owner_summaries", None)
+        if summaries is None:
+            return TransporterSummarySerializer(instance.owned_by).data
+
+        if instance.owned_by_id not in summaries:
+            summaries[instance.owned_by_id] = TransporterSummarySerializer(
+                instance.owned_by
+            ).data
+        return summaries[instance.owned_by_id]
+
+
+class TruckListSerializer(AssetListSerializerMixin, TruckSerializer):
+    class Meta(TruckSerializer.Meta):
+        list_serializer_class = OwnerSummaryListSerializer
+
+
+class TrailerListSerializer(AssetListSerializerMixin, TrailerSerializer):
+    class Meta(TrailerSerializer.Meta):
+        list_serializer_class = OwnerSummaryListSerializer
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportJob
+        fields = (
+            "id",
+            "asset_type",
+            "status",
+            "rows_processed",
+            "created_count",
+            "skipped_count",
+            "skipped",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        )
+        read_only_fields = fields
 
 
 class BaseAssetsCsvSerializer(serializers.Serializer):
@@ -38,49 +124,49 @@ class BaseAssetsCsvSerializer(serializers.Serializer):
         validators=[validate_passed_file_extension("csv")], write_only=True
     )
 
-    def save(self, **kwargs):
-        user = self.context["request"].user
-        transporter_company = TransporterCompany.active_objects.get(
-            company_director=user.pk
-        )
+    def save(self, run_async=False, **kwargs):
+        request = self.context["request"]
+        transporter_company = get_tenant(request).transporter
         csv_file = self.validated_data.get("csv_file")
-        created_trucks = []
-        skipped = []
         message = "The following lines were skipped because they have registration numbers already in the database or they had invalid number of values: {}"
-        for index, details in enumerate(read_csv(csv_file)):
-            if not len(details) == 4:
-                data = {
-                    "detail": f"Invalid number of values in line {index + 1}, four values required"
-                }
-                skipped.append(index)
-                continue
-            try:
-                instance = self.Meta.commit_to_db(
-                    name=details[0],
-                    reg_no=details[1],
-                    type=details[2],
-                    haulage=details[3],
-                    owned_by=transporter_company,
-                )
-                created_trucks.append(instance)
-            except IntegrityError:
-                skipped.append(index + 1)
-
-        data = self.Meta.serializer(created_trucks, many=True).data
+
+        if run_async:
+            job = ImportJob.objects.create_import_job(
+                asset_type=self.Meta.asset_type,
+                csv_file=csv_file,
+                owned_by=transporter_company,
+                created_by=request.user,
+            )
+            submit_on_commit(run_import_jobs)
+            response = {
+                "job": ImportJobSerializer(job).data,
+                "message": "The file will be imported in the background",
+            }
+            return (response, status.HTTP_202_ACCEPTED)
+
+        created_assets, skipped = self.Meta.model.objects.import_assets(
+            read_asset_rows(csv_file, transporter_company), self.Meta.build
+        )
+
+        data = self.Meta.serializer(created_assets, many=True).data
         response = {"assets": data}
         if skipped:
-            response["detail"] = message.format(str(skipped)[1:-1])
+            response["detail"] = message.format(str(sorted(skipped))[1:-1])
 
         return (response, status.HTTP_201_CREATED)
 
 
 class TrucksCsvSerializer(BaseAssetsCsvSerializer):
     class Meta:
-        commit_to_db = Truck.objects.create_truck
-        serializer = TruckSerializer
+        model = Truck
+        asset_type = "truck"
+        build = Truck.objects.build_truck
+        serializer = TruckListSerializer
 
 
 class TrailersCsvSerializer(BaseAssetsCsvSerializer):
     class Meta:
-        commit_to_db = Trailer.objects.create_trailer
-        serializer = TrailerSerializer
+        model = Trailer
+        asset_type = "trailer"
+        build = Trailer.objects.build_trailer
+        serializer = TrailerListSerializer
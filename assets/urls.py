@@ -7,9 +7,18 @@ urlpatterns = [
     ),
     path(
         "trailer-csv-upload/",
-        views.TruckCsvUploadView.as_view(),
+        views.TrailerCsvUploadView.as_view(),
         name="trailer_csv_upload",
     ),
+    path(
+        "import-jobs/<int:pk>/",
+        views.ImportJobRetrieveAPIView.as_view(),
+        name="import_job",
+    ),
+    path("truck/export/", views.TruckExportAPIView.as_view(), name="trucks_export"),
+    path(
+        "trailer/export/", views.TrailerExportAPIView.as_view(), name="trailers_export"
+    ),
     path("truck/", views.TruckListCreateAPIView.as_view(), name="trucks"),
     path(
         "truck/<int:pk>/",
@@ -7,10 +7,16 @@ from .serializers import (
     TrailersCsvSerializer,
     TruckSerializer,
     TrailerSerializer,
+    TruckListSerializer,
+    TrailerListSerializer,
+    ImportJobSerializer,
+    TruckExportSerializer,
+    TrailerExportSerializer,
 )
-from .models import Truck, Trailer
-from companies.models import TransporterCompany, Company
+from .models import Truck, Trailer, ImportJob
 from utils.renderers import JsnRenderer
+from utils.tenancy import get_tenant
+from utils.exports import ExportAPIView
 from utils.permissions import (
     IsTransporterOrAdmin,
     IsAdminOrAssetOwner,
@@ -19,6 +25,9 @@ from utils.permissions import (
 from django.shortcuts import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 
+# relations used to represent the owner of an asset
+OWNER_RELATIONS = "owned_by__company__company_director"
+
 
 class TruckCsvUploadView(generics.CreateAPIView):
     serializer_class = TrucksCsvSerializer
@@ -28,7 +37,8 @@ class TruckCsvUploadView(generics.CreateAPIView):
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        response_args = serializer.save()
+        run_async = request.query_params.get("async") == "true"
+        response_args = serializer.save(run_async=run_async)
         return Response(*response_args)
 
 
@@ -40,10 +50,36 @@ class TrailerCsvUploadView(generics.CreateAPIView):
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        response_args = serializer.save()
+        run_async = request.query_params.get("async") == "true"
+        response_args = serializer.save(run_async=run_async)
         return Response(*response_args)
 
 
+class ImportJobRetrieveAPIView(generics.RetrieveAPIView):
+    """ Report the progress of a background csv import"""
+
+    serializer_class = ImportJobSerializer
+    renderer_classes = (JsnRenderer,)
+    permission_classes = (IsAuthenticated, IsTransporterEmployee)
+
+    def get_queryset(self):
+        if self.request.user.is_superuser:
+            return ImportJob.objects.all()
+
+        transporter = get_tenant(self.request).transporter
+        return ImportJob.active_objects.get_company_jobs(owned_by=transporter)
+
+    def retrieve(self, request, pk):
+        job = self.get_object()
+        serialize = self.serializer_class(job)
+        response = {
+            "Message": "Import Job Successfully Retrieved",
+            "Job": serialize.data,
+        }
+
+        return Response(response, status=status.HTTP_200_OK)
+
+
 class TruckListCreateAPIView(generics.ListCreateAPIView):
     """ Transporter or admin can create trucks"""
 
@@ -54,19 +90,19 @@ class TruckListCreateAPIView(generics.ListCreateAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.is_superuser:
-            return Truck.objects.all()
+            return Truck.objects.select_related(OWNER_RELATIONS)
 
         if user.is_superuser == False:
-            company = user.employer
-            transporter = TransporterCompany.objects.get(company=company).pk
-            return Truck.active_objects.get_personal_assets(owned_by=transporter)
+            transporter = get_tenant(self.request).transporter
+            return Truck.active_objects.get_personal_assets(
+                owned_by=transporter
+            ).select_related(OWNER_RELATIONS)
 
     def create(self, request):
         user = self.request.user
         data = request.data.copy()
         if request.user.is_superuser == False:
-            owned_by = TransporterCompany.objects.get(company=request.user.employer).pk
-            data["owned_by"] = owned_by
+            data["owned_by"] = get_tenant(request).transporter.pk
         serializer = self.serializer_class(data=data)
         serializer.is_valid(raise_exception=True)
         serializer.save()
@@ -77,14 +113,15 @@ class TruckListCreateAPIView(generics.ListCreateAPIView):
         return Response(response, status=status.HTTP_201_CREATED)
 
     def list(self, request):
-        queryset = self.get_queryset()
-        serialize = self.serializer_class(queryset, many=True)
+        page = self.paginate_queryset(self.get_queryset())
+        serialize = TruckListSerializer(page, many=True)
 
         trucks = serialize.data
         if len(trucks) > 0:
             response = {"Message": "Trucks Retrieved Successfully", "Trucks": trucks}
         else:
             response = {"Message": "There are no Trucks for now"}
+        response.update(self.paginator.get_page_links())
         return Response(response, status=status.HTTP_200_OK)
 
 
@@ -96,12 +133,13 @@ class TruckRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.is_superuser:
-            return Truck.objects.all()
+            return Truck.objects.select_related(OWNER_RELATIONS)
 
         if user.is_superuser == False:
-            company = user.employer
-            transporter = TransporterCompany.objects.get(company=company).pk
-            return Truck.active_objects.get_personal_assets(owned_by=transporter)
+            transporter = get_tenant(self.request).transporter
+            return Truck.active_objects.get_personal_assets(
+                owned_by=transporter
+            ).select_related(OWNER_RELATIONS)
 
     def retrieve(self, request, pk):
         truck = self.get_object()
@@ -143,18 +181,18 @@ class TrailerListCreateAPIView(generics.ListCreateAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.is_superuser:
-            return Trailer.objects.all()
+            return Trailer.objects.select_related(OWNER_RELATIONS)
 
         if user.is_superuser == False:
-            company = user.employer
-            transporter = TransporterCompany.objects.get(company=company).pk
-            return Trailer.active_objects.get_personal_assets(owned_by=transporter)
+            transporter = get_tenant(self.request).transporter
+            return Trailer.active_objects.get_personal_assets(
+                owned_by=transporter
+            ).select_related(OWNER_RELATIONS)
 
     def create(self, request):
         data = request.data.copy()
         if request.user.is_superuser == False:
-            owned_by = TransporterCompany.objects.get(company=request.user.employer).pk
-            data["owned_by"] = owned_by
+            data["owned_by"] = get_tenant(request).transporter.pk
         serializer = self.serializer_class(data=data)
         serializer.is_valid(raise_exception=True)
         serializer.save()
@@ -165,8 +203,8 @@ class TrailerListCreateAPIView(generics.ListCreateAPIView):
         return Response(response, status=status.HTTP_201_CREATED)
 
     def list(self, request):
-        queryset = self.get_queryset()
-        serialize = self.serializer_class(queryset, many=True)
+        page = self.paginate_queryset(self.get_queryset())
+        serialize = TrailerListSerializer(page, many=True)
 
         trailers = serialize.data
         if len(trailers) > 0:
@@ -176,6 +214,7 @@ class TrailerListCreateAPIView(generics.ListCreateAPIView):
             }
         else:
             response = {"Message": "There are no Trailers for now"}
+        response.update(self.paginator.get_page_links())
         return Response(response, status=status.HTTP_200_OK)
 
 
@@ -187,12 +226,13 @@ class TrailerRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView)
     def get_queryset(self):
         user = self.request.user
         if user.is_superuser:
-            return Trailer.objects.all()
+            return Trailer.objects.select_related(OWNER_RELATIONS)
 
         if user.is_superuser == False:
-            company = user.employer
-            transporter = TransporterCompany.objects.get(company=company).pk
-            return Trailer.active_objects.get_personal_assets(owned_by=transporter)
+            transporter = get_tenant(self.request).transporter
+            return Trailer.active_objects.get_personal_assets(
+                owned_by=transporter
+            ).select_related(OWNER_RELATIONS)
 
     def retrieve(self, request, pk):
         trailer = self.get_object()
@@ -229,3 +269,33 @@ class TrailerRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView)
         self.check_object_permissions(request, obj)
         obj.soft_delete(commit=True)
         return Response(status.HTTP_204_NO_CONTENT)
+
+
+class TruckExportAPIView(ExportAPIView):
+    """ Stream trucks as JSON lines or CSV"""
+
+    serializer_class = TruckExportSerializer
+    permission_classes = (IsAuthenticated, IsTransporterEmployee)
+    export_name = "trucks"
+
+    def get_queryset(self):
+        if self.request.user.is_superuser:
+            return Truck.objects.all()
+
+        transporter = get_tenant(self.request).transporter
+        return Truck.active_objects.get_personal_assets(owned_by=transporter)
+
+
+class TrailerExportAPIView(ExportAPIView):
+    """ Stream trailers as JSON lines or CSV"""
+
+    serializer_class = TrailerExportSerializer
+    permission_classes = (IsAuthenticated, IsTransporterEmployee)
+    export_name = "trailers"
+
+    def get_queryset(self):
+        if self.request.user.is_superuser:
+            return Trailer.objects.all()
+
+        transporter = get_tenant(self.request).transporter
+        return Trailer.active_objects.get_personal_assets(owned_by=transporter)
@@ -1,8 +1,15 @@
 import jwt
+import time
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework import authentication, exceptions
+from rest_framework_simplejwt import authentication as simplejwt_authentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from authentication.cache import user_cache
+from utils.tenancy import TenantContext
 
 
 User = get_user_model()
@@ -82,14 +89,72 @@ class JWTAuthentication(authentication.BaseAuthentication):
             msg = "Invalid authentication. Could not decode token."
             raise exceptions.AuthenticationFailed(msg)
 
+        user = user_cache.get(payload["id"], token)
+        if user is None:
+            try:
+                user = User.objects.with_tenant().get(pk=payload["id"])
+            except User.DoesNotExist:
+                msg = "No user matching this token was found."
+                raise exceptions.AuthenticationFailed(msg)
+
+            if not user.is_active:
+                msg = "This user has been deactivated."
+                raise exceptions.AuthenticationFailed(msg)
+
+            user_cache.set(user, token)
+
+        request.tenant = TenantContext(user)
+        return (user, token)
+
+
+class TenantJWTAuthentication(simplejwt_authentication.JWTAuthentication):
+    """
+    Simple JWT authentication that loads the user together with their role,
+    employer and the employer's cargo owner/transporter company in one query,
+    and attaches the resulting tenant context to the request as `request.tenant`.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+
+        if result is not None:
+            request.tenant = TenantContext(result[0])
+
+        return result
+
+    def get_user(self, validated_token):
+        """
+        Return the user of the token, from the in-process user cache when the
+        same token was seen recently.
+        """
+
         try:
-            user = User.objects.get(pk=payload["id"])
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        token_id = validated_token.get(api_settings.JTI_CLAIM)
+        if token_id is not None:
+            user = user_cache.get(user_id, token_id)
+            if user is not None:
+                return user
+
+        try:
+            user = User.objects.with_tenant().get(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
         except User.DoesNotExist:
-            msg = "No user matching this token was found."
-            raise exceptions.AuthenticationFailed(msg)
+            raise exceptions.AuthenticationFailed(
+                "User not found", code="user_not_found"
+            )
 
         if not user.is_active:
-            msg = "This user has been deactivated."
-            raise exceptions.AuthenticationFailed(msg)
+            raise exceptions.AuthenticationFailed(
+                "User is inactive", code="user_inactive"
+            )
 
-        return (user, token)
+        if token_id is not None:
+            expires_in = validated_token.get("exp", 0) - time.time()
+            user_cache.set(user, token_id, expires_in=expires_in)
+
+        return user
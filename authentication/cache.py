@@ -0,0 +1,109 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class UserCache:
+    """
+    A bounded, thread-safe LRU cache of authenticated users, keyed by the user id
+    and the id of the token they authenticated with.
+
+    Users are stored pickled together with whatever relations were loaded with
+    them (role, employer, cargo owner/transporter company), and every read
+    returns a fresh copy so request code can modify `request.user` safely.
+
+    The cache is local to the process. Entries are evicted by the signal
+    handlers in `authentication.signals` whenever a user, role or company is
+    saved or deleted (soft deletes go through `save()` and are covered too).
+    Changes made by other processes, or with `QuerySet.update()`, are only
+    picked up once the entry expires, so the TTL should stay short.
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id, token_id):
+        """
+        Return a copy of the cached user or None if there is no live entry.
+        """
+
+        key = (user_id, token_id)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            payload, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+
+        return pickle.loads(payload)
+
+    def set(self, user, token_id, expires_in=None):
+        """
+        Cache the user for the token. `expires_in` (seconds) caps the TTL, eg
+        to the remaining lifetime of the token.
+        """
+
+        ttl = self.ttl if expires_in is None else min(self.ttl, expires_in)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+
+        key = (user.pk, token_id)
+        attrs = {
+            "pk": user.pk,
+            "role_id": user.role_id,
+            "employer_id": user.employer_id,
+        }
+        entry = (pickle.dumps(user), time.monotonic() + ttl, attrs)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, **attrs):
+        """
+        Drop every cached user matching all of the passed attributes, eg
+        `evict(pk=user.pk)` or `evict(employer_id=company.pk)`.
+        """
+
+        with self._lock:
+            for key, (_, _, cached_attrs) in list(self._entries.items()):
+                if all(
+                    cached_attrs.get(name) == value for name, value in attrs.items()
+                ):
+                    del self._entries[key]
+
+    def evict_users(self, pks):
+        """
+        Drop every cached copy of the users with the given primary keys, for
+        changes made with `QuerySet.update()` which sends no signals.
+        """
+
+        pks = set(pks)
+        with self._lock:
+            for key, (_, _, cached_attrs) in list(self._entries.items()):
+                if cached_attrs["pk"] in pks:
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(
+    max_size=settings.AUTH_USER_CACHE_SIZE, ttl=settings.AUTH_USER_CACHE_TTL
+)
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.7 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0008_auto_20200304_1622"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="authenticat_created_82daf3_idx"
+            ),
+        ),
+    ]
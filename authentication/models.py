@@ -9,6 +9,7 @@ from django.core.exceptions import ValidationError
 from utils.models import AbstractBaseModel, ActiveObjectsQuerySet
 from utils.validators import validate_international_phone_number
 from utils.helpers import enforce_all_required_arguments_are_truthy
+from authentication.roles import get_role_flag
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
@@ -162,6 +163,20 @@ class UserManager(BaseUserManager):
         driver.is_verified = True
         return driver
 
+    def with_tenant(self):
+        """
+        Return users with their role, employer and the employer's cargo owner or
+        transporter company joined in, so that building a tenant context for a
+        request costs a single query.
+        """
+
+        return self.select_related(
+            "role",
+            "employer",
+            "employer__cargoownercompany",
+            "employer__transportercompany",
+        )
+
 
 class User(PermissionsMixin, AbstractBaseModel, AbstractBaseUser):
     """
@@ -194,6 +209,10 @@ class User(PermissionsMixin, AbstractBaseModel, AbstractBaseUser):
 
     active_objects = ActiveObjectsQuerySet.as_manager()
 
+    class Meta:
+        # backs the cursor pagination of list endpoints
+        indexes = [models.Index(fields=["-created_at", "-id"])]
+
     def __str__(self):
 
         return self.get_username()
@@ -207,6 +226,14 @@ class User(PermissionsMixin, AbstractBaseModel, AbstractBaseUser):
     def get_full_name(self):
         return self.full_name
 
+    @property
+    def role_flag(self):
+        """
+        The user's role as a RoleFlag, resolved from the role_id column without
+        loading the Role.
+        """
+        return get_role_flag(self)
+
     def clean(self):
         """
         We ensure that the phone number is of the proper format before we save it.
@@ -0,0 +1,57 @@
+import enum
+
+
+class RoleFlag(enum.IntFlag):
+    """
+    One bit per role title, plus the role groups that permission classes check
+    against. Checking a role is then a single AND against a mask instead of a
+    chain of string comparisons on the related Role object.
+    """
+
+    TRANSPORTER_DIRECTOR = 1
+    CARGO_OWNER_DIRECTOR = 2
+    DRIVER = 4
+    ADMIN = 8
+    STAFF = 16
+    SUPERUSER = 32
+
+    DIRECTORS = TRANSPORTER_DIRECTOR | CARGO_OWNER_DIRECTOR
+    COMPANY_MANAGERS = TRANSPORTER_DIRECTOR | CARGO_OWNER_DIRECTOR | ADMIN
+    COMPANY_MEMBERS = TRANSPORTER_DIRECTOR | CARGO_OWNER_DIRECTOR | ADMIN | STAFF
+    TRANSPORTER_MANAGERS = TRANSPORTER_DIRECTOR | ADMIN
+    CARGO_OWNER_MANAGERS = CARGO_OWNER_DIRECTOR | ADMIN
+    FLEET_MANAGERS = TRANSPORTER_DIRECTOR | ADMIN | SUPERUSER
+    CARGO_MANAGERS = CARGO_OWNER_DIRECTOR | SUPERUSER
+
+
+ROLE_FLAGS = {
+    "transporter-director": RoleFlag.TRANSPORTER_DIRECTOR,
+    "cargo-owner-director": RoleFlag.CARGO_OWNER_DIRECTOR,
+    "driver": RoleFlag.DRIVER,
+    "admin": RoleFlag.ADMIN,
+    "staff": RoleFlag.STAFF,
+    "superuser": RoleFlag.SUPERUSER,
+}
+
+# Flag arithmetic on enum members is slow, so permission checks compare the
+# plain integer values of the flags instead.
+ROLE_BITS = {title: int(flag) for title, flag in ROLE_FLAGS.items()}
+
+
+def get_role_flag(user):
+    """
+    Return the RoleFlag of a user. `User.role` points at `Role.title`, so the
+    title is read from the `role_id` column and the Role is never loaded.
+    Anonymous users have no role.
+    """
+
+    return RoleFlag(ROLE_BITS.get(getattr(user, "role_id", None), 0))
+
+
+def has_role(user, roles):
+    """
+    Check whether the user has one of the roles in the `roles` mask, eg
+    `has_role(user, RoleFlag.COMPANY_MEMBERS)`.
+    """
+
+    return bool(ROLE_BITS.get(getattr(user, "role_id", None), 0) & int(roles))
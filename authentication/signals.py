@@ -5,8 +5,13 @@ from datetime import timedelta
 from logisticts.settings import site_url, site_full_name
 from django.dispatch import receiver
 from django_rest_passwordreset.signals import reset_password_token_created
-from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
+from django.db.models.signals import post_save, post_delete
+
+from authentication.cache import user_cache
+from authentication.models import User, Role
+from companies.models import Company, CargoOwnerCompany, TransporterCompany
+from notifications.models import Notification
 
 
 @receiver(reset_password_token_created)
@@ -30,15 +35,35 @@ def password_reset_token_created(sender, reset_password_token, *args, **kwargs):
     email_html_message = render_to_string("email/user_reset_password.html", context)
     email_plaintext_message = render_to_string("email/user_reset_password.txt", context)
 
-    msg = EmailMultiAlternatives(
-        # title:
-        "Password Reset for {}".format(site_full_name),
-        # message:
-        email_plaintext_message,
-        # from:
-        "noreply@{}".format(site_url),
-        # to:
-        [reset_password_token.user.email],
+    Notification.objects.enqueue_email(
+        recipients=[reset_password_token.user.email],
+        subject="Password Reset for {}".format(site_full_name),
+        body=email_plaintext_message,
+        html_body=email_html_message,
+        from_email="noreply@{}".format(site_url),
     )
-    msg.attach_alternative(email_html_message, "text/html")
-    msg.send()
+
+
+@receiver([post_save, post_delete], sender=User)
+def evict_cached_user(sender, instance, **kwargs):
+    """
+    Drop the cached copies of a user when it is saved (this includes soft
+    deletes and suspensions) or deleted.
+    """
+    user_cache.evict(pk=instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Role)
+def evict_cached_role_users(sender, instance, **kwargs):
+    user_cache.evict(role_id=instance.title)
+
+
+@receiver([post_save, post_delete], sender=Company)
+def evict_cached_company_users(sender, instance, **kwargs):
+    user_cache.evict(employer_id=instance.pk)
+
+
+@receiver([post_save, post_delete], sender=CargoOwnerCompany)
+@receiver([post_save, post_delete], sender=TransporterCompany)
+def evict_cached_company_type_users(sender, instance, **kwargs):
+    user_cache.evict(employer_id=instance.company_id)
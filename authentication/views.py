@@ -17,7 +17,8 @@ from authentication.serializers import (
 from utils.renderers import JsnRenderer
 from authentication.models import Profile
 from utils.permissions import IsOwnerOrAdmin
-from companies.models import Company, CargoOwnerCompany, TransporterCompany
+from utils.tenancy import get_tenant
+from authentication.roles import RoleFlag, has_role
 from rest_framework.renderers import JSONRenderer
 
 
@@ -113,6 +114,7 @@ class GetProfileAPIView(generics.ListAPIView):
     renderer_classes = (JsnRenderer, JSONRenderer)
     serializer_class = ProfileSerializer
     permission_classes = (IsAuthenticated,)
+    pagination_class = None  # a single profile
 
     def get_queryset(self):
         """
@@ -143,15 +145,8 @@ class ProfileRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateAPIView):
         if user.is_superuser:
             return Profile.objects.all()
 
-        if (
-            str(user.role) == "transporter-director"
-            or str(user.role) == "cargo-owner-director"
-        ):
-            company = Company.objects.get(company_director=user)
-            return Profile.objects.filter(user__employer=company)
-
-        if str(user.role) == "admin" or str(user.role) == "staff":
-            company = user.employer
+        if has_role(user, RoleFlag.COMPANY_MEMBERS):
+            company = get_tenant(self.request).company
             return Profile.objects.filter(user__employer=company)
 
     def retrieve(self, request, pk):
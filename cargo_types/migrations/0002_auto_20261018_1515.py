@@ -0,0 +1,25 @@
+# Generated by Django 2.2.7 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cargo_types", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cargotype",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="cargo_types_created_ff3229_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="commodity",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="cargo_types_created_eab530_idx"
+            ),
+        ),
+    ]
@@ -68,6 +68,10 @@ class CargoType(AbstractBaseModel, models.Model):
     objects = CargoTypeManager()
     active_objects = ActiveObjectsQuerySet.as_manager()
 
+    class Meta:
+        # backs the cursor pagination of list endpoints
+        indexes = [models.Index(fields=["-created_at", "-id"])]
+
     def __str__(self):
         return self.cargo_type
 
@@ -91,5 +95,9 @@ class Commodity(AbstractBaseModel, models.Model):
     objects = CargoTypeManager()
     active_objects = CommodityQuerySet.as_manager()
 
+    class Meta:
+        # backs the cursor pagination of list endpoints
+        indexes = [models.Index(fields=["-created_at", "-id"])]
+
     def __str__(self):
         return self.name
@@ -1,4 +1,3 @@
-from companies.models import CargoOwnerCompany
 from django.shortcuts import get_object_or_404
 from utils.permissions import IsAdminOrCargoOwner, IsAdminOrReadOnly, IsCommodityOwner
 from .models import CargoType, Commodity
@@ -11,6 +10,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from utils.renderers import JsnRenderer
 from .serializers import CargoTypeSerializer, CommoditySerializer
+from utils.tenancy import get_tenant
+from authentication.roles import RoleFlag, has_role
 from rest_framework.renderers import JSONRenderer
 
 
@@ -31,7 +32,7 @@ class CargoTypeList(generics.ListCreateAPIView):
         overide query set return only unsoft deleted objects to cargo owner and all to Admin
         """
         user = self.request.user
-        if user.is_authenticated and str(user.role) == "superuser":
+        if user.is_authenticated and has_role(user, RoleFlag.SUPERUSER):
             return CargoType.active_objects.all()
         return CargoType.active_objects.all_objects()
 
@@ -60,7 +61,7 @@ class CargoTypeRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
         overide query set return only unsoft deleted objects to cargo owner and all to Admin
         """
         user = self.request.user
-        if user.is_authenticated and str(user.role) == "superuser":
+        if user.is_authenticated and has_role(user, RoleFlag.SUPERUSER):
             return CargoType.objects.all()
         return CargoType.active_objects.all_objects()
 
@@ -115,16 +116,13 @@ class CommodityList(generics.ListCreateAPIView):
             return Commodity.objects.all()
 
         if user.is_superuser == False:
-            company = user.employer
-            cargo_company = CargoOwnerCompany.active_objects.get(company=company).pk
+            cargo_company = get_tenant(self.request).cargo_owner
             return Commodity.active_objects.get_commodity(created_by=cargo_company)
 
     def post(self, request, format=None):
         data = request.data.copy()
         if request.user.is_superuser == False:
-            company = request.user.employer
-            cargo_owner = CargoOwnerCompany.active_objects.get(company=company).pk
-            data["created_by"] = cargo_owner
+            data["created_by"] = get_tenant(request).cargo_owner.pk
         serializers = self.serializer_class(data=data)
         serializers.is_valid(raise_exception=True)
         serializers.save()
@@ -153,8 +151,7 @@ class CommodityRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
             return Commodity.objects.all()
 
         if user.is_superuser == False:
-            company = user.employer
-            cargo_company = CargoOwnerCompany.active_objects.get(company=company).pk
+            cargo_company = get_tenant(self.request).cargo_owner
             return Commodity.active_objects.get_commodity(created_by=cargo_company)
 
     # get the details of a particular commodity
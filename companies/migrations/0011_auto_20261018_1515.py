@@ -0,0 +1,19 @@
+# Generated by Django 2.2.7 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("companies", "0010_auto_20200330_1307"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="personofcontact",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="companies_p_created_cca8e8_idx"
+            ),
+        ),
+    ]
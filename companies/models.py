@@ -173,6 +173,10 @@ class PersonOfContact(AbstractBaseModel):
     objects = PersonOfContactManager()
     active_objects = PersonOfContactQuerySet.as_manager()
 
+    class Meta:
+        # backs the cursor pagination of list endpoints
+        indexes = [models.Index(fields=["-created_at", "-id"])]
+
     def __str__(self):
         return self.phone
 
@@ -162,6 +162,28 @@ class TransporterSerializer(serializers.ModelSerializer):
         return transport_company
 
 
+class TransporterSummarySerializer(serializers.ModelSerializer):
+    """compact transporter representation embedded in asset listings"""
+
+    business_name = serializers.CharField(source="company.business_name")
+    business_phone_no = serializers.CharField(source="company.business_phone_no")
+    business_email = serializers.EmailField(source="company.business_email")
+    onboarding_status = serializers.CharField(source="company.onboarding_status")
+    director = serializers.CharField(source="company.company_director.full_name")
+
+    class Meta:
+        model = TransporterCompany
+        fields = (
+            "id",
+            "business_name",
+            "business_phone_no",
+            "business_email",
+            "onboarding_status",
+            "director",
+        )
+        read_only_fields = fields
+
+
 class TransporterUpdateSerializer(serializers.ModelSerializer):
     """transport company retrival and update"""
 
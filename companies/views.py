@@ -1,4 +1,5 @@
 from django.shortcuts import render, get_object_or_404
+from django.db import transaction
 from rest_framework.response import Response
 from utils.renderers import JsnRenderer
 from rest_framework import status
@@ -38,11 +39,12 @@ from companies.serializers import (
     TransporterUpdateSerializer,
 )
 from authentication.models import User, Role
-from django.core.mail import send_mail
 from logisticts.settings import EMAIL_HOST_USER
 from django.contrib.auth.base_user import BaseUserManager
 from drf_yasg.utils import swagger_auto_schema
-from utils.helpers import send_sms
+from notifications.models import Notification
+from utils.tenancy import get_tenant
+from authentication.roles import RoleFlag, has_role
 from rest_framework.renderers import JSONRenderer
 
 
@@ -175,7 +177,7 @@ class TransporterCompanyRetrieveUpdateDestroy(RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        if user.is_authenticated and str(user.role) == "superuser":
+        if user.is_authenticated and has_role(user, RoleFlag.SUPERUSER):
             return TransporterCompany.objects.all()
         if user.is_superuser == False:
             return TransporterCompany.active_objects.get_company(company=user.employer)
@@ -224,6 +226,7 @@ class PendingCompaniesListAPIView(generics.ListAPIView):
     permission_classes = (IsAuthenticated, IsShyperEmployee)
     serializer_class = MainCompanySerializer
     renderer_classes = (JSONRenderer, JsnRenderer)
+    pagination_class = None  # companies have no created_at to paginate on
 
     def get_queryset(self):
 
@@ -250,11 +253,10 @@ class CreatePersonOfContact(generics.ListCreateAPIView):
         deleted to the transporter and all to admin
         """
         user = self.request.user
-        if user.is_authenticated and str(user.role) == "superuser":
+        if user.is_authenticated and has_role(user, RoleFlag.SUPERUSER):
             return PersonOfContact.objects.all()
         if user.is_superuser == False:
-            company = user.employer
-            cargo_owner = CargoOwnerCompany.active_objects.get(company=company).pk
+            cargo_owner = get_tenant(self.request).cargo_owner
             return PersonOfContact.active_objects.get_person_of_contact(
                 company=cargo_owner
             )
@@ -263,9 +265,7 @@ class CreatePersonOfContact(generics.ListCreateAPIView):
         user = self.request.user
         data = request.data.copy()
         if user.is_superuser == False:
-            company = user.employer
-            cargo_owner = CargoOwnerCompany.active_objects.get(company=company).pk
-            data["company"] = cargo_owner
+            data["company"] = get_tenant(request).cargo_owner.pk
         serializer = self.serializer_class(data=data)
         serializer.is_valid(raise_exception=True)
         serializer.save()
@@ -277,11 +277,13 @@ class CreatePersonOfContact(generics.ListCreateAPIView):
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
         response = {
             "Persons of contact": serializer.data,
             "Message": "Successfully returned your persons of contact",
         }
+        response.update(self.paginator.get_page_links())
         return Response(response, status=status.HTTP_200_OK)
 
 
@@ -304,11 +306,10 @@ class PersonOfContactRetrieveUpdateDestroyAPIView(
         deleted to the transporter and all to admin
         """
         user = self.request.user
-        if user.is_authenticated and str(user.role) == "superuser":
+        if user.is_authenticated and has_role(user, RoleFlag.SUPERUSER):
             return PersonOfContact.objects.all()
         if user.is_superuser == False:
-            company = user.employer
-            cargo_owner = CargoOwnerCompany.active_objects.get(company=company).pk
+            cargo_owner = get_tenant(self.request).cargo_owner
             return PersonOfContact.active_objects.get_person_of_contact(
                 company=cargo_owner
             )
@@ -361,11 +362,7 @@ class EmployeeListCreateAPIView(generics.ListCreateAPIView):
             return company.employees.filter(is_deleted=False)
 
         if user.is_superuser:
-            companies = []
-            for c in Company.objects.all():
-                companies.append(c)
-                for company in companies:
-                    return company.employees.all()
+            return User.objects.filter(employer__isnull=False)
 
     def post(self, request, format=None):
         user = self.request.user
@@ -379,23 +376,26 @@ class EmployeeListCreateAPIView(generics.ListCreateAPIView):
         data["password"] = password
         email = data["email"]
         phone = data["phone"]
-        if data["employer"]:
+        if user.is_superuser and data["employer"]:
             company = Company.objects.get(id=data["employer"])
         serializer = self.serializer_class(data=data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
         subject = f"{company} new employee"
         message = f"Your  account for {company} has been created  . Login credentials are \nYour email is : {email} \n password: {password}"
-        from_email = EMAIL_HOST_USER
-        recipient_list = [email]
-
-        # sends authentication credentials to employee's email
-        send_mail(subject, message, from_email, recipient_list, fail_silently=False)
-        # sms notifications
-        send_sms(
-            message=f"Your  account for {company} has been created . Login credentials are \n Your email is : {email} \n password: {password}",
-            recipients=[phone],
-        )
+        with transaction.atomic():
+            serializer.save()
+            # sends authentication credentials to employee's email
+            Notification.objects.enqueue_email(
+                recipients=[email],
+                subject=subject,
+                body=message,
+                from_email=EMAIL_HOST_USER,
+            )
+            # sms notifications
+            Notification.objects.enqueue_sms(
+                recipients=[phone],
+                body=f"Your  account for {company} has been created . Login credentials are \n Your email is : {email} \n password: {password}",
+            )
         response = {
             "message": "employee added succesfully",
             "employee": serializer.data,
@@ -442,37 +442,36 @@ class EmployeeRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView
         data.pop("password", None)
         serializer = self.serializer_class(obj, data, partial=True)
         serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
-        # suspending employee
-        suspend = data.get("suspend")
-        if suspend:
-            if suspend.lower() == "true":
-                obj.is_active = False
-                send_mail(
-                    subject="Shyper Account suspension",
-                    message="your account has been suspended",
-                    from_email=EMAIL_HOST_USER,
-                    recipient_list=[obj.email],
-                    fail_silently=False,
-                )
-                send_sms(
-                    message="your shypper account has been suspended",
-                    recipients=[obj.phone],
-                )
-            if suspend.lower() == "false":
-                obj.is_active = True
-                send_mail(
-                    subject="Shyper Account reactivation",
-                    message="your account suspension has been uplifted",
-                    from_email=EMAIL_HOST_USER,
-                    recipient_list=[obj.email],
-                    fail_silently=False,
-                )
-                send_sms(
-                    message="your shypper account has been reactivated",
-                    recipients=[obj.phone],
-                )
-            obj.save()
+        with transaction.atomic():
+            self.perform_update(serializer)
+            # suspending employee
+            suspend = data.get("suspend")
+            if suspend:
+                if suspend.lower() == "true":
+                    obj.is_active = False
+                    Notification.objects.enqueue_email(
+                        recipients=[obj.email],
+                        subject="Shyper Account suspension",
+                        body="your account has been suspended",
+                        from_email=EMAIL_HOST_USER,
+                    )
+                    Notification.objects.enqueue_sms(
+                        recipients=[obj.phone],
+                        body="your shypper account has been suspended",
+                    )
+                if suspend.lower() == "false":
+                    obj.is_active = True
+                    Notification.objects.enqueue_email(
+                        recipients=[obj.email],
+                        subject="Shyper Account reactivation",
+                        body="your account suspension has been uplifted",
+                        from_email=EMAIL_HOST_USER,
+                    )
+                    Notification.objects.enqueue_sms(
+                        recipients=[obj.phone],
+                        body="your shypper account has been reactivated",
+                    )
+                obj.save()
         response = {
             "message": "employee data succesfully updated",
             "employee": serializer.data,
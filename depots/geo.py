@@ -0,0 +1,128 @@
+import math
+
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+# mean radius of the earth
+EARTH_RADIUS_KM = 6371.0088
+
+
+def parse_coordinates(coordinates):
+    """
+    Return the `(latitude, longitude)` floats of a depot's coordinates hstore,
+    or `(None, None)` if they are missing or not valid numbers.
+    """
+
+    try:
+        latitude = float(coordinates["lattitude"])
+        longitude = float(coordinates["longitude"])
+    except (KeyError, TypeError, ValueError):
+        return None, None
+
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None, None
+    return latitude, longitude
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great circle distance between two points in kilometres.
+    """
+
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Return `(min_lat, max_lat, min_lon, max_lon)` of a box containing every
+    point within `radius_km` of the point. The longitude bounds are None when
+    the box wraps around a pole or the antimeridian, ie any longitude matches.
+    """
+
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat = latitude - delta_lat
+    max_lat = latitude + delta_lat
+
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90), min(max_lat, 90), None, None
+
+    ratio = math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(latitude))
+    if ratio >= 1:
+        return min_lat, max_lat, None, None
+
+    delta_lon = math.degrees(math.asin(ratio))
+    min_lon = longitude - delta_lon
+    max_lon = longitude + delta_lon
+
+    if min_lon < -180 or max_lon > 180:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, min_lon, max_lon
+
+
+def distance_expression(
+    latitude, longitude, lat_field="latitude", lon_field="longitude"
+):
+    """
+    Database expression of the haversine distance in kilometres between the
+    point and the row's latitude/longitude columns.
+    """
+
+    lat = Radians(F(lat_field))
+    lon = Radians(F(lon_field))
+    point_lat = math.radians(latitude)
+    point_lon = math.radians(longitude)
+
+    a = Power(Sin((lat - point_lat) / 2), 2) + math.cos(point_lat) * Cos(lat) * Power(
+        Sin((lon - point_lon) / 2), 2
+    )
+    # rounding can push the square root slightly above 1, outside asin's domain
+    return (
+        2
+        * EARTH_RADIUS_KM
+        * ASin(Least(Sqrt(a), Value(1.0)), output_field=FloatField())
+    )
+
+
+def haversine_pairs(origins, destinations):
+    """
+    Great circle distances in kilometres between `origins[i]` and
+    `destinations[i]`, both sequences of `(latitude, longitude)`. The
+    distances are computed in one vectorised pass and returned as a list.
+    """
+
+    # numpy is slow to import and only needed here, keep it off startup
+    import numpy as np
+
+    origins = np.radians(np.asarray(origins, dtype=float).reshape(-1, 2))
+    destinations = np.radians(np.asarray(destinations, dtype=float).reshape(-1, 2))
+    return _haversine(np, origins, destinations).tolist()
+
+
+def haversine_matrix(origins, destinations):
+    """
+    Matrix of the great circle distances in kilometres from every origin to
+    every destination, both sequences of `(latitude, longitude)`. Row `i`
+    holds the distances from `origins[i]`.
+    """
+
+    import numpy as np
+
+    origins = np.radians(np.asarray(origins, dtype=float).reshape(-1, 2))
+    destinations = np.radians(np.asarray(destinations, dtype=float).reshape(-1, 2))
+    # broadcast the origins down the rows and the destinations across columns
+    return _haversine(np, origins[:, np.newaxis, :], destinations[np.newaxis, :, :])
+
+
+def _haversine(np, origins, destinations):
+    lat1, lon1 = origins[..., 0], origins[..., 1]
+    lat2, lon2 = destinations[..., 0], destinations[..., 1]
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
@@ -0,0 +1,110 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from authentication.models import User
+from depots.geo import haversine_km
+from depots.models import Depot
+
+# synthetic depots are spread over roughly East Africa
+LATITUDES = (-5.0, 5.0)
+LONGITUDES = (33.0, 42.0)
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert synthetic depots in a transaction that is rolled back, then time "
+        "nearest-depot and radius searches against scanning every depot's "
+        "coordinates in Python."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--depots", type=int, default=100000)
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--limit", type=int, default=10)
+        parser.add_argument("--radius", type=float, default=25)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        user = User.objects.order_by("pk").first()
+        if user is None:
+            raise CommandError("Create a user to own the synthetic depots first.")
+
+        rng = random.Random(options["seed"])
+        points = [self.random_point(rng) for _ in range(options["queries"])]
+
+        with transaction.atomic():
+            self.create_depots(user, options["depots"], rng)
+
+            queryset = Depot.active_objects.all()
+            self.report(
+                f"nearest {options['limit']}",
+                points,
+                lambda lat, lon: queryset.nearest(lat, lon, options["limit"]),
+            )
+            self.report(
+                f"within {options['radius']} km",
+                points,
+                lambda lat, lon: list(
+                    queryset.within_radius(lat, lon, options["radius"])
+                ),
+            )
+            self.report(
+                f"python scan, nearest {options['limit']}",
+                points[:5],
+                lambda lat, lon: self.scan_nearest(lat, lon, options["limit"]),
+            )
+
+            transaction.set_rollback(True)
+
+    def random_point(self, rng):
+        return rng.uniform(*LATITUDES), rng.uniform(*LONGITUDES)
+
+    def create_depots(self, user, count, rng):
+        started = time.perf_counter()
+        depots = []
+        for _ in range(count):
+            latitude, longitude = self.random_point(rng)
+            # bulk_create skips save(), so the numeric columns are set here
+            depots.append(
+                Depot(
+                    user=user,
+                    city="benchmark",
+                    coordinates={
+                        "lattitude": str(latitude),
+                        "longitude": str(longitude),
+                    },
+                    latitude=latitude,
+                    longitude=longitude,
+                )
+            )
+        Depot.objects.bulk_create(depots, batch_size=5000)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Depot._meta.db_table}")
+
+        self.stdout.write(
+            f"created {count} depots in {time.perf_counter() - started:.1f} s"
+        )
+
+    def scan_nearest(self, latitude, longitude, limit):
+        """the search as it had to be done with only the coordinates hstore"""
+        distances = []
+        for pk, coordinates in Depot.active_objects.values_list("pk", "coordinates"):
+            distance = haversine_km(
+                latitude,
+                longitude,
+                float(coordinates["lattitude"]),
+                float(coordinates["longitude"]),
+            )
+            distances.append((distance, pk))
+        return sorted(distances)[:limit]
+
+    def report(self, label, points, search):
+        started = time.perf_counter()
+        for latitude, longitude in points:
+            search(latitude, longitude)
+        elapsed = (time.perf_counter() - started) / len(points)
+        self.stdout.write(f"{label}: {elapsed * 1000:.2f} ms per query")
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.7 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("depots", "0002_depot_is_public"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="depot",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="depots_depo_created_608814_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 2.2.7 on 2026-10-18 12:21
+
+from django.db import migrations, models
+
+
+def copy_coordinates(apps, schema_editor):
+    """
+    Fill latitude/longitude from the coordinates hstore of existing depots.
+    """
+    Depot = apps.get_model("depots", "Depot")
+
+    batch = []
+    for depot in Depot.objects.only("id", "coordinates").iterator(chunk_size=2000):
+        try:
+            latitude = float(depot.coordinates["lattitude"])
+            longitude = float(depot.coordinates["longitude"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            continue
+
+        depot.latitude, depot.longitude = latitude, longitude
+        batch.append(depot)
+        if len(batch) == 2000:
+            Depot.objects.bulk_update(batch, ["latitude", "longitude"])
+            batch = []
+
+    if batch:
+        Depot.objects.bulk_update(batch, ["latitude", "longitude"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("depots", "0003_auto_20261018_1515"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="depot",
+            name="latitude",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="depot",
+            name="longitude",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="depot",
+            index=models.Index(
+                fields=["latitude", "longitude"], name="depots_depo_latitud_c39f24_idx"
+            ),
+        ),
+        migrations.RunPython(copy_coordinates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 2.2.7 on 2026-10-18 12:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("depots", "0004_depot_latitude_longitude"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DepotDistance",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("distance_km", models.FloatField()),
+                (
+                    "destination",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="depots.Depot",
+                    ),
+                ),
+                (
+                    "origin",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="depots.Depot",
+                    ),
+                ),
+            ],
+            options={"unique_together": {("origin", "destination")},},
+        ),
+    ]
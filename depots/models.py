@@ -1,3 +1,6 @@
+import math
+from itertools import product
+
 from django.db import models
 from django.contrib.postgres.fields import HStoreField
 from django.contrib.auth import get_user_model
@@ -6,6 +9,16 @@ from django.core.exceptions import ValidationError
 
 from utils.models import AbstractBaseModel, ActiveObjectsQuerySet
 from utils.helpers import enforce_all_required_arguments_are_truthy
+from .geo import (
+    EARTH_RADIUS_KM,
+    bounding_box,
+    distance_expression,
+    haversine_pairs,
+    parse_coordinates,
+)
+
+# radius the nearest depot search starts with, doubled until enough are found
+NEAREST_SEARCH_RADIUS_KM = 25
 
 
 class DepotManager(models.Manager):
@@ -62,6 +75,48 @@ class DepotQuerySet(ActiveObjectsQuerySet):
         """return public depots"""
         return self._active().filter(is_public=True)
 
+    def with_distance(self, latitude, longitude):
+        """annotate depots with their `distance` in km from the point"""
+        return self.filter(latitude__isnull=False).annotate(
+            distance=distance_expression(latitude, longitude)
+        )
+
+    def within_radius(self, latitude, longitude, radius_km):
+        """
+        Return the depots within `radius_km` of the point, nearest first. The
+        indexed bounding box of the circle narrows the rows down before the
+        exact distance is computed.
+        """
+        min_lat, max_lat, min_lon, max_lon = bounding_box(
+            latitude, longitude, radius_km
+        )
+        queryset = self.filter(latitude__range=(min_lat, max_lat))
+        if min_lon is not None:
+            queryset = queryset.filter(longitude__range=(min_lon, max_lon))
+
+        return (
+            queryset.with_distance(latitude, longitude)
+            .filter(distance__lte=radius_km)
+            .order_by("distance", "id")
+        )
+
+    def nearest(self, latitude, longitude, limit=10):
+        """
+        Return the `limit` depots nearest to the point. The search radius
+        starts small and doubles until enough depots are found, so only the
+        rows around the point are read.
+        """
+        radius_km = NEAREST_SEARCH_RADIUS_KM
+        while radius_km < math.pi * EARTH_RADIUS_KM:
+            depots = list(self.within_radius(latitude, longitude, radius_km)[:limit])
+            if len(depots) == limit:
+                return depots
+            radius_km *= 2
+
+        return list(
+            self.with_distance(latitude, longitude).order_by("distance", "id")[:limit]
+        )
+
 
 class Depot(AbstractBaseModel, models.Model):
     """
@@ -76,15 +131,48 @@ class Depot(AbstractBaseModel, models.Model):
     street = models.CharField(max_length=50, null=True, blank=True)
     state = models.CharField(max_length=50, null=True, blank=True)
     coordinates = HStoreField()
+    # numeric copies of `coordinates`, kept in sync on save for spatial queries
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
     is_public = models.BooleanField(default=True)
 
     objects = DepotManager()
 
     active_objects = DepotQuerySet.as_manager()
 
+    class Meta:
+        indexes = [
+            # backs the cursor pagination of list endpoints
+            models.Index(fields=["-created_at", "-id"]),
+            # backs the bounding box filter of spatial searches
+            models.Index(fields=["latitude", "longitude"]),
+        ]
+
     def __str__(self):
         return f"{self.coordinates} in {self.city}."
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        depot = super().from_db(db, field_names, values)
+        depot._saved_position = depot.position
+        return depot
+
+    @property
+    def position(self):
+        return self.__dict__.get("latitude"), self.__dict__.get("longitude")
+
+    def save(self, *args, **kwargs):
+        self.latitude, self.longitude = parse_coordinates(self.coordinates or {})
+        moved = self.pk is not None and self.position != getattr(
+            self, "_saved_position", None
+        )
+        super().save(*args, **kwargs)
+
+        # distances cached against the old coordinates no longer hold
+        if moved:
+            DepotDistance.objects.forget(self)
+        self._saved_position = self.position
+
     def clean(self):
         """
         Ensure that coordinates are stored in proper format.
@@ -98,6 +186,11 @@ class Depot(AbstractBaseModel, models.Model):
             elif not self.coordinates[key]:
                 raise ValidationError({key: f"{key} cannot be empty."})
 
+        if parse_coordinates(self.coordinates) == (None, None):
+            raise ValidationError(
+                {"coordinates": "lattitude and longitude must be valid numbers."}
+            )
+
         # remove any unnecessary keys being passed here
         self.coordinates = {
             "lattitude": self.coordinates.get("lattitude"),
@@ -110,4 +203,114 @@ class Depot(AbstractBaseModel, models.Model):
         """
         Check if current user can view depot
         """
-        return self.user == user or self.is_public
+        return self.is_public or self.user_id == user.pk
+
+
+class DepotDistanceManager(models.Manager):
+    """
+    Manager of the cached distances between depots.
+    """
+
+    def get_distances(self, pairs):
+        """
+        Return `{(origin.pk, destination.pk): km}` for the given
+        `(origin, destination)` depot pairs. Cached distances are read with a
+        single query, the missing ones are computed in one vectorised pass and
+        stored for the next lookup. Pairs with a depot that has no coordinates
+        map to None.
+        """
+
+        pairs = list(pairs)
+        depots = {depot.pk: depot for pair in pairs for depot in pair}
+        keys = {
+            DepotDistance.pair_key(origin.pk, destination.pk)
+            for origin, destination in pairs
+            if origin.pk != destination.pk
+        }
+
+        known = {}
+        if keys:
+            depot_ids = {pk for key in keys for pk in key}
+            known = {
+                (origin_id, destination_id): distance_km
+                for origin_id, destination_id, distance_km in self.filter(
+                    origin_id__in=depot_ids, destination_id__in=depot_ids
+                ).values_list("origin_id", "destination_id", "distance_km")
+            }
+
+        missing = [
+            key
+            for key in keys
+            if key not in known and all(depots[pk].latitude is not None for pk in key)
+        ]
+        if missing:
+            distances = haversine_pairs(
+                [depots[origin_id].position for origin_id, _ in missing],
+                [depots[destination_id].position for _, destination_id in missing],
+            )
+            known.update(zip(missing, distances))
+            # another request may have cached the same pair in the meantime
+            self.bulk_create(
+                [
+                    self.model(
+                        origin_id=origin_id,
+                        destination_id=destination_id,
+                        distance_km=distance_km,
+                    )
+                    for (origin_id, destination_id), distance_km in zip(
+                        missing, distances
+                    )
+                ],
+                ignore_conflicts=True,
+            )
+
+        result = {}
+        for origin, destination in pairs:
+            if origin.pk == destination.pk:
+                distance_km = 0.0 if origin.latitude is not None else None
+            else:
+                distance_km = known.get(
+                    DepotDistance.pair_key(origin.pk, destination.pk)
+                )
+            result[(origin.pk, destination.pk)] = distance_km
+        return result
+
+    def get_matrix(self, origins, destinations):
+        """
+        Return the distances from every origin depot to every destination
+        depot, keyed as in `get_distances`.
+        """
+
+        return self.get_distances(product(origins, destinations))
+
+    def forget(self, depot):
+        """
+        Drop the cached distances to and from a depot.
+        """
+
+        return self.filter(
+            models.Q(origin_id=depot.pk) | models.Q(destination_id=depot.pk)
+        ).delete()
+
+
+class DepotDistance(models.Model):
+    """
+    Cached great circle distance between two depots. Distances are symmetric,
+    so each pair is stored once with the lower depot id as the origin.
+    """
+
+    origin = models.ForeignKey(Depot, on_delete=models.CASCADE, related_name="+")
+    destination = models.ForeignKey(Depot, on_delete=models.CASCADE, related_name="+")
+    distance_km = models.FloatField()
+
+    objects = DepotDistanceManager()
+
+    class Meta:
+        unique_together = ("origin", "destination")
+
+    def __str__(self):
+        return f"{self.origin_id} to {self.destination_id}: {self.distance_km} km."
+
+    @staticmethod
+    def pair_key(origin_id, destination_id):
+        return min(origin_id, destination_id), max(origin_id, destination_id)
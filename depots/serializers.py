@@ -19,11 +19,11 @@ class DepotSerializer(serializers.ModelSerializer):
             "is_public",
         ]
         extra_kwargs = {"id": {"read_only": True}}
+
     def create(self, validated_data):
         return Depot.objects.create_depot(**validated_data)
 
-
-    def validate(self,data):
+    def validate(self, data):
 
         coordinate_keys = ("lattitude", "longitude")
 
@@ -34,3 +34,22 @@ class DepotSerializer(serializers.ModelSerializer):
                 raise ValidationError({key: f"{key} cannot be empty."})
 
         return super().validate(data)
+
+
+class DepotExportSerializer(serializers.ModelSerializer):
+    """depot representation used by exports"""
+
+    class Meta:
+        model = Depot
+        fields = [
+            "id",
+            "city",
+            "state",
+            "address",
+            "street",
+            "coordinates",
+            "user",
+            "is_public",
+            "created_at",
+        ]
+        read_only_fields = fields
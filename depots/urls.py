@@ -1,8 +1,17 @@
 from django.urls import path
-from .views import DepotList, DepotRetrieveUpdateDestroy
+from .views import (
+    DepotList,
+    DepotRetrieveUpdateDestroy,
+    DepotExport,
+    NearestDepots,
+    DepotsWithinRadius,
+)
 
 
 urlpatterns = [
     path("depot/", DepotList.as_view(), name="DepotList"),
+    path("depot/nearest/", NearestDepots.as_view(), name="nearest_depots"),
+    path("depot/within/", DepotsWithinRadius.as_view(), name="depots_within_radius"),
+    path("depot/export/", DepotExport.as_view(), name="depot_export"),
     path("depot/<int:pk>", DepotRetrieveUpdateDestroy.as_view(), name="depot_details"),
 ]
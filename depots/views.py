@@ -1,15 +1,21 @@
 from django.shortcuts import render
 from .models import Depot
-from .serializers import DepotSerializer
+from .serializers import DepotSerializer, DepotExportSerializer
 from django.shortcuts import get_object_or_404
 from utils.permissions import IsAdminOrCargoOwner, IsAdminOrReadOnly
 from rest_framework import status, generics
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from utils.renderers import JsnRenderer
+from utils.exports import ExportAPIView
+from authentication.roles import RoleFlag, has_role
 from rest_framework.renderers import JSONRenderer
 
+# most depots a nearest/radius search returns
+MAX_DEPOT_SEARCH_RESULTS = 100
+MAX_DEPOT_SEARCH_RADIUS_KM = 500
 
 # Create your views here.
 
@@ -24,7 +30,7 @@ class DepotList(generics.ListCreateAPIView):
     def get_queryset(self):
         """overide queryset to return owner created depots and public depots only"""
         user = self.request.user
-        if user.is_authenticated and str(user.role) == "superuser":
+        if user.is_authenticated and has_role(user, RoleFlag.SUPERUSER):
             return Depot.active_objects.all()
         return Depot.active_objects.get_depot(
             user=user
@@ -33,7 +39,7 @@ class DepotList(generics.ListCreateAPIView):
     def post(self, request, format=None):
         data = request.data.copy()
         data["user"] = request.user.pk
-        if str(request.user.role) != "superuser":
+        if not has_role(request.user, RoleFlag.SUPERUSER):
             # make the depot private when created by cargo owners
             data["is_public"] = False
         if request.user.is_superuser:
@@ -55,7 +61,7 @@ class DepotRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        if user.is_authenticated and str(user.role) == "superuser":
+        if user.is_authenticated and has_role(user, RoleFlag.SUPERUSER):
             return Depot.active_objects.all()
         return Depot.active_objects.get_depot(
             user=user
@@ -86,3 +92,83 @@ class DepotRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
         obj.soft_delete(commit=True)
         response = {"message": "depot  deleted succesfully!"}
         return Response(response, status.HTTP_200_OK)
+
+
+class DepotSearchView(generics.GenericAPIView):
+    """base view for searching the depots a user can see around a point"""
+
+    permission_classes = (IsAuthenticated, IsAdminOrCargoOwner)
+    serializer_class = DepotSerializer
+    renderer_classes = (JsnRenderer, JSONRenderer)
+    pagination_class = None
+
+    def get_queryset(self):
+        user = self.request.user
+        if has_role(user, RoleFlag.SUPERUSER):
+            return Depot.active_objects.all()
+        return Depot.active_objects.get_depot(
+            user=user
+        ) | Depot.active_objects.get_public(is_public=True)
+
+    def get_number(self, name, minimum, maximum, default=None, cast=float):
+        value = self.request.query_params.get(name, default)
+        if value is None:
+            raise ValidationError({name: "This query parameter is required."})
+        try:
+            value = cast(value)
+        except (TypeError, ValueError):
+            raise ValidationError({name: "Must be a number."})
+        if not minimum <= value <= maximum:
+            raise ValidationError({name: f"Must be between {minimum} and {maximum}."})
+        return value
+
+    def get_point(self):
+        return self.get_number("lat", -90, 90), self.get_number("lon", -180, 180)
+
+    def search_response(self, depots):
+        data = []
+        for depot in depots:
+            depot_data = self.serializer_class(depot).data
+            depot_data["distance_km"] = round(depot.distance, 3)
+            data.append(depot_data)
+        return Response(
+            {"depots": data, "message": "depots retrieved"}, status.HTTP_200_OK
+        )
+
+
+class NearestDepots(DepotSearchView):
+    """the `limit` depots nearest to `lat`/`lon`"""
+
+    def get(self, request, format=None):
+        latitude, longitude = self.get_point()
+        limit = self.get_number(
+            "limit", 1, MAX_DEPOT_SEARCH_RESULTS, default=10, cast=int
+        )
+        depots = self.get_queryset().nearest(latitude, longitude, limit)
+        return self.search_response(depots)
+
+
+class DepotsWithinRadius(DepotSearchView):
+    """the depots within `radius` km of `lat`/`lon`, nearest first"""
+
+    def get(self, request, format=None):
+        latitude, longitude = self.get_point()
+        radius_km = self.get_number("radius", 0, MAX_DEPOT_SEARCH_RADIUS_KM)
+        depots = self.get_queryset().within_radius(latitude, longitude, radius_km)
+        return self.search_response(depots[:MAX_DEPOT_SEARCH_RESULTS])
+
+
+class DepotExport(ExportAPIView):
+    """stream depots as JSON lines or CSV"""
+
+    permission_classes = (IsAuthenticated, IsAdminOrCargoOwner)
+    serializer_class = DepotExportSerializer
+    export_name = "depots"
+
+    def get_queryset(self):
+        user = self.request.user
+        if has_role(user, RoleFlag.SUPERUSER):
+            return Depot.active_objects.all()
+        return Depot.active_objects.get_depot(
+            user=user
+        ) | Depot.active_objects.get_public(is_public=True)
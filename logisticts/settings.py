@@ -52,6 +52,7 @@ INSTALLED_APPS = [
     "rates.apps.RatesConfig",
     "assets.apps.AssetsConfig",
     "transporter.apps.TransporterConfig",
+    "notifications.apps.NotificationsConfig",
     # third-party apps
     "rest_framework",
     "django_extensions",
@@ -74,9 +75,11 @@ MIDDLEWARE = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "authentication.backends.TenantJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.AllowAny",),
+    "DEFAULT_PAGINATION_CLASS": "utils.pagination.CreatedAtCursorPagination",
+    "PAGE_SIZE": int(os.getenv("PAGE_SIZE", 50)),
     "DEFAULT_RENDERER_CLASSES": [
         "rest_framework.renderers.JSONRenderer",
         "rest_framework.renderers.BrowsableAPIRenderer",
@@ -88,6 +91,54 @@ SIMPLE_JWT = {
     "JWT_ALLOW_REFRESH": True,
     "REFRESH_TOKEN_LIFETIME": datetime.timedelta(days=1),
 }
+# authenticated users are cached in-process per token, see authentication.cache
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", 1024))
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", 60))
+
+# background jobs run on a thread pool inside the web process, see utils.workers
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", 2))
+# running import jobs that made no progress for this many seconds are retried
+IMPORT_JOB_STALE_AFTER = int(os.getenv("IMPORT_JOB_STALE_AFTER", 600))
+
+# emails and sms are queued in an outbox and sent by the background workers,
+# see notifications.outbox
+NOTIFICATION_BACKEND = os.getenv(
+    "NOTIFICATION_BACKEND", "notifications.backends.GatewayBackend"
+)
+NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", 50))
+# notifications sent per second by each worker, 0 for no limit
+NOTIFICATION_RATE_LIMIT = float(os.getenv("NOTIFICATION_RATE_LIMIT", 10))
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", 5))
+# seconds before the first retry, doubled after every failed attempt
+NOTIFICATION_RETRY_DELAY = int(os.getenv("NOTIFICATION_RETRY_DELAY", 30))
+NOTIFICATION_SENDING_TIMEOUT = int(os.getenv("NOTIFICATION_SENDING_TIMEOUT", 300))
+# recipients per Africa's Talking request
+SMS_BATCH_SIZE = int(os.getenv("SMS_BATCH_SIZE", 100))
+
+# share the cache between processes by pointing it at memcached or redis
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+# seconds order quotes are memoized for, see orders.quotes
+ORDER_QUOTE_CACHE_TTL = int(os.getenv("ORDER_QUOTE_CACHE_TTL", 3600))
+
+# truck pings are buffered per process and written in bulk once this many are
+# waiting or the oldest is this many seconds old, see trips.telematics
+TELEMATICS_BUFFER_SIZE = int(os.getenv("TELEMATICS_BUFFER_SIZE", 1000))
+TELEMATICS_FLUSH_INTERVAL = float(os.getenv("TELEMATICS_FLUSH_INTERVAL", 5))
+# seconds the last known position of a truck stays in the cache
+TRUCK_POSITION_CACHE_TTL = int(os.getenv("TRUCK_POSITION_CACHE_TTL", 600))
+# seconds simplified trip routes are cached for, see trips.routes
+TRIP_ROUTE_CACHE_TTL = int(os.getenv("TRIP_ROUTE_CACHE_TTL", 3600))
+# pings that could not be written are kept here until replayed
+TELEMATICS_SPOOL_PATH = os.getenv(
+    "TELEMATICS_SPOOL_PATH", os.path.join(BASE_DIR, "telematics.spool")
+)
 
 ROOT_URLCONF = "logisticts.urls"
 
@@ -66,6 +66,7 @@ urlpatterns = [
     path("api/v1/assets/", include("assets.urls")),
     path("api/v1/rates/", include("rates.urls")),
     path("api/v1/order/", include("orders.urls")),
+    path("api/v1/trips/", include("trips.urls")),
 ]
 
 
@@ -0,0 +1,25 @@
+from django.contrib import admin
+from .models import Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    """
+    Outbox admin. Message bodies can hold credentials and password reset
+    links, so they are never shown.
+    """
+
+    list_display = ("channel", "subject", "status", "attempts", "created_at")
+    list_filter = ("channel", "status")
+    exclude = ("body", "html_body")
+    readonly_fields = (
+        "channel",
+        "recipients",
+        "subject",
+        "from_email",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "last_error",
+        "sent_at",
+    )
@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.utils.module_loading import import_string
+
+from utils.helpers import send_sms_batch
+
+
+def get_backend():
+    """
+    Return an instance of the backend configured in NOTIFICATION_BACKEND.
+    """
+
+    return import_string(settings.NOTIFICATION_BACKEND)()
+
+
+class BaseBackend:
+    """
+    Sends batches of notifications. Both methods return a dict mapping the pk
+    of every notification that could not be sent to the error. When only
+    some recipients of a notification were not reached, a backend narrows
+    its `recipients` down to them so a retry does not reach the others
+    twice.
+    """
+
+    def send_emails(self, notifications):
+        raise NotImplementedError
+
+    def send_sms(self, notifications):
+        raise NotImplementedError
+
+
+class GatewayBackend(BaseBackend):
+    """
+    Sends emails through the configured SMTP server and sms through Africa's
+    Talking.
+    """
+
+    def send_emails(self, notifications):
+        errors = {}
+        # one SMTP connection for the whole batch
+        with get_connection() as connection:
+            for notification in notifications:
+                message = EmailMultiAlternatives(
+                    notification.subject,
+                    notification.body,
+                    notification.from_email or settings.EMAIL_HOST_USER,
+                    notification.recipients,
+                    connection=connection,
+                )
+                if notification.html_body:
+                    message.attach_alternative(notification.html_body, "text/html")
+                try:
+                    message.send()
+                except Exception as exc:
+                    errors[notification.pk] = str(exc)
+        return errors
+
+    def send_sms(self, notifications):
+        # notifications with the same text are sent together
+        failures = send_sms_batch((n.body, n.recipients) for n in notifications)
+
+        errors = {}
+        for notification in notifications:
+            failed = failures.get(notification.body, {})
+            missed = [phone for phone in notification.recipients if phone in failed]
+            if missed:
+                notification.recipients = missed
+                errors[notification.pk] = str(failed[missed[0]])
+        return errors
+
+
+class InMemoryBackend(BaseBackend):
+    """
+    Keeps sent notifications in `InMemoryBackend.outbox` instead of sending
+    them, for tests and local development.
+    """
+
+    outbox = []
+
+    def send_emails(self, notifications):
+        self.outbox.extend(notifications)
+        return {}
+
+    def send_sms(self, notifications):
+        self.outbox.extend(notifications)
+        return {}
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Send due notifications from the outbox, including retries and those "
+        "left behind by a worker that stopped. Useful from cron or a separate "
+        "worker process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int)
+
+    def handle(self, *args, **options):
+        processed = drain_outbox(batch_size=options["batch_size"])
+        self.stdout.write(f"Processed {processed} notifications")
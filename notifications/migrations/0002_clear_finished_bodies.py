@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def clear_finished_bodies(apps, schema_editor):
+    """
+    Blank the bodies of notifications already sent or given up on, they may
+    hold credentials or password reset links.
+    """
+
+    Notification = apps.get_model("notifications", "Notification")
+    Notification.objects.filter(status__in=["sent", "failed"]).update(
+        body="", html_body=""
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_finished_bodies, migrations.RunPython.noop),
+    ]
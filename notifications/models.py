@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from utils.models import AbstractBaseModel
+from utils.helpers import enforce_all_required_arguments_are_truthy
+from utils.workers import submit_on_commit
+
+
+class NotificationManager(models.Manager):
+    """
+    Manager for the notification outbox. Notifications are written in the
+    transaction of the change they are about and only sent once it commits.
+    """
+
+    def enqueue_email(
+        self, recipients=None, subject=None, body=None, html_body="", from_email=""
+    ):
+        """
+        Queue an email, `recipients` is a list of email addresses.
+        """
+        REQUIRED_ARGS = ("recipients", "subject", "body")
+        enforce_all_required_arguments_are_truthy(
+            {"recipients": recipients, "subject": subject, "body": body}, REQUIRED_ARGS,
+        )
+        return self._enqueue(
+            channel=Notification.EMAIL,
+            recipients=list(recipients),
+            subject=subject,
+            body=body,
+            html_body=html_body,
+            from_email=from_email,
+        )
+
+    def enqueue_sms(self, recipients=None, body=None):
+        """
+        Queue an sms, `recipients` is a list of phone numbers.
+        """
+        REQUIRED_ARGS = ("recipients", "body")
+        enforce_all_required_arguments_are_truthy(
+            {"recipients": recipients, "body": body}, REQUIRED_ARGS
+        )
+        return self._enqueue(
+            channel=Notification.SMS, recipients=list(recipients), body=body
+        )
+
+    def _enqueue(self, **kwargs):
+        from .outbox import drain_outbox
+
+        notification = self.model(**kwargs)
+        notification.save()
+        submit_on_commit(drain_outbox)
+        return notification
+
+    def claim_batch(self, limit):
+        """
+        Lock up to `limit` notifications that are due, mark them as sending and
+        return them. Notifications stuck in sending for longer than
+        NOTIFICATION_SENDING_TIMEOUT seconds (eg their worker died) are
+        claimed again. Rows locked by another worker are skipped.
+        """
+        now = timezone.now()
+        stale_before = now - timedelta(seconds=settings.NOTIFICATION_SENDING_TIMEOUT)
+
+        with transaction.atomic():
+            notifications = list(
+                self.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=Notification.PENDING, next_attempt_at__lte=now)
+                    | Q(status=Notification.SENDING, updated_at__lt=stale_before)
+                )
+                .order_by("next_attempt_at")[:limit]
+            )
+            self.filter(pk__in=[n.pk for n in notifications]).update(
+                status=Notification.SENDING, updated_at=now
+            )
+
+        return notifications
+
+
+class Notification(AbstractBaseModel):
+    """
+    model for the email and sms outbox
+    """
+
+    EMAIL = "email"
+    SMS = "sms"
+
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+    channel = models.CharField(max_length=10, choices=[(EMAIL, EMAIL), (SMS, SMS)])
+    recipients = ArrayField(models.CharField(max_length=254))
+    subject = models.CharField(max_length=255, blank=True)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254, blank=True)
+    status = models.CharField(
+        max_length=10,
+        default=PENDING,
+        choices=[
+            (PENDING, PENDING),
+            (SENDING, SENDING),
+            (SENT, SENT),
+            (FAILED, FAILED),
+        ],
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    objects = NotificationManager()
+
+    class Meta:
+        # backs the query workers use to find due notifications
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.channel} to {', '.join(self.recipients)} ({self.status})"
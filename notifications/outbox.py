@@ -0,0 +1,119 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .backends import get_backend
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Spaces out sends so that no more than `rate` notifications go out per
+    second. A rate of 0 disables the limit.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_at = time.monotonic()
+
+    def wait(self, count=1):
+        now = time.monotonic()
+        if self.next_at > now:
+            time.sleep(self.next_at - now)
+        self.next_at = max(now, self.next_at) + count * self.interval
+
+
+def _send(send, notifications):
+    if not notifications:
+        return {}
+    try:
+        return send(notifications)
+    except Exception as exc:
+        logger.exception("Sending %d notifications failed", len(notifications))
+        return {notification.pk: str(exc) for notification in notifications}
+
+
+def _record_results(notifications, errors):
+    """
+    Mark sent notifications as such and schedule failed ones for a retry with
+    exponential backoff, giving up after NOTIFICATION_MAX_ATTEMPTS.
+
+    Messages can carry credentials and password reset links, so the bodies
+    of notifications that are done with, sent or given up on, are blanked
+    in the same update.
+    """
+
+    now = timezone.now()
+    for notification in notifications:
+        notification.attempts += 1
+        notification.updated_at = now
+        error = errors.get(notification.pk)
+
+        if error is None:
+            notification.status = Notification.SENT
+            notification.sent_at = now
+            notification.last_error = ""
+        elif notification.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+            notification.status = Notification.FAILED
+            notification.last_error = error
+        else:
+            notification.status = Notification.PENDING
+            notification.last_error = error
+            notification.next_attempt_at = now + timedelta(
+                seconds=settings.NOTIFICATION_RETRY_DELAY
+                * 2 ** (notification.attempts - 1)
+            )
+
+        if notification.status != Notification.PENDING:
+            notification.body = notification.html_body = ""
+
+    Notification.objects.bulk_update(
+        notifications,
+        [
+            "attempts",
+            "status",
+            "recipients",
+            "body",
+            "html_body",
+            "sent_at",
+            "last_error",
+            "next_attempt_at",
+            "updated_at",
+        ],
+    )
+
+
+def drain_outbox(batch_size=None, backend=None):
+    """
+    Send due notifications batch by batch until there are none left. Returns
+    the number of notifications processed.
+    """
+
+    batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+    backend = backend or get_backend()
+    limiter = RateLimiter(settings.NOTIFICATION_RATE_LIMIT)
+    processed = 0
+
+    while True:
+        notifications = Notification.objects.claim_batch(batch_size)
+        if not notifications:
+            return processed
+
+        limiter.wait(len(notifications))
+        errors = _send(
+            backend.send_emails,
+            [n for n in notifications if n.channel == Notification.EMAIL],
+        )
+        errors.update(
+            _send(
+                backend.send_sms,
+                [n for n in notifications if n.channel == Notification.SMS],
+            )
+        )
+        _record_results(notifications, errors)
+        processed += len(notifications)
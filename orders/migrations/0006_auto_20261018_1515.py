@@ -0,0 +1,19 @@
+# Generated by Django 2.2.7 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0005_merge_20200401_0953"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="orders_orde_created_f2fe3a_idx"
+            ),
+        ),
+    ]
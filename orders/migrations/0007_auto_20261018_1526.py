@@ -0,0 +1,20 @@
+# Generated by Django 2.2.7 on 2026-10-18 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0006_auto_20261018_1515"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["status", "assigned", "created_at"],
+                name="orders_orde_status_3906c7_idx",
+            ),
+        ),
+    ]
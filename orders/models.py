@@ -1,23 +1,34 @@
 import uuid
+from itertools import product
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import prefetch_related_objects
 from django.contrib.auth import get_user_model
 from django.contrib.postgres.fields import HStoreField, ArrayField
 from django.core.exceptions import ValidationError
 
 from utils.models import AbstractBaseModel, ActiveObjectsQuerySet
 from utils.helpers import enforce_all_required_arguments_are_truthy
+from depots.models import DepotDistance
 from django.core.validators import MaxValueValidator, MinValueValidator
 
+# tonnes of cargo a container carries, used to work out the number of
+# containers of orders that are not containerised
+CONTAINER_CAPACITY = 28
+# most orders accepted by a single bulk create request
+MAX_BULK_ORDERS = 100
+
 
 class OrderManager(models.Manager):
     """
     Manager class for the Order model.
     """
 
-    def create_order(self, **kwargs):
+    def _prepare_order(self, **kwargs):
         """
-        Method to actually create an order. Ensure all arguments in `REQUIRED_ARGS` are provided.
+        Validate the arguments of an order and return the unsaved order with
+        its origin and destination depots. Ensure all arguments in
+        `REQUIRED_ARGS` are provided.
         """
 
         origin = kwargs.get("origin")
@@ -66,6 +77,14 @@ class OrderManager(models.Manager):
         order = self.model(**kwargs)
 
         order.clean()  # ensure the model is valid before saving
+        return order, origin, destination
+
+    def create_order(self, **kwargs):
+        """
+        Method to actually create an order.
+        """
+
+        order, origin, destination = self._prepare_order(**kwargs)
         order.save()
 
         if origin:
@@ -75,6 +94,68 @@ class OrderManager(models.Manager):
             order.destination.set(destination)
         return order
 
+    def bulk_create_orders(self, orders_data):
+        """
+        Create several orders at once. `orders_data` is a list of the keyword
+        arguments `create_order` takes. The orders and the rows linking them to
+        their origin and destination depots are each inserted with a single
+        `bulk_create`, all in one transaction.
+        """
+
+        prepared = [self._prepare_order(**kwargs) for kwargs in orders_data]
+
+        with transaction.atomic():
+            orders = self.bulk_create([order for order, _, _ in prepared])
+
+            origins = self.model.origin.through
+            destinations = self.model.destination.through
+            origins.objects.bulk_create(
+                [
+                    origins(order_id=order.pk, depot_id=depot_id)
+                    for order, (_, origin, _) in zip(orders, prepared)
+                    for depot_id in {depot.pk for depot in origin}
+                ]
+            )
+            destinations.objects.bulk_create(
+                [
+                    destinations(order_id=order.pk, depot_id=depot_id)
+                    for order, (_, _, destination) in zip(orders, prepared)
+                    for depot_id in {depot.pk for depot in destination}
+                ]
+            )
+
+        return orders
+
+    def get_route_distances(self, orders):
+        """
+        Return `{order.pk: {(origin.pk, destination.pk): km}}` with the
+        distance of every origin to destination leg of the orders, eg all
+        combinations of the depots of a MO-MD order. The depots are loaded
+        with one query per relation and the distances of all the orders are
+        looked up together.
+        """
+
+        prefetch_related_objects(orders, "origin", "destination")
+        legs = {
+            order.pk: list(product(order.origin.all(), order.destination.all()))
+            for order in orders
+        }
+        distances = DepotDistance.objects.get_distances(
+            {
+                (origin, destination)
+                for pairs in legs.values()
+                for origin, destination in pairs
+            }
+        )
+
+        return {
+            order_pk: {
+                (origin.pk, destination.pk): distances[(origin.pk, destination.pk)]
+                for origin, destination in pairs
+            }
+            for order_pk, pairs in legs.items()
+        }
+
 
 class OrderQuerySet(ActiveObjectsQuerySet):
     """Queryset to be used by Order model"""
@@ -82,6 +163,10 @@ class OrderQuerySet(ActiveObjectsQuerySet):
     def get_order(self, owner=None):
         return self._active().filter(owner=owner)
 
+    def get_pending(self):
+        """return orders still waiting for trucks"""
+        return self._active().filter(status="PD", assigned=False)
+
 
 class Order(AbstractBaseModel, models.Model):
     """
@@ -140,6 +225,14 @@ class Order(AbstractBaseModel, models.Model):
     objects = OrderManager()
     active_objects = OrderQuerySet.as_manager()
 
+    class Meta:
+        indexes = [
+            # backs the cursor pagination of list endpoints
+            models.Index(fields=["-created_at", "-id"]),
+            # backs the pending order backlog of truck matching
+            models.Index(fields=["status", "assigned", "created_at"]),
+        ]
+
     def __str__(self):
         return f"{self.title} order by {self.owner}."
 
@@ -0,0 +1,138 @@
+import hashlib
+import math
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+
+from orders.models import Order, CONTAINER_CAPACITY
+
+KG_PER_TONNE = 1000
+CENTS = Decimal("0.01")
+
+
+def _money(amount):
+    return amount.quantize(CENTS, rounding=ROUND_HALF_UP)
+
+
+def get_number_of_containers(order):
+    """
+    Containers the order needs, worked out from the tonnage when the order
+    does not say.
+    """
+
+    if order.number_of_containers:
+        return order.number_of_containers
+    if order.cargo_tonnage:
+        return math.ceil(order.cargo_tonnage / CONTAINER_CAPACITY)
+    return 0
+
+
+def quote_cache_key(order):
+    """
+    Cache key of an order's quote. It is built from everything the price
+    depends on, the order, its rate and its depots, along with when each was
+    last updated, so any change to them produces a new key and stale quotes
+    are never read.
+    """
+
+    rate = order.desired_rates
+    parts = [
+        (order.pk, order.updated_at.isoformat()),
+        (rate.pk, rate.updated_at.isoformat()),
+        sorted(
+            (depot.pk, depot.updated_at.isoformat()) for depot in order.origin.all()
+        ),
+        sorted(
+            (depot.pk, depot.updated_at.isoformat())
+            for depot in order.destination.all()
+        ),
+    ]
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f"order-quote:{order.pk}:{digest}"
+
+
+def build_quote(order, distances):
+    """
+    Price an order from its rate. `distances` maps each
+    `(origin.pk, destination.pk)` leg of the order to its length in km.
+
+    The charge is the tonnage at the per kg price, the containers at the per
+    truck price and the length of every leg at the per km price. Legs with a
+    depot that has no coordinates are left out of the total and the quote is
+    marked incomplete.
+    """
+
+    rate = order.desired_rates
+    tonnage = order.cargo_tonnage or Decimal(0)
+    containers = get_number_of_containers(order)
+
+    legs = []
+    distance_charge = Decimal(0)
+    for (origin_id, destination_id), distance_km in sorted(distances.items()):
+        charge = None
+        if distance_km is not None:
+            charge = _money(Decimal(str(round(distance_km, 3))) * rate.price_per_km)
+            distance_charge += charge
+        legs.append(
+            {
+                "origin": origin_id,
+                "destination": destination_id,
+                "distance_km": distance_km,
+                "charge": charge,
+            }
+        )
+
+    weight_charge = _money(tonnage * KG_PER_TONNE * rate.price_per_kg)
+    truck_charge = _money(containers * rate.price_per_truck)
+
+    return {
+        "tracking_id": str(order.tracking_id),
+        "currency": rate.preferred_currency,
+        "cargo_tonnage": tonnage,
+        "number_of_containers": containers,
+        "weight_charge": weight_charge,
+        "truck_charge": truck_charge,
+        "distance_charge": distance_charge,
+        "total": weight_charge + truck_charge + distance_charge,
+        "legs": legs,
+        "complete": bool(legs) and all(leg["charge"] is not None for leg in legs),
+    }
+
+
+def quote_orders(orders):
+    """
+    Return `{order.pk: quote}` for the orders. Quotes are memoized in the
+    cache, the distances of every leg of the orders that are not cached yet
+    are looked up together.
+    """
+
+    orders = list(orders)
+    prefetch_related_objects(orders, "desired_rates", "origin", "destination")
+
+    keys = {order.pk: quote_cache_key(order) for order in orders}
+    cached = cache.get_many(list(keys.values()))
+    quotes = {
+        order.pk: cached[keys[order.pk]] for order in orders if keys[order.pk] in cached
+    }
+
+    missing = [order for order in orders if order.pk not in quotes]
+    if missing:
+        distances = Order.objects.get_route_distances(missing)
+        fresh = {order.pk: build_quote(order, distances[order.pk]) for order in missing}
+        cache.set_many(
+            {keys[pk]: quote for pk, quote in fresh.items()},
+            timeout=settings.ORDER_QUOTE_CACHE_TTL,
+        )
+        quotes.update(fresh)
+
+    return quotes
+
+
+def quote_order(order):
+    """
+    Return the quote of a single order.
+    """
+
+    return quote_orders([order])[order.pk]
@@ -1,14 +1,102 @@
+import math
+
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 from rest_framework.fields import CurrentUserDefault
-from orders.models import Order
+from orders.models import Order, CONTAINER_CAPACITY
 from cargo_types.models import Commodity
 from companies.models import CargoOwnerCompany, PersonOfContact
 from depots.models import Depot
 from rates.models import Rate
 from rates.serializers import RateSerializer
+from utils.tenancy import get_tenant
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field that looks its object up in the objects prefetched by
+    `BulkOrderListSerializer` (`context["prefetched"]`, by model and pk)
+    instead of running a query per value.
+    """
+
+    def to_internal_value(self, data):
+        prefetched = self.context.get("prefetched")
+        if prefetched is None:
+            return super().to_internal_value(data)
+
+        if isinstance(data, bool) or not isinstance(data, (str, int)):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        instance = prefetched.get(self.get_queryset().model, {}).get(str(data))
+        if instance is None:
+            self.fail("does_not_exist", pk_value=data)
+        return instance
+
+
+class BulkOrderListSerializer(serializers.ListSerializer):
+    """
+    Validate and create a list of orders together. The related objects of all
+    the orders are fetched up front with one query per related model, and the
+    orders are written with `OrderManager.bulk_create_orders`.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self._context["prefetched"] = self.prefetch_related_objects(data)
+        return super().to_internal_value(data)
+
+    def prefetch_related_objects(self, data):
+        querysets = {}
+        pks = {}
+        for name, field in self.child.fields.items():
+            if field.read_only:
+                continue
+
+            many = isinstance(field, serializers.ManyRelatedField)
+            relation = field.child_relation if many else field
+            if not isinstance(relation, PrefetchedPrimaryKeyRelatedField):
+                continue
+
+            queryset = relation.get_queryset()
+            querysets.setdefault(queryset.model, queryset)
+            model_pks = pks.setdefault(queryset.model, set())
+
+            for item in data:
+                if not isinstance(item, dict) or item.get(name) is None:
+                    continue
+                values = item[name] if many else [item[name]]
+                if isinstance(values, list):
+                    model_pks.update(
+                        value
+                        for value in values
+                        if isinstance(value, (str, int)) and str(value).isdigit()
+                    )
+
+        return {
+            model: {
+                str(pk): instance
+                for pk, instance in querysets[model].in_bulk(model_pks).items()
+            }
+            for model, model_pks in pks.items()
+        }
+
+    def create(self, validated_data):
+        for attrs in validated_data:
+            cargo_tonnage = attrs.get("cargo_tonnage")
+            cargo_type = attrs["commodity"].cargo_type
+            if str(cargo_type).lower() != "container" and cargo_tonnage:
+                attrs["number_of_containers"] = math.ceil(
+                    int(cargo_tonnage) / CONTAINER_CAPACITY
+                )
+
+        orders = Order.objects.bulk_create_orders(validated_data)
+        prefetch_related_objects(orders, "origin", "destination")
+        return orders
 
 
 class OrderSerializer(serializers.ModelSerializer):
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
+
     assigned = serializers.BooleanField(default=False)
     recurring_order = serializers.BooleanField(default=False)
 
@@ -35,28 +123,41 @@ class OrderSerializer(serializers.ModelSerializer):
             "tracking_id",
         ]
 
-        extra_kwargs = {"id": {"read_only": True}, "tracking_id": {"read_only": True}}
+        extra_kwargs = {
+            "id": {"read_only": True},
+            "tracking_id": {"read_only": True},
+            "commodity": {"queryset": Commodity.objects.select_related("cargo_type")},
+        }
+        list_serializer_class = BulkOrderListSerializer
 
     def create(self, validated_data):
         """overide create method to use Oder model Manager"""
         return Order.objects.create_order(**validated_data)
 
+    @staticmethod
+    def is_owned_by(instance, owner_field, company_id):
+        """
+        Check that a related object belongs to the company and is not deleted
+        """
+        return (
+            company_id is not None
+            and getattr(instance, owner_field) == company_id
+            and not instance.is_deleted
+        )
+
     def validate(self, data):
         """
         Cargo owner can only enter commodities by their company
         """
-        user = self.context["request"].user
+        request = self.context["request"]
+        user = request.user
         if user.is_superuser == False:
-            company_instance = user.employer
-            company = CargoOwnerCompany.objects.get(company=company_instance).pk
-            commodities = list(
-                Commodity.active_objects.get_commodity(created_by=company)
-            )
-            persons_of_contact = list(
-                PersonOfContact.active_objects.get_person_of_contact(company=company)
-            )
-            rates = list(Rate.active_objects.get_rates(created_by=company))
-            if data["commodity"] not in commodities:
+            # the related objects were already loaded by their fields, so
+            # ownership is checked on their foreign keys without any queries
+            company = get_tenant(request).cargo_owner
+            company_id = company.pk if company else None
+
+            if not self.is_owned_by(data["commodity"], "created_by_id", company_id):
                 raise serializers.ValidationError({"commodity": "Commodity not found"})
 
             for depot in data["destination"]:
@@ -71,15 +172,19 @@ class OrderSerializer(serializers.ModelSerializer):
                         {"origin": "Origin Depot not found"}
                     )
 
-            if data["loading_point_contact"] not in persons_of_contact:
+            if not self.is_owned_by(
+                data["loading_point_contact"], "company_id", company_id
+            ):
                 raise serializers.ValidationError(
                     {"loading_point_contact": "Loading person contact not found"}
                 )
-            if data["offloading_point_contact"] not in persons_of_contact:
+            if not self.is_owned_by(
+                data["offloading_point_contact"], "company_id", company_id
+            ):
                 raise serializers.ValidationError(
                     {"offloading_point_contact": "offloading person contact not found"}
                 )
-            if data["desired_rates"] not in rates:
+            if not self.is_owned_by(data["desired_rates"], "created_by_id", company_id):
                 raise serializers.ValidationError(
                     {"desired_rates": "Company rates not found"}
                 )
@@ -89,3 +194,32 @@ class OrderSerializer(serializers.ModelSerializer):
                 {"destination": "destination and origin  cannot be the same"}
             )
         return super().validate(data)
+
+
+class OrderExportSerializer(serializers.ModelSerializer):
+    """flat order representation used by exports, related objects as ids"""
+
+    class Meta:
+        model = Order
+        fields = [
+            "id",
+            "tracking_id",
+            "title",
+            "description",
+            "status",
+            "order_type",
+            "commodity",
+            "cargo_tonnage",
+            "number_of_containers",
+            "origin",
+            "destination",
+            "loading_point_contact",
+            "offloading_point_contact",
+            "desired_rates",
+            "desired_truck_type",
+            "recurring_order",
+            "owner",
+            "assigned",
+            "created_at",
+        ]
+        read_only_fields = fields
@@ -1,3 +1,153 @@
-from django.test import TestCase
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
 
-# Create your tests here.
+from authentication.models import User
+from cargo_types.models import CargoType, Commodity
+from companies.models import CargoOwnerCompany, Company, PersonOfContact
+from depots.models import Depot
+from rates.models import Rate
+from orders.serializers import OrderSerializer
+
+PASSWORD = "Tr4ck-Loads-Daily"
+
+
+class OrderSerializerQueryCountTest(TestCase):
+    """
+    Validating an order must cost the same number of queries however many
+    commodities, depots, contacts and rates the company has.
+    """
+
+    def setUp(self):
+        director = User.objects.create_cargo_owner(
+            full_name="Cargo Director",
+            email="director@cargo.example.com",
+            password=PASSWORD,
+            phone="+254700000001",
+        )
+        company = Company.objects.create(
+            business_name="Cargo Co",
+            business_type="Corporate",
+            account_number="ACC-1",
+            prefered_currency="KES",
+            logo="documents/logo.png",
+            business_phone_no="+254700000002",
+            business_email="info@cargo.example.com",
+            location="Moi Avenue, Nairobi, Kenya",
+            company_director=director,
+            operational_regions="locals",
+            onboarding_status="approved",
+            certificate_of_incorporation="documents/certificate.pdf",
+            directors_id="documents/id.pdf",
+            category="cargo_owner",
+        )
+        director.employer = company
+        director.save()
+        self.cargo_owner = CargoOwnerCompany.objects.create(
+            potential_monthly_tonnage="100",
+            operational_hours="Mon-Fri 8-5",
+            company=company,
+        )
+        self.user = User.objects.with_tenant().get(pk=director.pk)
+        self.cargo_type = CargoType.objects.create_cargo_type(
+            cargo_type="Container", description="Containerised cargo"
+        )
+
+        commodity = Commodity.objects.create_commodity(
+            name="Tea",
+            description="Tea leaves",
+            created_by=self.cargo_owner,
+            cargo_type=self.cargo_type,
+        )
+        origin, destination = [
+            Depot.objects.create_depot(
+                city=city,
+                coordinates={"lattitude": latitude, "longitude": longitude},
+                user=self.user,
+                is_public=False,
+            )
+            for city, latitude, longitude in (
+                ("Nairobi", "-1.2921", "36.8219"),
+                ("Mombasa", "-4.0435", "39.6682"),
+            )
+        ]
+        loading, offloading = [
+            PersonOfContact.objects.create_person_of_contact(
+                company=self.cargo_owner,
+                name=name,
+                email=f"{name.lower()}@cargo.example.com",
+                phone=phone,
+            )
+            for name, phone in (
+                ("Loader", "+254700000003"),
+                ("Receiver", "+254700000004"),
+            )
+        ]
+        rate = Rate.objects.create_rates(
+            price_per_km=10, preferred_currency="KES", created_by=self.cargo_owner
+        )
+
+        self.payload = {
+            "title": "Tea to the coast",
+            "description": "Ten tonnes of tea",
+            "commodity": commodity.pk,
+            "cargo_tonnage": "10",
+            "origin": [origin.pk],
+            "destination": [destination.pk],
+            "loading_point_contact": loading.pk,
+            "offloading_point_contact": offloading.pk,
+            "desired_rates": rate.pk,
+            "desired_truck_type": "flatbed",
+            "owner": self.cargo_owner.pk,
+        }
+
+    def add_to_catalog(self, size):
+        """give the company `size` more of every related object"""
+
+        Commodity.objects.bulk_create(
+            Commodity(
+                name=f"Commodity {number}",
+                description="Catalogue filler",
+                created_by=self.cargo_owner,
+                cargo_type=self.cargo_type,
+            )
+            for number in range(size)
+        )
+        Depot.objects.bulk_create(
+            Depot(
+                city=f"Depot {number}",
+                coordinates={"lattitude": "0", "longitude": str(number % 180)},
+                user=self.user,
+                is_public=number % 2 == 0,
+            )
+            for number in range(size)
+        )
+        PersonOfContact.objects.bulk_create(
+            PersonOfContact(
+                company=self.cargo_owner,
+                name=f"Contact {number}",
+                email=f"contact{number}@cargo.example.com",
+                phone=f"+25471{number:07d}",
+            )
+            for number in range(size)
+        )
+        Rate.objects.bulk_create(
+            Rate(preferred_currency="USD", created_by=self.cargo_owner)
+            for _ in range(size)
+        )
+
+    def get_serializer(self):
+        request = RequestFactory().post("/api/v1/orders/")
+        request.user = self.user
+        return OrderSerializer(data=self.payload, context={"request": request})
+
+    def test_validation_queries_do_not_grow_with_the_catalog(self):
+        serializer = self.get_serializer()
+        with CaptureQueriesContext(connection) as small_catalog:
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        self.add_to_catalog(200)
+
+        serializer = self.get_serializer()
+        with self.assertNumQueries(len(small_catalog)):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
@@ -1,8 +1,29 @@
 from django.urls import path
-from orders.views import ListCreateOrder, RetrieveUpdateDeleteOrder
+from orders.views import (
+    ListCreateOrder,
+    RetrieveUpdateDeleteOrder,
+    ExportOrders,
+    BulkCreateOrders,
+    OrderQuote,
+    OrderMatches,
+    AllocateOrderTrips,
+)
 
 urlpatterns = [
     path("orders/", ListCreateOrder.as_view(), name="create-list-orders"),
+    path("orders/bulk/", BulkCreateOrders.as_view(), name="bulk-create-orders"),
+    path("orders/export/", ExportOrders.as_view(), name="export-orders"),
+    path("orders/<str:tracking_id>/quote/", OrderQuote.as_view(), name="order-quote"),
+    path(
+        "orders/<str:tracking_id>/matches/",
+        OrderMatches.as_view(),
+        name="order-matches",
+    ),
+    path(
+        "orders/<str:tracking_id>/trips/",
+        AllocateOrderTrips.as_view(),
+        name="allocate-order-trips",
+    ),
     path(
         "orders/<str:tracking_id>/",
         RetrieveUpdateDeleteOrder.as_view(),
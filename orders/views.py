@@ -1,17 +1,38 @@
+import logging
+
 from django.shortcuts import render, get_object_or_404
+from django.db import OperationalError
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework.response import Response
-from rest_framework import status
-from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework import serializers, status
+from rest_framework.generics import (
+    ListCreateAPIView,
+    RetrieveUpdateDestroyAPIView,
+    RetrieveAPIView,
+    CreateAPIView,
+)
 
 from utils.permissions import IsCargoOwner, IsShyperAdmin
-from orders.serializers import OrderSerializer
-from orders.models import Order
-from companies.models import CargoOwnerCompany
+from utils.tenancy import get_tenant
+from utils.exports import ExportAPIView
+from authentication.roles import RoleFlag, has_role
+from orders.serializers import OrderSerializer, OrderExportSerializer
+from orders.models import Order, CONTAINER_CAPACITY, MAX_BULK_ORDERS
+from orders.quotes import quote_order
+from trips.matching import match_order
+from trips.allocation import allocate_trips
+from trips.serializers import TripSerializer, TripAllocationSerializer
 from depots.models import Depot
 from cargo_types.models import Commodity
 import math
 from rest_framework.renderers import JSONRenderer
 
+logger = logging.getLogger(__name__)
+
+# candidate trucks returned for an order by default, and at most
+DEFAULT_MATCHES = 10
+MAX_MATCHES = 50
+
 
 class ListCreateOrder(ListCreateAPIView):
     serializer_class = OrderSerializer
@@ -20,27 +41,24 @@ class ListCreateOrder(ListCreateAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        if user.is_authenticated and str(user.role) == "superuser":
+        if user.is_authenticated and has_role(user, RoleFlag.SUPERUSER):
             return Order.active_objects.all()
-        if user.is_authenticated and str(user.role) != "superuser":
-            company = user.employer
-            cargo_owner = CargoOwnerCompany.objects.get(company=company).pk
+        if user.is_authenticated and not has_role(user, RoleFlag.SUPERUSER):
+            cargo_owner = get_tenant(self.request).cargo_owner
             return Order.active_objects.get_order(owner=cargo_owner)
 
     def post(self, request, format=None):
         user = self.request.user
         data = request.data.copy()
         if user.is_superuser == False:
-            company = user.employer
-            cargo_owner = CargoOwnerCompany.objects.get(company=company).pk
-            data["owner"] = cargo_owner
+            data["owner"] = get_tenant(request).cargo_owner.pk
         context = {"request": request}
         if data["commodity"]:
             commodity = Commodity.objects.get(id=data["commodity"])
             cargo_type = commodity.cargo_type
             if str(cargo_type).lower() != "container":
                 data["number_of_containers"] = math.ceil(
-                    int(data["cargo_tonnage"]) / 28
+                    int(data["cargo_tonnage"]) / CONTAINER_CAPACITY
                 )
         serializer = self.serializer_class(data=data, context=context)
         serializer.is_valid(raise_exception=True)
@@ -52,23 +70,57 @@ class ListCreateOrder(ListCreateAPIView):
         return Response(response, status=status.HTTP_201_CREATED)
 
 
-class RetrieveUpdateDeleteOrder(RetrieveUpdateDestroyAPIView):
+class BulkCreateOrders(CreateAPIView):
+    """create a list of orders in one request, eg for recurring shipments"""
+
     serializer_class = OrderSerializer
     permission_classes = (IsCargoOwner | IsShyperAdmin,)
-    multiple_lookup_fields = ["tracking_id"]
     renderer_classes = (JSONRenderer,)
 
+    def post(self, request, format=None):
+        data = request.data
+        if not isinstance(data, list) or not data:
+            response = {"orders": "Expected a non-empty list of orders."}
+            return Response(response, status=status.HTTP_400_BAD_REQUEST)
+
+        if not all(isinstance(order, dict) for order in data):
+            response = {"orders": "Each order must be an object."}
+            return Response(response, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(data) > MAX_BULK_ORDERS:
+            response = {
+                "orders": f"No more than {MAX_BULK_ORDERS} orders can be created at once."
+            }
+            return Response(response, status=status.HTTP_400_BAD_REQUEST)
+
+        data = [dict(order) for order in data]
+        if request.user.is_superuser == False:
+            owner = get_tenant(request).cargo_owner.pk
+            for order in data:
+                order["owner"] = owner
+
+        context = {"request": request}
+        serializer = self.serializer_class(data=data, many=True, context=context)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        response = {
+            "orders": serializer.data,
+            "message": "Orders successfully created",
+        }
+        return Response(response, status=status.HTTP_201_CREATED)
+
+
+class OrderLookupMixin:
+    """look up a single order of the user's company by its tracking id"""
+
+    multiple_lookup_fields = ["tracking_id"]
+
     def get_queryset(self):
         user = self.request.user
-        if user.is_authenticated and str(user.role) == "superuser":
+        if user.is_authenticated and has_role(user, RoleFlag.SUPERUSER):
             return Order.active_objects.all()
-        if (
-            user.is_authenticated
-            and str(user.role) == "cargo-owner-director"
-            or str(user.role) == "admin"
-        ):
-            company = user.employer
-            cargo_owner = CargoOwnerCompany.objects.get(company=company).pk
+        if user.is_authenticated and has_role(user, RoleFlag.CARGO_OWNER_MANAGERS):
+            cargo_owner = get_tenant(self.request).cargo_owner
             return Order.active_objects.get_order(owner=cargo_owner)
 
     def get_object(self):
@@ -81,6 +133,12 @@ class RetrieveUpdateDeleteOrder(RetrieveUpdateDestroyAPIView):
         self.check_object_permissions(self.request, obj)
         return obj
 
+
+class RetrieveUpdateDeleteOrder(OrderLookupMixin, RetrieveUpdateDestroyAPIView):
+    serializer_class = OrderSerializer
+    permission_classes = (IsCargoOwner | IsShyperAdmin,)
+    renderer_classes = (JSONRenderer,)
+
     def retrieve(self, request, tracking_id):
         order = self.get_object()
         serializer = self.serializer_class(order)
@@ -108,3 +166,90 @@ class RetrieveUpdateDeleteOrder(RetrieveUpdateDestroyAPIView):
         obj.soft_delete(commit=True)
         response = {"Message": "Order has been deleted successfully"}
         return Response(response, status.HTTP_200_OK)
+
+
+class OrderQuote(OrderLookupMixin, RetrieveAPIView):
+    """price an order from its desired rates"""
+
+    permission_classes = (IsCargoOwner | IsShyperAdmin,)
+    renderer_classes = (JSONRenderer,)
+
+    def retrieve(self, request, tracking_id):
+        quote = quote_order(self.get_object())
+        response = {
+            "quote": quote,
+            "message": "Order quote returned successfully",
+        }
+        return Response(response, status.HTTP_200_OK)
+
+
+class OrderMatches(OrderLookupMixin, RetrieveAPIView):
+    """list the available trucks best placed to carry an order"""
+
+    permission_classes = (IsShyperAdmin,)
+    renderer_classes = (JSONRenderer,)
+
+    def retrieve(self, request, tracking_id):
+        try:
+            limit = int(request.query_params.get("limit", DEFAULT_MATCHES))
+        except ValueError:
+            response = {"limit": "limit must be a number."}
+            return Response(response, status.HTTP_400_BAD_REQUEST)
+
+        limit = min(max(limit, 1), MAX_MATCHES)
+        matches = match_order(self.get_object(), limit=limit)
+        response = {
+            "trucks": [match._asdict() for match in matches],
+            "message": "Matching trucks returned successfully",
+        }
+        return Response(response, status.HTTP_200_OK)
+
+
+class AllocateOrderTrips(OrderLookupMixin, CreateAPIView):
+    """split an order into one trip per container and assign the trucks"""
+
+    serializer_class = TripAllocationSerializer
+    permission_classes = (IsShyperAdmin,)
+    renderer_classes = (JSONRenderer,)
+
+    def post(self, request, tracking_id):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            trips = allocate_trips(
+                self.get_object(), request.user, **serializer.validated_data
+            )
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.args[0]) from exc
+        except OperationalError:
+            # a lock timeout, deadlock or serialization failure against a
+            # concurrent allocation, nothing was written
+            logger.warning("Allocating order %s conflicted", tracking_id, exc_info=True)
+            response = {
+                "message": "The order or its trucks are being allocated by another "
+                "request, try again."
+            }
+            return Response(response, status=status.HTTP_409_CONFLICT)
+
+        response = {
+            "trips": TripSerializer(trips, many=True).data,
+            "message": "Trips successfully created",
+        }
+        return Response(response, status=status.HTTP_201_CREATED)
+
+
+class ExportOrders(ExportAPIView):
+    """stream the order history as JSON lines or CSV"""
+
+    serializer_class = OrderExportSerializer
+    permission_classes = (IsCargoOwner | IsShyperAdmin,)
+    export_name = "orders"
+
+    def get_queryset(self):
+        user = self.request.user
+        if has_role(user, RoleFlag.SUPERUSER):
+            queryset = Order.active_objects.all()
+        else:
+            cargo_owner = get_tenant(self.request).cargo_owner
+            queryset = Order.active_objects.get_order(owner=cargo_owner)
+        return queryset.prefetch_related("origin", "destination")
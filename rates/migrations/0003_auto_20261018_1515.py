@@ -0,0 +1,19 @@
+# Generated by Django 2.2.7 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rates", "0002_auto_20200121_1056"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="rate",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="rates_rate_created_b7213e_idx"
+            ),
+        ),
+    ]
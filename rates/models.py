@@ -70,3 +70,7 @@ class Rate(AbstractBaseModel, models.Model):
 
     objects = RatesManager()
     active_objects = RatesQuerySet.as_manager()
+
+    class Meta:
+        # backs the cursor pagination of list endpoints
+        indexes = [models.Index(fields=["-created_at", "-id"])]
@@ -9,7 +9,7 @@ from utils.permissions import (
 )
 from rates.models import Rate
 from rates.serializers import RateSerializer
-from companies.models import CargoOwnerCompany, Company
+from utils.tenancy import get_tenant
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.renderers import JSONRenderer
 
@@ -28,16 +28,13 @@ class ListRates(generics.ListCreateAPIView):
         if user.is_superuser:
             return Rate.objects.all()
         if user.is_superuser == False:
-            company_instance = user.employer
-            company = CargoOwnerCompany.objects.get(company=company_instance).pk
+            company = get_tenant(self.request).cargo_owner
             return Rate.active_objects.get_rates(created_by=company)
 
     def create(self, request, *args, **kwargs):
         data = request.data.copy()
         if request.user.is_superuser == False:
-            company = self.request.user.employer
-            created_by = CargoOwnerCompany.active_objects.get(company=company).pk
-            data["created_by"] = created_by
+            data["created_by"] = get_tenant(request).cargo_owner.pk
         serializer = self.serializer_class(data=data)
         serializer.is_valid(raise_exception=True)
         serializer.save()
@@ -49,11 +46,13 @@ class ListRates(generics.ListCreateAPIView):
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
         response = {
             "rates": serializer.data,
             "Message": "Successfully returned your rates",
         }
+        response.update(self.paginator.get_page_links())
         return Response(response, status=status.HTTP_200_OK)
 
 
@@ -71,8 +70,7 @@ class RetrieveUpdateDeleteRates(generics.RetrieveUpdateDestroyAPIView):
         if user.is_superuser:
             return Rate.objects.all()
         if user.is_superuser == False:
-            company_instance = user.employer
-            company = CargoOwnerCompany.objects.get(company=company_instance).pk
+            company = get_tenant(self.request).cargo_owner
             return Rate.active_objects.get_rates(created_by=company)
 
     # get a single rate and serialize it
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.7 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transporter", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="driver",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="transporter_created_77e7af_idx"
+            ),
+        ),
+    ]
@@ -28,5 +28,9 @@ class Driver(AbstractBaseModel, models.Model):
 
     active_objects = DriverQuerySet.as_manager()
 
+    class Meta:
+        # backs the cursor pagination of list endpoints
+        indexes = [models.Index(fields=["-created_at", "-id"])]
+
     def __str__(self):
         return self.user.full_name
@@ -2,7 +2,7 @@ from authentication.models import User
 from companies.models import TransporterCompany
 from rest_framework import serializers
 from .models import Driver
-from django.core.mail import send_mail
+from notifications.models import Notification
 from logisticts.settings import EMAIL_HOST_USER
 from utils.helpers import random_password
 from rest_framework.fields import CurrentUserDefault
@@ -31,17 +31,21 @@ class DriverSerializer(serializers.ModelSerializer):
         user_data = validated_data.pop("user")
         password = random_password(10)
         user_data["password"] = password
-
-        user = User.objects.create_driver(**user_data)
-        driver = Driver.active_objects.create(user=user, **validated_data)
         email = user_data["email"]
 
         subject = "Account Created"
         message = f"Your driver account has been created by Shipper. Login with these credentials. Your email is : {email} and password: {password}."
-        from_email = EMAIL_HOST_USER
-        recipient_list = [email]
-        # sends authentication credentials to the driver
-        send_mail(subject, message, from_email, recipient_list, fail_silently=False)
+
+        with transaction.atomic():
+            user = User.objects.create_driver(**user_data)
+            driver = Driver.active_objects.create(user=user, **validated_data)
+            # sends authentication credentials to the driver
+            Notification.objects.enqueue_email(
+                recipients=[email],
+                subject=subject,
+                body=message,
+                from_email=EMAIL_HOST_USER,
+            )
 
         return driver
 
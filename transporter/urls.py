@@ -1,8 +1,13 @@
 from django.urls import path
-from .views import DriverListCreateView, DriverDetailView
+from .views import DriverListCreateView, DriverDetailView, DriverBulkSuspendView
 from transporter import views
 
 urlpatterns = [
     path("drivers/", DriverListCreateView.as_view(), name="drivercreate_list"),
+    path(
+        "drivers/bulk-suspend/",
+        DriverBulkSuspendView.as_view(),
+        name="drivers-bulk-suspend",
+    ),
     path("drivers/<int:id>", DriverDetailView.as_view(), name="driver-detail"),
 ]
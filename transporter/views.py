@@ -1,13 +1,21 @@
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from utils.permissions import IsTransporterOrAdmin
-from companies.models import TransporterCompany
+from utils.tenancy import get_tenant
+from authentication.roles import RoleFlag, has_role
 from .models import Driver
 from .serializers import DriverSerializer, DriverRegistrationSerializer
-from utils.helpers import send_sms
+from notifications.models import Notification
+from authentication.models import User
+from authentication.cache import user_cache
+
+# most drivers suspended or reactivated by a single bulk request
+MAX_BULK_DRIVERS = 500
 
 
 class DriverListCreateView(generics.ListCreateAPIView):
@@ -18,23 +26,17 @@ class DriverListCreateView(generics.ListCreateAPIView):
         """ return different results depending on who is making a request """
         user = self.request.user
 
-        if str(user.role) == "superuser":
+        if has_role(user, RoleFlag.SUPERUSER):
             return Driver.active_objects.all()
 
-        if str(user.role) == "transporter":
-            transporter = TransporterCompany.active_objects.get(
-                company_director=self.request.user
-            ).pk
-
-            return Driver.active_objects.for_transporter(company=transporter)
+        transporter = get_tenant(self.request).transporter
+        return Driver.active_objects.for_transporter(company=transporter)
 
     def create(self, request, **kwargs):
-        transporter = TransporterCompany.active_objects.get(
-            company_director=request.user
-        ).pk
+        transporter = get_tenant(request).transporter
 
         data = request.data.copy()
-        data["company"] = transporter
+        data["company"] = transporter.pk
         serializer = self.serializer_class(data=data)
         serializer.is_valid(raise_exception=True)
         serializer.save()
@@ -67,9 +69,8 @@ class DriverDetailView(generics.RetrieveUpdateDestroyAPIView):
 
         if user.is_superuser:
             return Driver.active_objects.all()
-        if str(user.role) == "transporter":
-            company = TransporterCompany.active_objects.get(company_director=user).pk
-            return Driver.active_objects.for_transporter(company=company)
+        company = get_tenant(self.request).transporter
+        return Driver.active_objects.for_transporter(company=company)
 
     def update(self, request, **kwargs):
         """
@@ -85,25 +86,27 @@ class DriverDetailView(generics.RetrieveUpdateDestroyAPIView):
 
         serializer = self.get_serializer(obj, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
-
-        # logic for suspending and unsuspending driver.
-        suspend = request.data.get("suspend")
 
-        if suspend:
-            if suspend.lower() == "true":
-                obj.user.is_active = False
-                send_sms(
-                    message="your shypper account has been suspended",
-                    recipients=[obj.user.phone],
-                )
-            elif suspend.lower() == "false":
-                obj.user.is_active = True
-                send_sms(
-                    message="your shypper account has been reactivated",
-                    recipients=[obj.user.phone],
-                )
-            obj.user.save()
+        with transaction.atomic():
+            self.perform_update(serializer)
+
+            # logic for suspending and unsuspending driver.
+            suspend = request.data.get("suspend")
+
+            if suspend:
+                if suspend.lower() == "true":
+                    obj.user.is_active = False
+                    Notification.objects.enqueue_sms(
+                        recipients=[obj.user.phone],
+                        body="your shypper account has been suspended",
+                    )
+                elif suspend.lower() == "false":
+                    obj.user.is_active = True
+                    Notification.objects.enqueue_sms(
+                        recipients=[obj.user.phone],
+                        body="your shypper account has been reactivated",
+                    )
+                obj.user.save()
 
         message = "Driver succesfully updated."
 
@@ -126,3 +129,80 @@ class DriverDetailView(generics.RetrieveUpdateDestroyAPIView):
         obj.user.soft_delete(commit=True)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class DriverBulkSuspendView(generics.GenericAPIView):
+    """
+    Suspend or reactivate several drivers at once. Expects
+    `{"drivers": [<driver ids>], "suspend": "true" | "false"}`.
+    """
+
+    permission_classes = (IsTransporterOrAdmin,)
+
+    def get_queryset(self):
+        user = self.request.user
+
+        if user.is_superuser:
+            return Driver.active_objects.all()
+        company = get_tenant(self.request).transporter
+        return Driver.active_objects.for_transporter(company=company)
+
+    def post(self, request, **kwargs):
+        driver_ids = request.data.get("drivers")
+        suspend = str(request.data.get("suspend", "")).lower()
+
+        if (
+            not isinstance(driver_ids, list)
+            or not driver_ids
+            or not all(
+                isinstance(pk, int) and not isinstance(pk, bool) for pk in driver_ids
+            )
+        ):
+            response = {"drivers": "Expected a non-empty list of driver ids."}
+            return Response(response, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(driver_ids) > MAX_BULK_DRIVERS:
+            response = {
+                "drivers": f"No more than {MAX_BULK_DRIVERS} drivers can be updated at once."
+            }
+            return Response(response, status=status.HTTP_400_BAD_REQUEST)
+
+        if suspend not in ("true", "false"):
+            response = {"suspend": "Must be true or false."}
+            return Response(response, status=status.HTTP_400_BAD_REQUEST)
+
+        is_active = suspend == "false"
+
+        with transaction.atomic():
+            # only drivers whose account actually changes are updated and notified
+            drivers = list(
+                self.get_queryset()
+                .select_for_update(of=("user",))
+                .select_related("user")
+                .filter(pk__in=driver_ids, user__is_active=not is_active)
+            )
+            user_ids = [driver.user_id for driver in drivers]
+
+            # update() sends no signals, so cached users are evicted explicitly
+            User.objects.filter(pk__in=user_ids).update(
+                is_active=is_active, updated_at=timezone.now()
+            )
+            transaction.on_commit(lambda: user_cache.evict_users(user_ids))
+
+            if drivers:
+                body = (
+                    "your shypper account has been reactivated"
+                    if is_active
+                    else "your shypper account has been suspended"
+                )
+                # one notification for all the drivers, sent in batched requests
+                Notification.objects.enqueue_sms(
+                    recipients=[driver.user.phone for driver in drivers], body=body
+                )
+
+        action = "reactivated" if is_active else "suspended"
+        response = {
+            "drivers": [driver.pk for driver in drivers],
+            "message": f"{len(drivers)} drivers succesfully {action}.",
+        }
+        return Response(response, status=status.HTTP_200_OK)
@@ -1,8 +1,10 @@
 from django.contrib import admin
 
-from .models import Trip, TripInvoice, Event
+from .models import Trip, TripInvoice, Event, TrackingPoint, TruckPosition
 
 # Register your models here.
 admin.site.register(Trip)
 admin.site.register(TripInvoice)
 admin.site.register(Event)
+admin.site.register(TrackingPoint)
+admin.site.register(TruckPosition)
@@ -0,0 +1,132 @@
+from itertools import cycle, product
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from assets.models import Truck
+from orders.models import Order
+from orders.quotes import get_number_of_containers
+from trips.matching import get_available_trucks, match_order
+from trips.models import Trip, Event
+
+
+def get_legs(order):
+    """
+    Return the `(origin, destination)` depot pairs trips of the order can
+    take, eg every combination of the depots of a MO-MD order.
+    """
+
+    return [
+        (origin, destination)
+        for origin, destination in product(
+            order.origin.order_by("pk"), order.destination.order_by("pk")
+        )
+        if origin.pk != destination.pk
+    ]
+
+
+def _lock_available_trucks(truck_ids):
+    """
+    Lock the trucks and return those still available, in the order given.
+    The rows are locked in pk order, so concurrent allocations sharing
+    trucks wait on each other instead of deadlocking.
+    """
+
+    locked = list(
+        Truck.objects.select_for_update()
+        .filter(pk__in=truck_ids)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    available = dict(
+        get_available_trucks().filter(pk__in=locked).values_list("pk", "owned_by_id")
+    )
+    return [(pk, available[pk]) for pk in truck_ids if pk in available]
+
+
+def allocate_trips(order, triggered_by, trucks=None, start_date=None):
+    """
+    Split an order into one trip per container, each with its own truck,
+    and mark the order as assigned.
+
+    `trucks` is an optional list of truck ids to use, otherwise the best
+    placed available trucks are picked by `trips.matching`. Trips are spread
+    over the legs of the order, numbered after any trips it already has and
+    created with their initial pending event, all in one transaction with
+    the order and the trucks locked.
+    """
+
+    with transaction.atomic():
+        order = Order.objects.select_for_update().get(pk=order.pk)
+        if order.assigned:
+            raise ValidationError({"order": "Trucks have already been assigned."})
+
+        legs = get_legs(order)
+        if not legs:
+            raise ValidationError(
+                {"order": "The order needs an origin and a different destination."}
+            )
+
+        needed = get_number_of_containers(order) or 1
+        if trucks is None:
+            trucks = [match.truck_id for match in match_order(order, limit=needed)]
+        elif len(set(trucks)) != len(trucks):
+            raise ValidationError({"trucks": "A truck can only be assigned once."})
+
+        if not trucks:
+            raise ValidationError(
+                {"trucks": "There are no available trucks for this order."}
+            )
+        if len(trucks) != needed:
+            raise ValidationError(
+                {"trucks": f"The order needs {needed} trucks, got {len(trucks)}."}
+            )
+
+        available = _lock_available_trucks(trucks)
+        if len(available) != needed:
+            busy = sorted(set(trucks) - {pk for pk, _ in available})
+            raise ValidationError(
+                {"trucks": f"Trucks {busy} are not available for trips."}
+            )
+
+        last_number = order.trips.aggregate(last=Max("trip_number"))["last"] or 0
+        start_date = start_date or timezone.now()
+
+        trips = Trip.objects.bulk_create(
+            [
+                Trip(
+                    order=order,
+                    truck_id=truck_id,
+                    transporter_id=transporter_id,
+                    origin=origin,
+                    destination=destination,
+                    start_date=start_date,
+                    trip_number=last_number + number,
+                    description=f"Trip {number} of {needed} for {order.title}",
+                    loading_point_contact_id=order.loading_point_contact_id,
+                    offloading_point_contact_id=order.offloading_point_contact_id,
+                )
+                for number, (truck_id, transporter_id), (origin, destination) in zip(
+                    range(1, needed + 1), available, cycle(legs)
+                )
+            ]
+        )
+        Event.objects.bulk_create(
+            [
+                Event(
+                    name="P",
+                    trip=trip,
+                    triggered_by=triggered_by,
+                    description="Trip created",
+                )
+                for trip in trips
+            ]
+        )
+
+        order.assigned = True
+        order.status = "AS"
+        order.save(update_fields=["assigned", "status", "updated_at"])
+
+    return trips
@@ -0,0 +1,114 @@
+import random
+import time
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from trips.models import Trip
+from trips.telematics import PingBuffer, parse_pings, write_pings
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate device uploads for trucks on active trips and push them through "
+        "ping validation and the ping buffer, reporting the sustained pings per "
+        "second of a single worker. Writes happen in a transaction that is rolled "
+        "back; --dry-run skips the database to measure the in-memory path."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pings", type=int, default=100000)
+        parser.add_argument("--per-request", type=int, default=100)
+        parser.add_argument("--trucks", type=int, default=50)
+        parser.add_argument(
+            "--buffer-size", type=int, default=settings.TELEMATICS_BUFFER_SIZE
+        )
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            truck_ids = list(range(1, options["trucks"] + 1))
+        else:
+            truck_ids = list(
+                Trip.active_objects.get_active()
+                .order_by()
+                .values_list("truck_id", flat=True)
+                .distinct()[: options["trucks"]]
+            )
+            if not truck_ids:
+                raise CommandError(
+                    "No trucks are on an active trip, allocate some or use --dry-run."
+                )
+
+        uploads = self.generate_uploads(truck_ids, options)
+        flushes = []
+
+        def writer(pings):
+            started = time.perf_counter()
+            if not options["dry_run"]:
+                write_pings(pings)
+            flushes.append(time.perf_counter() - started)
+
+        # only the size threshold applies, a timer thread would write outside
+        # the transaction that is rolled back
+        buffer = PingBuffer(writer, max_size=options["buffer_size"], max_age=0)
+
+        with nullcontext() if options["dry_run"] else transaction.atomic():
+            started = time.perf_counter()
+            for upload in uploads:
+                pings, _ = parse_pings(upload)
+                buffer.add(pings)
+            buffer.flush()
+            elapsed = time.perf_counter() - started
+
+            if not options["dry_run"]:
+                transaction.set_rollback(True)
+
+        total = sum(len(upload) for upload in uploads)
+        self.stdout.write(
+            f"{total} pings in {len(uploads)} uploads: {total / elapsed:,.0f} pings/s"
+        )
+        if flushes:
+            self.stdout.write(
+                f"{len(flushes)} flushes of up to {options['buffer_size']} pings, "
+                f"{sum(flushes) / len(flushes) * 1000:.1f} ms each on average"
+            )
+
+    def generate_uploads(self, truck_ids, options):
+        """build the json payloads devices would send, before timing starts"""
+        rng = random.Random(options["seed"])
+        now = timezone.now()
+        positions = {
+            truck_id: [rng.uniform(-5, 5), rng.uniform(33, 42)]
+            for truck_id in truck_ids
+        }
+
+        uploads = []
+        upload = []
+        for index in range(options["pings"]):
+            truck_id = truck_ids[index % len(truck_ids)]
+            position = positions[truck_id]
+            position[0] += rng.uniform(-0.001, 0.001)
+            position[1] += rng.uniform(-0.001, 0.001)
+            upload.append(
+                {
+                    "truck": truck_id,
+                    "recorded_at": (
+                        now + timedelta(seconds=index // len(truck_ids))
+                    ).isoformat(),
+                    "latitude": position[0],
+                    "longitude": position[1],
+                    "speed": rng.uniform(0, 80),
+                }
+            )
+            if len(upload) == options["per_request"]:
+                uploads.append(upload)
+                upload = []
+        if upload:
+            uploads.append(upload)
+        return uploads
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.models import Order
+from trips.matching import match_orders
+
+
+class Command(BaseCommand):
+    help = (
+        "Match the backlog of pending orders to available trucks, nearest to "
+        "the order's origin first. Matches are only reported, not assigned."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, help="only match the oldest LIMIT pending orders"
+        )
+        parser.add_argument(
+            "--trucks-per-order",
+            type=int,
+            help="trucks to offer each order instead of one per container",
+        )
+
+    def handle(self, *args, **options):
+        orders = Order.active_objects.get_pending().order_by("created_at", "pk")
+        if options["limit"]:
+            orders = orders[: options["limit"]]
+        orders = list(orders)
+
+        started = time.perf_counter()
+        matches = match_orders(orders, trucks_per_order=options["trucks_per_order"])
+        elapsed = time.perf_counter() - started
+
+        for order in orders:
+            trucks = ", ".join(
+                match.reg_no
+                if match.distance_km is None
+                else f"{match.reg_no} ({match.distance_km:.1f} km)"
+                for match in matches[order.pk]
+            )
+            self.stdout.write(f"{order.tracking_id}: {trucks or 'no trucks'}")
+
+        matched = sum(1 for trucks in matches.values() if trucks)
+        self.stdout.write(
+            f"matched {matched} of {len(orders)} pending orders in {elapsed:.2f}s"
+        )
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from trips.models import RatingDay, TransporterRating, TruckRating
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the recent rating averages of transporters and trucks to the "
+        "current window. Run it daily so ratings that fall out of the window "
+        "stop counting."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recompute every rating aggregate from the ratings.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["rebuild"]:
+                RatingDay.objects.rebuild()
+                transporters = TransporterRating.objects.rebuild()
+                trucks = TruckRating.objects.rebuild()
+            else:
+                transporters = TransporterRating.objects.refresh_recent()
+                trucks = TruckRating.objects.refresh_recent()
+        self.stdout.write(
+            f"refreshed {transporters} transporter and {trucks} truck ratings"
+        )
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from trips.telematics import get_ping_buffer
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the truck pings that were spooled to disk because the database "
+        "could not be reached when they were flushed."
+    )
+
+    def handle(self, *args, **options):
+        replayed, failed = get_ping_buffer().replay_spool()
+        self.stdout.write(f"replayed {replayed} pings")
+        if failed:
+            self.stderr.write(
+                f"{failed} pings could not be written and were set aside in "
+                f"{settings.TELEMATICS_SPOOL_PATH}.failed"
+            )
@@ -0,0 +1,170 @@
+from collections import defaultdict, namedtuple
+from itertools import chain, islice
+
+from django.db.models import Exists, F, OuterRef, prefetch_related_objects
+
+from assets.models import Truck
+from depots.geo import haversine_matrix
+from orders.quotes import get_number_of_containers
+from trips.models import Trip, TruckPosition
+
+# a candidate truck for an order, `distance_km` is None when the truck has no
+# known location and `transporter_rating` when the transporter has no recent
+# ratings
+Match = namedtuple(
+    "Match", "truck_id reg_no type transporter_id transporter_rating distance_km"
+)
+
+
+def get_available_trucks(truck_types=None):
+    """
+    Return the trucks of approved transporters that are not on an active
+    trip, optionally only those of the given types.
+    """
+
+    on_trip = Trip.active_objects.get_active().filter(truck=OuterRef("pk"))
+    trucks = (
+        Truck.active_objects.all_objects()
+        .filter(
+            owned_by__is_deleted=False, owned_by__company__onboarding_status="approved",
+        )
+        .annotate(on_trip=Exists(on_trip))
+        .filter(on_trip=False)
+    )
+
+    if truck_types is not None:
+        trucks = trucks.filter(type__in=truck_types)
+    return trucks
+
+
+def get_truck_locations(trucks):
+    """
+    Return `{truck.pk: (latitude, longitude)}` with the last known location
+    of the trucks: the position they last reported, or else the destination
+    of the latest trip they took. Trucks with neither are left out.
+    """
+
+    truck_ids = list(trucks.values_list("pk", flat=True))
+    locations = {
+        truck_id: (position["latitude"], position["longitude"])
+        for truck_id, position in TruckPosition.objects.get_positions(truck_ids).items()
+    }
+
+    unreported = [truck_id for truck_id in truck_ids if truck_id not in locations]
+    if unreported:
+        latest_trips = (
+            Trip.active_objects.all_objects()
+            .filter(truck_id__in=unreported, destination__latitude__isnull=False)
+            .order_by("truck_id", "-start_date")
+            .distinct("truck_id")
+            .values_list("truck_id", "destination__latitude", "destination__longitude")
+        )
+        locations.update((truck_id, (lat, lon)) for truck_id, lat, lon in latest_trips)
+    return locations
+
+
+def normalize_truck_type(truck_type):
+    return (truck_type or "").strip().lower()
+
+
+def match_orders(orders, trucks_per_order=None):
+    """
+    Match pending orders to available trucks of their desired type, nearest
+    to one of the order's origin depots first.
+
+    Returns `{order.pk: [Match, ...]}`. Orders are served oldest first and a
+    truck is only offered to one order, so a whole backlog can be matched in
+    one run. Each order gets as many trucks as it has containers, or
+    `trucks_per_order` when given. Trucks without a known location are
+    offered after the located ones, trucks at the same distance or without
+    a location go to the best recently rated transporter first.
+
+    The candidates are read with one query per truck type and the distances
+    from every origin to every truck of a type are computed in a single
+    vectorised pass.
+    """
+
+    orders = sorted(orders, key=lambda order: (order.created_at, order.pk))
+    prefetch_related_objects(orders, "origin")
+
+    orders_by_type = defaultdict(list)
+    for order in orders:
+        orders_by_type[normalize_truck_type(order.desired_truck_type)].append(order)
+
+    matches = {order.pk: [] for order in orders}
+    for truck_type, typed_orders in orders_by_type.items():
+        trucks = get_available_trucks([truck_type])
+        # the rating is read from the transporter's maintained aggregate
+        rating = F("owned_by__rating_aggregate__recent_average")
+        candidates = list(
+            trucks.order_by(rating.desc(nulls_last=True), "pk").values_list(
+                "pk",
+                "reg_no",
+                "type",
+                "owned_by_id",
+                "owned_by__rating_aggregate__recent_average",
+            )
+        )
+        if not candidates:
+            continue
+
+        locations = get_truck_locations(trucks)
+        taken = set()
+        for order, ranked in zip(
+            typed_orders, _rank_candidates(typed_orders, candidates, locations)
+        ):
+            needed = trucks_per_order or get_number_of_containers(order) or 1
+            free = (match for match in ranked if match.truck_id not in taken)
+            matches[order.pk] = list(islice(free, needed))
+            taken.update(match.truck_id for match in matches[order.pk])
+
+    return matches
+
+
+def _rank_candidates(orders, candidates, locations):
+    """
+    Lazily yield the candidates of each order as Matches, nearest first.
+    """
+
+    located = [candidate for candidate in candidates if candidate[0] in locations]
+    unlocated = [
+        Match(*candidate, None)
+        for candidate in candidates
+        if candidate[0] not in locations
+    ]
+
+    depots = {depot.pk: depot for order in orders for depot in order.origin.all()}
+    depots = {pk: depot for pk, depot in depots.items() if depot.latitude is not None}
+    rows = {pk: row for row, pk in enumerate(depots)}
+
+    distances = None
+    if located and depots:
+        distances = haversine_matrix(
+            [depot.position for depot in depots.values()],
+            [locations[candidate[0]] for candidate in located],
+        )
+
+    for order in orders:
+        origin_rows = [
+            rows[depot.pk] for depot in order.origin.all() if depot.pk in rows
+        ]
+        if distances is None or not origin_rows:
+            yield chain((Match(*candidate, None) for candidate in located), unlocated)
+            continue
+
+        nearest = distances[origin_rows].min(axis=0)
+        yield chain(
+            (
+                Match(*located[index], float(nearest[index]))
+                for index in nearest.argsort(kind="stable")
+            ),
+            unlocated,
+        )
+
+
+def match_order(order, limit=10):
+    """
+    Return up to `limit` candidate trucks for a single order, nearest first.
+    """
+
+    return match_orders([order], trucks_per_order=limit)[order.pk]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.7 on 2026-10-18 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0005_auto_20200319_1109"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                fields=["truck", "-start_date"], name="trips_trip_truck_i_2da53c_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 2.2.7 on 2026-10-18 12:28
+
+from datetime import timedelta
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_tracking_data(apps, schema_editor):
+    """
+    Move the "latitude,longitude" strings of `Trip.tracking_data` into
+    tracking points. The array kept no times, so fixes are spaced a second
+    apart from the start of the trip to preserve their order. Entries that
+    are not coordinates are dropped.
+    """
+    Trip = apps.get_model("trips", "Trip")
+    TrackingPoint = apps.get_model("trips", "TrackingPoint")
+
+    batch = []
+    trips = Trip.objects.exclude(tracking_data=[]).only(
+        "id", "start_date", "tracking_data"
+    )
+    for trip in trips.iterator(chunk_size=500):
+        for index, fix in enumerate(trip.tracking_data or []):
+            try:
+                latitude, longitude = (float(value) for value in fix.split(","))
+            except (AttributeError, ValueError):
+                continue
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                continue
+
+            batch.append(
+                TrackingPoint(
+                    trip_id=trip.id,
+                    recorded_at=trip.start_date + timedelta(seconds=index),
+                    latitude=latitude,
+                    longitude=longitude,
+                )
+            )
+        if len(batch) >= 5000:
+            TrackingPoint.objects.bulk_create(batch)
+            batch = []
+
+    if batch:
+        TrackingPoint.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0006_auto_20261018_1526"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrackingPoint",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("recorded_at", models.DateTimeField()),
+                (
+                    "latitude",
+                    models.FloatField(
+                        validators=[
+                            django.core.validators.MinValueValidator(-90),
+                            django.core.validators.MaxValueValidator(90),
+                        ]
+                    ),
+                ),
+                (
+                    "longitude",
+                    models.FloatField(
+                        validators=[
+                            django.core.validators.MinValueValidator(-180),
+                            django.core.validators.MaxValueValidator(180),
+                        ]
+                    ),
+                ),
+                (
+                    "speed",
+                    models.FloatField(
+                        blank=True,
+                        null=True,
+                        validators=[django.core.validators.MinValueValidator(0)],
+                    ),
+                ),
+                (
+                    "trip",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tracking_points",
+                        to="trips.Trip",
+                    ),
+                ),
+            ],
+            options={"unique_together": {("trip", "recorded_at")},},
+        ),
+        migrations.RunPython(copy_tracking_data, migrations.RunPython.noop),
+        migrations.RemoveField(model_name="trip", name="tracking_data",),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 2.2.7 on 2026-10-18 12:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assets", "0005_auto_20261018_1526"),
+        ("trips", "0007_trackingpoint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TruckPosition",
+            fields=[
+                (
+                    "truck",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="position",
+                        serialize=False,
+                        to="assets.Truck",
+                    ),
+                ),
+                ("recorded_at", models.DateTimeField()),
+                ("latitude", models.FloatField()),
+                ("longitude", models.FloatField()),
+                ("speed", models.FloatField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "trip",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="trips.Trip",
+                    ),
+                ),
+            ],
+        ),
+    ]
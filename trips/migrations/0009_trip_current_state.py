@@ -0,0 +1,73 @@
+# Generated by Django 2.2.7 on 2026-10-18 12:32
+
+from django.db import migrations, models
+
+# copied from trips.models, migrations must not import the live models
+STATE_FOR_STATUS = {"P": "P", "S": "S", "O": "O", "D": "F"}
+STATUS_FOR_STATE = {
+    "P": "P",
+    "A": "P",
+    "L": "P",
+    "S": "S",
+    "O": "O",
+    "STP": "O",
+    "F": "D",
+}
+
+
+def set_current_state(apps, schema_editor):
+    """
+    Set the state of existing trips from their latest event, or from their
+    status for trips without events, and bring the status in line with it.
+    """
+    Trip = apps.get_model("trips", "Trip")
+    Event = apps.get_model("trips", "Event")
+
+    latest_events = dict(
+        Event.objects.filter(is_deleted=False)
+        .order_by("trip_id", "-created_at", "-id")
+        .distinct("trip_id")
+        .values_list("trip_id", "name")
+    )
+
+    batch = []
+    for trip in Trip.objects.only("id", "status").iterator(chunk_size=2000):
+        state = latest_events.get(trip.id) or STATE_FOR_STATUS.get(trip.status, "P")
+        trip.current_state = state
+        trip.status = STATUS_FOR_STATE.get(state, trip.status)
+        batch.append(trip)
+        if len(batch) == 2000:
+            Trip.objects.bulk_update(batch, ["current_state", "status"])
+            batch = []
+
+    if batch:
+        Trip.objects.bulk_update(batch, ["current_state", "status"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0008_truckposition"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="trip",
+            name="current_state",
+            field=models.CharField(
+                choices=[
+                    ("P", "pending"),
+                    ("A", "accepted"),
+                    ("L", "loaded"),
+                    ("S", "started"),
+                    ("O", "on journey"),
+                    ("STP", "stopped"),
+                    ("F", "finished"),
+                ],
+                db_index=True,
+                default="P",
+                max_length=3,
+            ),
+        ),
+        migrations.RunPython(set_current_state, migrations.RunPython.noop),
+    ]
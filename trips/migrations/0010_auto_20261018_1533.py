@@ -0,0 +1,19 @@
+# Generated by Django 2.2.7 on 2026-10-18 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trips", "0009_trip_current_state"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="trips_trip_created_6c0d75_idx"
+            ),
+        ),
+    ]
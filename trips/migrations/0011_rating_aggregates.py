@@ -0,0 +1,179 @@
+# Generated by Django 2.2.7 on 2026-10-18 12:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+# copied from trips.models, migrations must not import the live models
+RATING_WINDOW_DAYS = 90
+
+
+def build_rating_aggregates(apps, schema_editor):
+    """
+    Build the daily rating totals and the transporter and truck aggregates
+    from the ratings that exist.
+    """
+
+    Rating = apps.get_model("trips", "Rating")
+    RatingDay = apps.get_model("trips", "RatingDay")
+    TransporterRating = apps.get_model("trips", "TransporterRating")
+    TruckRating = apps.get_model("trips", "TruckRating")
+
+    days = (
+        Rating.objects.filter(is_deleted=False)
+        .annotate(day=TruncDate("created_at"))
+        .values("trip__transporter_id", "trip__truck_id", "day")
+        .annotate(count=Count("id"), total=Sum("points"))
+    )
+    RatingDay.objects.bulk_create(
+        [
+            RatingDay(
+                transporter_id=row["trip__transporter_id"],
+                truck_id=row["trip__truck_id"],
+                day=row["day"],
+                count=row["count"],
+                total=row["total"],
+            )
+            for row in days
+        ],
+        batch_size=2000,
+    )
+
+    since = timezone.localdate() - timezone.timedelta(days=RATING_WINDOW_DAYS)
+    for model, field in ((TransporterRating, "transporter"), (TruckRating, "truck")):
+        totals = RatingDay.objects.values(field).annotate(
+            count=Sum("count"), total=Sum("total")
+        )
+        recent = {
+            row[field]: (row["count"], row["total"])
+            for row in RatingDay.objects.filter(day__gt=since)
+            .values(field)
+            .annotate(count=Sum("count"), total=Sum("total"))
+        }
+
+        aggregates = []
+        for row in totals:
+            recent_count, recent_total = recent.get(row[field], (0, 0))
+            aggregates.append(
+                model(
+                    **{f"{field}_id": row[field]},
+                    count=row["count"],
+                    total=row["total"],
+                    average=row["total"] / row["count"] if row["count"] else None,
+                    recent_count=recent_count,
+                    recent_total=recent_total,
+                    recent_average=(
+                        recent_total / recent_count if recent_count else None
+                    ),
+                )
+            )
+        model.objects.bulk_create(aggregates, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("companies", "0011_auto_20261018_1515"),
+        ("assets", "0005_auto_20261018_1526"),
+        ("trips", "0010_auto_20261018_1533"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TransporterRating",
+            fields=[
+                ("count", models.IntegerField(default=0)),
+                ("total", models.IntegerField(default=0)),
+                ("average", models.FloatField(blank=True, db_index=True, null=True)),
+                ("recent_count", models.IntegerField(default=0)),
+                ("recent_total", models.IntegerField(default=0)),
+                (
+                    "recent_average",
+                    models.FloatField(blank=True, db_index=True, null=True),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "transporter",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="rating_aggregate",
+                        serialize=False,
+                        to="companies.TransporterCompany",
+                    ),
+                ),
+            ],
+            options={"abstract": False,},
+        ),
+        migrations.CreateModel(
+            name="TruckRating",
+            fields=[
+                ("count", models.IntegerField(default=0)),
+                ("total", models.IntegerField(default=0)),
+                ("average", models.FloatField(blank=True, db_index=True, null=True)),
+                ("recent_count", models.IntegerField(default=0)),
+                ("recent_total", models.IntegerField(default=0)),
+                (
+                    "recent_average",
+                    models.FloatField(blank=True, db_index=True, null=True),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "truck",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="rating_aggregate",
+                        serialize=False,
+                        to="assets.Truck",
+                    ),
+                ),
+            ],
+            options={"abstract": False,},
+        ),
+        migrations.CreateModel(
+            name="RatingDay",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("count", models.IntegerField(default=0)),
+                ("total", models.IntegerField(default=0)),
+                (
+                    "transporter",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="companies.TransporterCompany",
+                    ),
+                ),
+                (
+                    "truck",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="assets.Truck",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="ratingday",
+            index=models.Index(
+                fields=["truck", "day"], name="trips_ratin_truck_i_8f879e_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="ratingday", unique_together={("transporter", "truck", "day")},
+        ),
+        migrations.RunPython(build_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,13 @@
-from django.db import models
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, models, transaction
+from django.db.models.functions import TruncDate
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.utils import timezone
 from django.utils.timezone import make_aware
-from django.contrib.postgres.fields import HStoreField, ArrayField
+from django.contrib.postgres.fields import HStoreField
 
 from companies.models import TransporterCompany, CargoOwnerCompany
 from utils.models import AbstractBaseModel, ActiveObjectsQuerySet
@@ -42,6 +47,90 @@ class TripManager(models.Manager):
         return trip
 
 
+# the states of a trip, each recorded by an Event
+TRIP_STATES = (
+    ("P", "pending"),
+    ("A", "accepted"),
+    ("L", "loaded"),
+    ("S", "started"),
+    ("O", "on journey"),
+    ("STP", "stopped"),
+    ("F", "finished"),
+)
+# the states a trip can move on to from each state
+TRIP_TRANSITIONS = {
+    "P": ("A",),
+    "A": ("L",),
+    "L": ("S",),
+    "S": ("O", "STP", "F"),
+    "O": ("STP", "F"),
+    "STP": ("O", "F"),
+    "F": (),
+}
+# the Trip.status that goes with each state
+TRIP_STATUS_FOR_STATE = {
+    "P": "P",
+    "A": "P",
+    "L": "P",
+    "S": "S",
+    "O": "O",
+    "STP": "O",
+    "F": "D",
+}
+
+
+class TripQuerySet(ActiveObjectsQuerySet):
+    """queryset to handle trip model"""
+
+    def get_active(self):
+        """return trips that are pending or under way"""
+        return self._active().filter(status__in=Trip.ACTIVE_STATUSES)
+
+    def with_details(self):
+        """
+        Load everything trip serializers show in a fixed number of queries:
+        the related rows in the main query, then the events and ratings of
+        all the trips at once, newest first.
+        """
+        return self.select_related(
+            "order",
+            "truck",
+            "origin",
+            "destination",
+            "transporter__company__company_director",
+            "loading_point_contact",
+            "offloading_point_contact",
+            "invoice",
+        ).prefetch_related(
+            models.Prefetch(
+                "events",
+                queryset=Event.objects.filter(is_deleted=False).order_by(
+                    "-created_at", "-id"
+                ),
+                to_attr="latest_events",
+            ),
+            models.Prefetch(
+                "ratings",
+                queryset=Rating.objects.filter(is_deleted=False).order_by(
+                    "-created_at", "-id"
+                ),
+                to_attr="active_ratings",
+            ),
+        )
+
+    def get_in_state(self, state=None):
+        """return trips currently in a state, eg all trips on journey"""
+        return self._active().filter(current_state=state)
+
+    def get_transporter_trips(self, transporter=None):
+        """return trips carried out by a transporter"""
+        return self._active().filter(transporter=transporter)
+
+    def get_cargo_owner_trips(self, cargo_owner=None):
+        """return trips carrying the orders of a cargo owner"""
+        return self._active().filter(order__owner=cargo_owner)
+
+
 class Trip(AbstractBaseModel, models.Model):
     """
     This is a model of a Trip entity.
@@ -53,6 +142,8 @@ class Trip(AbstractBaseModel, models.Model):
         ("O", "Ongoing"),
         ("D", "Delivered"),
     ]
+    # a truck on a trip in one of these states is not available
+    ACTIVE_STATUSES = ("P", "S", "O")
 
     start_date = models.DateTimeField()
     end_date = models.DateTimeField(null=True, blank=True)
@@ -69,13 +160,16 @@ class Trip(AbstractBaseModel, models.Model):
         "depots.Depot", related_name="trip_destinations", on_delete=models.CASCADE
     )
     status = models.CharField(max_length=1, choices=STATUS_CHOICES, default="P")
+    # name of the latest event, kept in step by `Event.objects.create_event`
+    current_state = models.CharField(
+        max_length=3, choices=TRIP_STATES, default="P", db_index=True
+    )
     description = models.CharField(max_length=1000)
     # Do we need a trip number? So as to identify each trip for an order?
     trip_number = models.IntegerField()
     transporter = models.ForeignKey(
         TransporterCompany, on_delete=models.CASCADE, related_name="trips"
     )
-    tracking_data = ArrayField(base_field=models.CharField(max_length=50), blank=True)
     offloading_point_contact = models.ForeignKey(
         "companies.PersonOfContact",
         on_delete=models.CASCADE,
@@ -88,7 +182,15 @@ class Trip(AbstractBaseModel, models.Model):
     )
 
     objects = TripManager()
-    active_objects = ActiveObjectsQuerySet.as_manager()
+    active_objects = TripQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # backs the cursor pagination of list endpoints
+            models.Index(fields=["-created_at", "-id"]),
+            # backs truck availability checks and the last trip of a truck
+            models.Index(fields=["truck", "-start_date"]),
+        ]
 
     def __str__(self):
         return f"Trip no. {self.trip_number} for {self.order}."
@@ -209,30 +311,103 @@ class Rating(AbstractBaseModel, models.Model):
     def __str__(self):
         return f"Review by {self.reviewer.company_name} for {self.trip}."
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        rating = super().from_db(db, field_names, values)
+        if "points" in rating.__dict__ and "is_deleted" in rating.__dict__:
+            rating._counted_points = rating._points_counted()
+        return rating
+
+    def _points_counted(self):
+        """
+        Points the rating adds to the rating aggregates, None when it is not
+        counted.
+        """
+
+        return None if self.is_deleted else self.points
+
+    def _points_counted_before(self):
+        if self._state.adding:
+            return None
+        if not hasattr(self, "_counted_points"):
+            saved = Rating.objects.filter(pk=self.pk).values("is_deleted", "points")
+            saved = saved.first()
+            self._counted_points = (
+                None if saved is None or saved["is_deleted"] else saved["points"]
+            )
+        return self._counted_points
+
+    def save(self, *args, **kwargs):
+        """
+        Save the rating and apply the change it makes to the rating
+        aggregates of the trip's transporter and truck: a new or restored
+        rating is added, a soft deleted one removed and a changed one
+        adjusted, all in the same transaction.
+        """
+
+        with transaction.atomic():
+            before = self._points_counted_before()
+            after = self._points_counted()
+            super().save(*args, **kwargs)
+            count_delta = (after is not None) - (before is not None)
+            points_delta = (after or 0) - (before or 0)
+            if count_delta or points_delta:
+                apply_rating_change(self, count_delta, points_delta)
+
+        self._counted_points = after
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            before = self._points_counted_before()
+            if before is not None:
+                apply_rating_change(self, -1, -before)
+            return super().delete(*args, **kwargs)
+
 
 class EventManager(models.Manager):
     """events manager """
 
     def create_event(self, **kwargs):
+        """
+        Record that a trip moved to a new state. The move must be allowed by
+        `TRIP_TRANSITIONS`, and the trip's state and status are updated in
+        the same transaction as the event is written, with the trip locked so
+        concurrent events are applied one after the other.
+        """
+
         REQUIRED_ARGS = ("name", "trip", "triggered_by")
         enforce_all_required_arguments_are_truthy(kwargs, REQUIRED_ARGS)
-        event = self.model(**kwargs)
-        event.save()
+
+        with transaction.atomic():
+            trip = Trip.objects.select_for_update().get(pk=kwargs["trip"].pk)
+            name = kwargs["name"]
+            if name not in TRIP_TRANSITIONS.get(trip.current_state, ()):
+                states = dict(TRIP_STATES)
+                raise ValidationError(
+                    {
+                        "name": f"A {states[trip.current_state]} trip cannot be "
+                        f"marked as {states.get(name, name)}."
+                    }
+                )
+
+            event = self.model(**dict(kwargs, trip=trip))
+            event.save()
+
+            trip.current_state = name
+            trip.status = TRIP_STATUS_FOR_STATE[name]
+            update_fields = ["current_state", "status", "updated_at"]
+            if name == "F":
+                trip.end_date = event.created_at
+                update_fields.append("end_date")
+            trip.save(update_fields=update_fields)
+
         return event
 
 
 class Event(AbstractBaseModel, models.Model):
     """events model """
 
-    NAME_CHOICES = (
-        ("P", "pending"),
-        ("A", "accepted"),
-        ("L", "loaded"),
-        ("S", "started"),
-        ("O", "on journey"),
-        ("STP", "stopped"),
-        ("F", "finished"),
-    )
+    NAME_CHOICES = TRIP_STATES
     name = models.CharField(max_length=30, choices=NAME_CHOICES)
     description = models.CharField(max_length=100, null=True, blank=True)
     trip = models.ForeignKey(
@@ -247,3 +422,439 @@ class Event(AbstractBaseModel, models.Model):
 
     def __str__(self):
         return f"{self.trip} status {self.name}"
+
+
+class TrackingPointManager(models.Manager):
+    """
+    Manager of the GPS fixes recorded during trips.
+    """
+
+    def ingest(self, trip, points):
+        """
+        Append a batch of fixes to a trip. `points` are dicts of the model's
+        fields. A fix already stored for the same time is skipped, so a
+        batch can safely be sent again after a failed upload.
+        """
+
+        REQUIRED_ARGS = ("trip", "points")
+        enforce_all_required_arguments_are_truthy(
+            {"trip": trip, "points": points}, REQUIRED_ARGS
+        )
+
+        created = self.bulk_create(
+            [self.model(trip_id=trip.pk, **point) for point in points],
+            ignore_conflicts=True,
+        )
+        TruckPosition.objects.record(
+            [dict(point, truck_id=trip.truck_id, trip_id=trip.pk) for point in points]
+        )
+        return created
+
+    def get_track(self, trip, start=None, end=None):
+        """
+        Return the fixes of a trip between `start` (inclusive) and `end`
+        (exclusive), oldest first.
+        """
+
+        points = self.filter(trip=trip)
+        if start is not None:
+            points = points.filter(recorded_at__gte=start)
+        if end is not None:
+            points = points.filter(recorded_at__lt=end)
+        return points.order_by("recorded_at")
+
+
+class TrackingPoint(models.Model):
+    """
+    A GPS fix of the truck on a trip. Fixes are only ever appended, one
+    narrow row each, instead of rewriting the trip.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    trip = models.ForeignKey(
+        Trip, on_delete=models.CASCADE, related_name="tracking_points"
+    )
+    recorded_at = models.DateTimeField()
+    latitude = models.FloatField(
+        validators=[MinValueValidator(-90), MaxValueValidator(90)]
+    )
+    longitude = models.FloatField(
+        validators=[MinValueValidator(-180), MaxValueValidator(180)]
+    )
+    # km/h, when the device reports it
+    speed = models.FloatField(null=True, blank=True, validators=[MinValueValidator(0)])
+
+    objects = TrackingPointManager()
+
+    class Meta:
+        # a trip has one fix per instant, the index also serves time ranges
+        unique_together = ("trip", "recorded_at")
+
+    def __str__(self):
+        return (
+            f"{self.trip_id} at {self.recorded_at}: {self.latitude}, {self.longitude}"
+        )
+
+
+def position_cache_key(truck_id):
+    return f"truck-position:{truck_id}"
+
+
+class TruckPositionManager(models.Manager):
+    """
+    Manager of the last known position of each truck. Positions are kept in
+    the shared cache as well, the table is the fallback when they are not.
+    """
+
+    FIELDS = ("truck_id", "trip_id", "recorded_at", "latitude", "longitude", "speed")
+
+    def record(self, pings):
+        """
+        Move trucks to the newest of their pings. `pings` are dicts with the
+        model's fields, `trip_id` may be left out. Each truck's row is upserted
+        in a single statement that only overwrites older positions, so pings
+        arriving out of order or from several workers never move a truck back.
+        """
+
+        latest = {}
+        for ping in pings:
+            current = latest.get(ping["truck_id"])
+            if current is None or ping["recorded_at"] > current["recorded_at"]:
+                latest[ping["truck_id"]] = ping
+        if not latest:
+            return {}
+
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        columns = ", ".join(self.FIELDS + ("updated_at",))
+        placeholders = ", ".join(
+            ["(" + ", ".join(["%s"] * (len(self.FIELDS) + 1)) + ")"] * len(latest)
+        )
+        updates = ", ".join(
+            f"{field} = EXCLUDED.{field}" for field in self.FIELDS[1:] + ("updated_at",)
+        )
+        now = timezone.now()
+        params = [
+            value
+            for ping in latest.values()
+            for value in [ping.get(field) for field in self.FIELDS] + [now]
+        ]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) VALUES {placeholders} "
+                f"ON CONFLICT (truck_id) DO UPDATE SET {updates} "
+                f"WHERE {table}.recorded_at < EXCLUDED.recorded_at "
+                "RETURNING truck_id",
+                params,
+            )
+            moved = {truck_id for truck_id, in cursor.fetchall()}
+
+        positions = {
+            truck_id: self._as_position(latest[truck_id]) for truck_id in moved
+        }
+        # other processes must not read positions that may still roll back
+        transaction.on_commit(lambda: self._cache(positions))
+        return positions
+
+    def get_positions(self, truck_ids):
+        """
+        Return `{truck_id: position}` for the trucks that have reported one,
+        read from the cache with one query for the ones that are not cached.
+        """
+
+        truck_ids = list(truck_ids)
+        cached = cache.get_many([position_cache_key(pk) for pk in truck_ids])
+        positions = {
+            pk: cached[position_cache_key(pk)]
+            for pk in truck_ids
+            if position_cache_key(pk) in cached
+        }
+
+        missing = [pk for pk in truck_ids if pk not in positions]
+        if missing:
+            stored = {
+                row["truck_id"]: self._as_position(row)
+                for row in self.filter(truck_id__in=missing).values(*self.FIELDS)
+            }
+            # only fill empty keys, a newer position cached by `record` since
+            # the rows were read must not be overwritten
+            for pk, position in stored.items():
+                cache.add(
+                    position_cache_key(pk),
+                    position,
+                    timeout=settings.TRUCK_POSITION_CACHE_TTL,
+                )
+            positions.update(stored)
+        return positions
+
+    def _as_position(self, row):
+        return {field: row.get(field) for field in self.FIELDS}
+
+    def _cache(self, positions):
+        cache.set_many(
+            {position_cache_key(pk): position for pk, position in positions.items()},
+            timeout=settings.TRUCK_POSITION_CACHE_TTL,
+        )
+
+
+class TruckPosition(models.Model):
+    """
+    The last known position of a truck, from its telematics device or the
+    fixes uploaded for its trips.
+    """
+
+    truck = models.OneToOneField(
+        "assets.Truck",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="position",
+    )
+    # the trip the truck was on when it reported, if any
+    trip = models.ForeignKey(
+        Trip, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    recorded_at = models.DateTimeField()
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    speed = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TruckPositionManager()
+
+    def __str__(self):
+        return f"{self.truck_id} at {self.latitude}, {self.longitude}"
+
+
+# days of ratings the recent averages cover
+RATING_WINDOW_DAYS = 90
+
+
+def apply_rating_change(rating, count_delta, points_delta):
+    """
+    Add a change in the number of ratings and their points to the day the
+    rating was made and to the aggregates of the trip's transporter and
+    truck.
+    """
+
+    trip = rating.trip
+    day = timezone.localdate(rating.created_at)
+    RatingDay.objects.apply(
+        trip.transporter_id, trip.truck_id, day, count_delta, points_delta
+    )
+    TransporterRating.objects.apply(trip.transporter_id, count_delta, points_delta)
+    TruckRating.objects.apply(trip.truck_id, count_delta, points_delta)
+
+
+class RatingDayManager(models.Manager):
+    """
+    Manager of the daily rating totals the recent averages are summed from.
+    """
+
+    def apply(self, transporter_id, truck_id, day, count_delta, points_delta):
+        self.get_or_create(transporter_id=transporter_id, truck_id=truck_id, day=day)
+        self.filter(transporter_id=transporter_id, truck_id=truck_id, day=day).update(
+            count=models.F("count") + count_delta,
+            total=models.F("total") + points_delta,
+        )
+
+    def get_recent_totals(self, field, pks=None):
+        """
+        Return `{pk: (count, total)}` of the ratings made in the window, per
+        transporter or truck as `field` says.
+        """
+
+        since = timezone.localdate() - timezone.timedelta(days=RATING_WINDOW_DAYS)
+        days = self.filter(day__gt=since)
+        if pks is not None:
+            days = days.filter(**{f"{field}__in": pks})
+        return {
+            row[field]: (row["count"], row["total"])
+            for row in days.values(field).annotate(
+                count=models.Sum("count"), total=models.Sum("total")
+            )
+        }
+
+    def rebuild(self):
+        """
+        Recompute every daily total from the ratings that are not deleted.
+        """
+
+        self.all().delete()
+        days = (
+            Rating.objects.filter(is_deleted=False)
+            .annotate(day=TruncDate("created_at"))
+            .values("trip__transporter_id", "trip__truck_id", "day")
+            .annotate(count=models.Count("id"), total=models.Sum("points"))
+        )
+        self.bulk_create(
+            [
+                self.model(
+                    transporter_id=row["trip__transporter_id"],
+                    truck_id=row["trip__truck_id"],
+                    day=row["day"],
+                    count=row["count"],
+                    total=row["total"],
+                )
+                for row in days
+            ],
+            batch_size=2000,
+        )
+
+
+class RatingDay(models.Model):
+    """
+    Number and total points of the ratings a truck of a transporter got on
+    a day.
+    """
+
+    transporter = models.ForeignKey(
+        TransporterCompany, on_delete=models.CASCADE, related_name="+"
+    )
+    truck = models.ForeignKey(
+        "assets.Truck", on_delete=models.CASCADE, related_name="+"
+    )
+    day = models.DateField()
+    count = models.IntegerField(default=0)
+    total = models.IntegerField(default=0)
+
+    objects = RatingDayManager()
+
+    class Meta:
+        unique_together = ("transporter", "truck", "day")
+        # backs the recent totals of a truck, the unique index those of a
+        # transporter
+        indexes = [models.Index(fields=["truck", "day"])]
+
+    def __str__(self):
+        return f"{self.count} ratings of truck {self.truck_id} on {self.day}"
+
+
+class RatingAggregateManager(models.Manager):
+    """
+    Manager of the rating aggregates of transporters or trucks.
+    """
+
+    def apply(self, pk, count_delta, points_delta):
+        """
+        Add a change to the aggregate of a transporter or truck, with its row
+        locked so concurrent ratings are applied one after the other.
+        """
+
+        with transaction.atomic():
+            aggregate, _ = self.select_for_update().get_or_create(
+                **{self.model.SUBJECT_FIELD: pk}
+            )
+            aggregate.set_totals(
+                aggregate.count + count_delta, aggregate.total + points_delta
+            )
+            recent = RatingDay.objects.get_recent_totals(self.model.SUBJECT_FIELD, [pk])
+            aggregate.set_recent(*recent.get(pk, (0, 0)))
+            aggregate.save()
+        return aggregate
+
+    def get_ranked(self):
+        """
+        Return the aggregates with recent ratings, best rated first, read
+        off the index on the recent average.
+        """
+
+        return self.filter(recent_average__isnull=False).order_by(
+            "-recent_average", "pk"
+        )
+
+    def refresh_recent(self):
+        """
+        Move the recent averages of every aggregate to the current window,
+        dropping the days that fell out of it. Meant to run daily.
+        """
+
+        recent = RatingDay.objects.get_recent_totals(self.model.SUBJECT_FIELD)
+        aggregates = list(self.all())
+        for aggregate in aggregates:
+            aggregate.set_recent(*recent.get(aggregate.pk, (0, 0)))
+        self.bulk_update(
+            aggregates,
+            ["recent_count", "recent_total", "recent_average"],
+            batch_size=2000,
+        )
+        return len(aggregates)
+
+    def rebuild(self):
+        """
+        Recompute every aggregate from the daily totals.
+        """
+
+        field = self.model.SUBJECT_FIELD
+        self.all().delete()
+        totals = RatingDay.objects.values(field).annotate(
+            count=models.Sum("count"), total=models.Sum("total")
+        )
+        recent = RatingDay.objects.get_recent_totals(field)
+
+        aggregates = []
+        for row in totals:
+            aggregate = self.model(**{f"{field}_id": row[field]})
+            aggregate.set_totals(row["count"], row["total"])
+            aggregate.set_recent(*recent.get(row[field], (0, 0)))
+            aggregates.append(aggregate)
+        self.bulk_create(aggregates, batch_size=2000)
+        return len(aggregates)
+
+
+class RatingAggregate(models.Model):
+    """
+    Rating totals of a transporter or truck, kept up to date as ratings are
+    saved so they can be ranked by an indexed column.
+    """
+
+    count = models.IntegerField(default=0)
+    total = models.IntegerField(default=0)
+    average = models.FloatField(null=True, blank=True, db_index=True)
+    # the ratings of the last RATING_WINDOW_DAYS days
+    recent_count = models.IntegerField(default=0)
+    recent_total = models.IntegerField(default=0)
+    recent_average = models.FloatField(null=True, blank=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = RatingAggregateManager()
+
+    class Meta:
+        abstract = True
+
+    def set_totals(self, count, total):
+        self.count = count
+        self.total = total
+        self.average = total / count if count else None
+
+    def set_recent(self, count, total):
+        self.recent_count = count
+        self.recent_total = total
+        self.recent_average = total / count if count else None
+
+
+class TransporterRating(RatingAggregate):
+    SUBJECT_FIELD = "transporter"
+
+    transporter = models.OneToOneField(
+        TransporterCompany,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="rating_aggregate",
+    )
+
+    def __str__(self):
+        return f"{self.transporter_id} rated {self.average} from {self.count} ratings"
+
+
+class TruckRating(RatingAggregate):
+    SUBJECT_FIELD = "truck"
+
+    truck = models.OneToOneField(
+        "assets.Truck",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="rating_aggregate",
+    )
+
+    def __str__(self):
+        return f"{self.truck_id} rated {self.average} from {self.count} ratings"
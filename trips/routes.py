@@ -0,0 +1,126 @@
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from depots.geo import EARTH_RADIUS_KM
+from trips.models import TrackingPoint
+
+# metres covered by a map pixel at the equator at zoom level 0, halved with
+# every zoom level
+METRES_PER_PIXEL = 156543.03392
+MIN_ZOOM = 0
+MAX_ZOOM = 20
+
+
+def get_tolerance(zoom, latitude=0.0):
+    """
+    Simplification tolerance in metres for a zoom level, the length of a
+    pixel there. Points closer than that to the line would not show.
+    """
+
+    return METRES_PER_PIXEL * math.cos(math.radians(latitude)) / 2 ** zoom
+
+
+def simplify(points, tolerance):
+    """
+    Simplify a track of `(latitude, longitude)` points with the
+    Douglas-Peucker algorithm and return the points kept, in order.
+    `tolerance` is in metres.
+
+    The points are projected to local metres and the distances of every
+    point of a span to its chord are computed in one vectorised pass, the
+    spans to split are kept on a stack instead of recursing.
+    """
+
+    # numpy is slow to import and only needed here, keep it off startup
+    import numpy as np
+
+    track = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(track) < 3:
+        return track.tolist()
+
+    radius = EARTH_RADIUS_KM * 1000
+    latitudes = np.radians(track[:, 0])
+    scale = math.cos(float(latitudes.mean()))
+    xy = np.column_stack((radius * np.radians(track[:, 1]) * scale, radius * latitudes))
+
+    keep = np.zeros(len(track), dtype=bool)
+    keep[0] = keep[-1] = True
+    spans = [(0, len(track) - 1)]
+    while spans:
+        start, end = spans.pop()
+        if end - start < 2:
+            continue
+
+        inner = xy[start + 1 : end] - xy[start]
+        dx, dy = xy[end] - xy[start]
+        length = math.hypot(dx, dy)
+        if length == 0:
+            distances = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            distances = np.abs(dx * inner[:, 1] - dy * inner[:, 0]) / length
+
+        farthest = int(distances.argmax())
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            spans.append((start, split))
+            spans.append((split, end))
+
+    return track[keep].tolist()
+
+
+def encode_polyline(points, precision=5):
+    """
+    Encode `(latitude, longitude)` points with the Google encoded polyline
+    algorithm that map libraries decode natively.
+    """
+
+    factor = 10 ** precision
+    encoded = []
+    previous_lat = previous_lon = 0
+    for latitude, longitude in points:
+        lat = int(round(latitude * factor))
+        lon = int(round(longitude * factor))
+        for delta in (lat - previous_lat, lon - previous_lon):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                encoded.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            encoded.append(chr(value + 63))
+        previous_lat, previous_lon = lat, lon
+    return "".join(encoded)
+
+
+def get_route(trip, zoom):
+    """
+    Return the simplified route of a trip at a zoom level as an encoded
+    polyline, with the number of points before and after simplifying.
+
+    Routes are cached per trip and zoom level under a key that includes the
+    number of fixes and the latest fix time, so new fixes produce a new
+    route.
+    """
+
+    track = TrackingPoint.objects.get_track(trip)
+    version = track.aggregate(count=Count("id"), last=Max("recorded_at"))
+    last = version["last"].isoformat() if version["last"] else ""
+    key = f"trip-route:{trip.pk}:{zoom}:{version['count']}:{last}"
+
+    route = cache.get(key)
+    if route is None:
+        points = list(track.values_list("latitude", "longitude"))
+        latitude = sum(point[0] for point in points) / len(points) if points else 0
+        tolerance = get_tolerance(zoom, latitude)
+        simplified = simplify(points, tolerance)
+        route = {
+            "zoom": zoom,
+            "tolerance": round(tolerance, 2),
+            "points": len(simplified),
+            "original_points": len(points),
+            "polyline": encode_polyline(simplified),
+        }
+        cache.set(key, route, timeout=settings.TRIP_ROUTE_CACHE_TTL)
+    return route
@@ -0,0 +1,178 @@
+from django.core.exceptions import ObjectDoesNotExist
+from rest_framework import serializers
+
+from assets.models import Truck
+from companies.serializers import (
+    PersonofContactSerializer,
+    TransporterSummarySerializer,
+)
+from depots.serializers import DepotSerializer
+from orders.models import Order
+from .models import Trip, TripInvoice, Rating, Event, TrackingPoint
+
+# most GPS fixes accepted in one upload
+MAX_TRACKING_BATCH = 1000
+# events shown with each trip, the full history is at the trip's events endpoint
+LATEST_TRIP_EVENTS = 5
+
+
+class EventSerializer(serializers.ModelSerializer):
+    """serializes the events of a trip"""
+
+    class Meta:
+        model = Event
+        fields = ["id", "name", "description", "triggered_by", "created_at"]
+        read_only_fields = ["triggered_by", "created_at"]
+
+
+class TripSerializer(serializers.ModelSerializer):
+    """serializes trips"""
+
+    order = serializers.UUIDField(source="order.tracking_id", read_only=True)
+
+    class Meta:
+        model = Trip
+        fields = [
+            "id",
+            "trip_number",
+            "order",
+            "truck",
+            "transporter",
+            "origin",
+            "destination",
+            "status",
+            "current_state",
+            "start_date",
+            "end_date",
+            "description",
+            "loading_point_contact",
+            "offloading_point_contact",
+        ]
+        read_only_fields = fields
+
+
+class TripOrderSerializer(serializers.ModelSerializer):
+    """compact order representation embedded in trips"""
+
+    class Meta:
+        model = Order
+        fields = [
+            "tracking_id",
+            "title",
+            "status",
+            "order_type",
+            "cargo_tonnage",
+            "number_of_containers",
+        ]
+        read_only_fields = fields
+
+
+class TripTruckSerializer(serializers.ModelSerializer):
+    """compact truck representation embedded in trips"""
+
+    class Meta:
+        model = Truck
+        fields = ["id", "reg_no", "name", "type", "haulage", "tracking"]
+        read_only_fields = fields
+
+
+class TripInvoiceSerializer(serializers.ModelSerializer):
+    """serializes the invoice of a trip"""
+
+    class Meta:
+        model = TripInvoice
+        fields = ["id", "charges", "description", "created_at"]
+        read_only_fields = fields
+
+
+class RatingSerializer(serializers.ModelSerializer):
+    """serializes the ratings of a trip"""
+
+    class Meta:
+        model = Rating
+        fields = ["id", "reviewer", "body", "points", "created_at"]
+        read_only_fields = fields
+
+
+class TripDetailSerializer(serializers.ModelSerializer):
+    """
+    Trip with its related objects. Querysets should use
+    `Trip.active_objects.with_details()` so that serializing a page of trips
+    costs a fixed number of queries.
+    """
+
+    order = TripOrderSerializer(read_only=True)
+    truck = TripTruckSerializer(read_only=True)
+    transporter = TransporterSummarySerializer(read_only=True)
+    origin = DepotSerializer(read_only=True)
+    destination = DepotSerializer(read_only=True)
+    loading_point_contact = PersonofContactSerializer(read_only=True)
+    offloading_point_contact = PersonofContactSerializer(read_only=True)
+    latest_events = serializers.SerializerMethodField()
+    invoice = serializers.SerializerMethodField()
+    ratings = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Trip
+        fields = [
+            "id",
+            "trip_number",
+            "status",
+            "current_state",
+            "start_date",
+            "end_date",
+            "description",
+            "order",
+            "truck",
+            "transporter",
+            "origin",
+            "destination",
+            "loading_point_contact",
+            "offloading_point_contact",
+            "latest_events",
+            "invoice",
+            "ratings",
+        ]
+        read_only_fields = fields
+
+    def get_latest_events(self, trip):
+        return EventSerializer(trip.latest_events[:LATEST_TRIP_EVENTS], many=True).data
+
+    def get_invoice(self, trip):
+        try:
+            return TripInvoiceSerializer(trip.invoice).data
+        except ObjectDoesNotExist:
+            return None
+
+    def get_ratings(self, trip):
+        return RatingSerializer(trip.active_ratings, many=True).data
+
+
+class TripAllocationSerializer(serializers.Serializer):
+    """validates a request to split an order into trips"""
+
+    trucks = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, allow_empty=False
+    )
+    start_date = serializers.DateTimeField(required=False)
+
+
+class TrackingPointSerializer(serializers.ModelSerializer):
+    """serializes a GPS fix of a trip"""
+
+    class Meta:
+        model = TrackingPoint
+        fields = ["recorded_at", "latitude", "longitude", "speed"]
+
+
+class TrackingBatchSerializer(serializers.Serializer):
+    """validates a batch of GPS fixes uploaded for a trip"""
+
+    points = TrackingPointSerializer(many=True, allow_empty=False)
+
+    def validate_points(self, points):
+        if len(points) > MAX_TRACKING_BATCH:
+            raise serializers.ValidationError(
+                f"No more than {MAX_TRACKING_BATCH} points can be sent at once."
+            )
+        return points
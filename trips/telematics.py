@@ -0,0 +1,296 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction, InterfaceError, OperationalError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from trips.models import Trip, TrackingPoint, TruckPosition
+
+logger = logging.getLogger(__name__)
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def parse_recorded_at(value):
+    """
+    Parse the time of a ping, reading times without an offset in the
+    current time zone as DRF's date time fields do, so the pings of a batch
+    can always be compared with each other. Returns None if it is not an
+    ISO 8601 date time.
+    """
+
+    recorded_at = parse_datetime(str(value))
+    if recorded_at is not None and timezone.is_naive(recorded_at):
+        recorded_at = timezone.make_aware(recorded_at)
+    return recorded_at
+
+
+def parse_pings(items):
+    """
+    Validate the pings of a device upload and return them as dicts of
+    `truck_id`, `recorded_at`, `latitude`, `longitude` and `speed`, with the
+    errors found keyed by the index of the ping.
+
+    Uploads can hold hundreds of pings, so they are checked by hand rather
+    than with a serializer per ping.
+    """
+
+    pings = []
+    errors = {}
+    for index, item in enumerate(items):
+        try:
+            ping = {
+                "truck_id": int(item["truck"]),
+                "recorded_at": parse_recorded_at(item["recorded_at"]),
+                "latitude": float(item["latitude"]),
+                "longitude": float(item["longitude"]),
+                "speed": None if item.get("speed") is None else float(item["speed"]),
+            }
+        except (KeyError, TypeError, ValueError, AttributeError):
+            errors[index] = (
+                "truck, recorded_at, latitude and longitude are required numbers "
+                "and an ISO 8601 date time."
+            )
+            continue
+
+        if ping["recorded_at"] is None:
+            errors[index] = "recorded_at must be an ISO 8601 date time."
+        elif not (-90 <= ping["latitude"] <= 90 and -180 <= ping["longitude"] <= 180):
+            errors[index] = "latitude or longitude is out of range."
+        elif ping["speed"] is not None and ping["speed"] < 0:
+            errors[index] = "speed cannot be negative."
+        else:
+            pings.append(ping)
+
+    return pings, errors
+
+
+def write_pings(pings):
+    """
+    Store pings as tracking points of the trip each truck is on and move
+    the trucks to their latest position. Pings of trucks that are not on a
+    trip only update the position, they have no track to extend. A batch is
+    written in one transaction, so one that fails leaves nothing behind and
+    can be written again whole.
+    """
+
+    with transaction.atomic():
+        _write_pings(pings)
+
+
+def _write_pings(pings):
+    truck_ids = {ping["truck_id"] for ping in pings}
+    trips = dict(
+        Trip.active_objects.get_active()
+        .filter(truck_id__in=truck_ids)
+        .order_by("truck_id", "-start_date")
+        .distinct("truck_id")
+        .values_list("truck_id", "pk")
+    )
+
+    TrackingPoint.objects.bulk_create(
+        [
+            TrackingPoint(
+                trip_id=trips[ping["truck_id"]],
+                recorded_at=ping["recorded_at"],
+                latitude=ping["latitude"],
+                longitude=ping["longitude"],
+                speed=ping["speed"],
+            )
+            for ping in pings
+            if ping["truck_id"] in trips
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    TruckPosition.objects.record(
+        [dict(ping, trip_id=trips.get(ping["truck_id"])) for ping in pings]
+    )
+
+
+class PingBuffer:
+    """
+    Collects pings in memory and writes them in bulk once `max_size` pings
+    are waiting or the oldest has waited `max_age` seconds.
+
+    A daemon thread flushes on the time threshold when no new pings arrive
+    and the buffer is flushed once more when the process exits. Batches that
+    cannot be written are appended to the `spool_path` file as JSON lines so
+    they survive a restart, `replay_spool` writes them later.
+    """
+
+    def __init__(self, writer, max_size=1000, max_age=5, spool_path=None):
+        # a `max_age` of 0 only flushes on size
+        self.writer = writer
+        self.max_size = max_size
+        self.max_age = max_age
+        self.spool_path = spool_path
+        self._pings = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # set when the first ping lands in an empty buffer, to wake the timer
+        self._wakeup = threading.Event()
+        self._timer = None
+
+    def add(self, pings):
+        """
+        Buffer the pings, writing the buffer out from the calling thread when
+        a threshold is reached.
+        """
+
+        with self._lock:
+            if not self._pings:
+                self._oldest = time.monotonic()
+                self._wakeup.set()
+            self._pings.extend(pings)
+            full = len(self._pings) >= self.max_size
+            expired = 0 < self.max_age <= time.monotonic() - self._oldest
+        self._start_timer()
+
+        if full or expired:
+            self.flush()
+
+    def _take(self):
+        with self._lock:
+            pings, self._pings = self._pings, []
+            self._oldest = None
+        return pings
+
+    def flush(self):
+        """
+        Write every buffered ping, spooling them to disk if the write fails.
+        Returns the number of pings flushed.
+        """
+
+        # one flush at a time keeps the batches in order
+        with self._flush_lock:
+            pings = self._take()
+            if not pings:
+                return 0
+
+            try:
+                self.writer(pings)
+            except Exception:
+                logger.exception("Could not write %s pings, spooling them", len(pings))
+                self.spool(pings)
+            return len(pings)
+
+    def spool(self, pings, path=None):
+        path = path or self.spool_path
+        if not path:
+            logger.error("No spool file configured, %s pings lost", len(pings))
+            return
+
+        with open(path, "a") as spool:
+            for ping in pings:
+                spool.write(
+                    json.dumps(dict(ping, recorded_at=ping["recorded_at"].isoformat()))
+                    + "\n"
+                )
+
+    def replay_spool(self):
+        """
+        Write the pings spooled by earlier failed flushes. Returns the number
+        of pings replayed and the number set aside.
+
+        A batch the database rejects is appended to the `.failed` file next
+        to the spool instead of being retried, so one bad batch does not
+        hold up the rest. When the database cannot be reached the replay
+        stops and is retried whole next time, rewriting a batch is harmless.
+        """
+
+        if not self.spool_path:
+            return 0, 0
+
+        # the spool is moved aside first so new failures go to a fresh file,
+        # a file left by a replay that failed part way is retried first
+        replaying = f"{self.spool_path}.replaying"
+        if not os.path.exists(replaying):
+            if not os.path.exists(self.spool_path):
+                return 0, 0
+            os.replace(self.spool_path, replaying)
+
+        with open(replaying) as spool:
+            pings = [json.loads(line) for line in spool if line.strip()]
+        for ping in pings:
+            ping["recorded_at"] = parse_recorded_at(ping["recorded_at"])
+
+        replayed = failed = 0
+        for start in range(0, len(pings), self.max_size):
+            batch = pings[start : start + self.max_size]
+            try:
+                self.writer(batch)
+            except (InterfaceError, OperationalError):
+                raise
+            except Exception:
+                logger.exception(
+                    "Could not replay %s pings, setting them aside", len(batch)
+                )
+                self.spool(batch, f"{self.spool_path}.failed")
+                failed += len(batch)
+            else:
+                replayed += len(batch)
+        os.remove(replaying)
+        return replayed, failed
+
+    def _start_timer(self):
+        if self._timer is not None or self.max_age <= 0:
+            return
+
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Thread(
+                    target=self._flush_periodically, name="ping-flush", daemon=True
+                )
+                self._timer.start()
+
+    def _flush_periodically(self):
+        # sleeps until the oldest ping is due, or while the buffer is empty
+        # until a ping arrives, so no ping waits longer than `max_age`
+        while True:
+            with self._lock:
+                oldest = self._oldest
+                self._wakeup.clear()
+
+            if oldest is None:
+                self._wakeup.wait()
+                continue
+
+            delay = oldest + self.max_age - time.monotonic()
+            if delay > 0:
+                self._wakeup.wait(delay)
+                continue
+
+            try:
+                self.flush()
+            finally:
+                connection.close()
+
+
+def get_ping_buffer():
+    """
+    Return the process wide ping buffer, creating it the first time it is
+    needed.
+    """
+
+    global _buffer
+
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = PingBuffer(
+                    write_pings,
+                    max_size=settings.TELEMATICS_BUFFER_SIZE,
+                    max_age=settings.TELEMATICS_FLUSH_INTERVAL,
+                    spool_path=settings.TELEMATICS_SPOOL_PATH,
+                )
+                atexit.register(_buffer.flush)
+    return _buffer
@@ -1,3 +1,238 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from assets.models import Truck
+from authentication.models import User
+from cargo_types.models import CargoType, Commodity
+from companies.models import (
+    CargoOwnerCompany,
+    Company,
+    PersonOfContact,
+    TransporterCompany,
+)
+from depots.models import Depot
+from orders.models import Order
+from rates.models import Rate
+from trips.models import Event, Rating, Trip, TripInvoice
+from trips.serializers import TripDetailSerializer
+
+PASSWORD = "Tr4ck-Loads-Daily"
+# the trips, their events and their ratings
+TRIP_DETAIL_QUERIES = 3
+
+
+def create_company(director, number, category):
+    company = Company.objects.create(
+        business_name=f"Company {number}",
+        business_type="Corporate",
+        account_number=f"ACC-{number}",
+        prefered_currency="KES",
+        logo="documents/logo.png",
+        business_phone_no=f"+25472000000{number}",
+        business_email=f"info@company{number}.example.com",
+        location="Moi Avenue, Nairobi, Kenya",
+        company_director=director,
+        operational_regions="locals",
+        onboarding_status="approved",
+        certificate_of_incorporation="documents/certificate.pdf",
+        directors_id="documents/id.pdf",
+        category=category,
+    )
+    director.employer = company
+    director.save()
+    return company
+
+
+class TripQueryCountTest(TestCase):
+    """
+    The trip endpoints must cost a fixed number of queries, whatever the
+    number of trips on the page and the events and ratings each trip has.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            full_name="Shypper Admin",
+            email="admin@shypper.example.com",
+            password=PASSWORD,
+            phone="+254700000001",
+        )
+        cargo_director = User.objects.create_cargo_owner(
+            full_name="Cargo Director",
+            email="director@cargo.example.com",
+            password=PASSWORD,
+            phone="+254700000002",
+        )
+        transporter_director = User.objects.create_transporter(
+            full_name="Fleet Director",
+            email="director@fleet.example.com",
+            password=PASSWORD,
+            phone="+254700000003",
+        )
+
+        self.cargo_owner = CargoOwnerCompany.objects.create(
+            potential_monthly_tonnage="100",
+            operational_hours="Mon-Fri 8-5",
+            company=create_company(cargo_director, 1, "cargo_owner"),
+        )
+        self.transporter = TransporterCompany.objects.create(
+            number_of_trucks="10 flatbed",
+            number_of_drivers=10,
+            goods_in_transit_insurance="documents/insurance.pdf",
+            tax_compliance_certificate="documents/tax.pdf",
+            ntsa_inspection_certificates="documents/ntsa.pdf",
+            cross_boarder_operation="documents/cross_border.pdf",
+            company=create_company(transporter_director, 2, "transporter"),
+        )
+
+        commodity = Commodity.objects.create_commodity(
+            name="Tea",
+            description="Tea leaves",
+            created_by=self.cargo_owner,
+            cargo_type=CargoType.objects.create_cargo_type(
+                cargo_type="Container", description="Containerised cargo"
+            ),
+        )
+        self.origin, self.destination = [
+            Depot.objects.create_depot(
+                city=city,
+                coordinates={"lattitude": latitude, "longitude": longitude},
+                user=cargo_director,
+                is_public=True,
+            )
+            for city, latitude, longitude in (
+                ("Nairobi", "-1.2921", "36.8219"),
+                ("Mombasa", "-4.0435", "39.6682"),
+            )
+        ]
+        self.loading, self.offloading = [
+            PersonOfContact.objects.create_person_of_contact(
+                company=self.cargo_owner,
+                name=name,
+                email=f"{name.lower()}@cargo.example.com",
+                phone=phone,
+            )
+            for name, phone in (
+                ("Loader", "+254700000004"),
+                ("Receiver", "+254700000005"),
+            )
+        ]
+        self.order = Order.objects.create_order(
+            title="Tea to the coast",
+            description="Tea for export",
+            commodity=commodity,
+            cargo_tonnage=280,
+            origin=[self.origin],
+            destination=[self.destination],
+            loading_point_contact=self.loading,
+            offloading_point_contact=self.offloading,
+            desired_rates=Rate.objects.create_rates(
+                price_per_km=10, preferred_currency="KES", created_by=self.cargo_owner
+            ),
+            desired_truck_type="flatbed",
+            owner=self.cargo_owner,
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def create_trip(self, number, events=(), ratings=(), invoice=False):
+        """
+        Create a trip moved through the `events` states, with a rating for
+        each of the `ratings` points and, if asked, an invoice.
+        """
+
+        trip = Trip.objects.create_trip(
+            start_date=timezone.now(),
+            order=self.order,
+            truck=Truck.objects.create_truck(
+                name=f"Truck {number}",
+                owned_by=self.transporter,
+                type="flatbed",
+                reg_no=f"KAA {number:03d}A",
+                haulage="local",
+            ),
+            origin=self.origin,
+            destination=self.destination,
+            loading_point_contact=self.loading,
+            offloading_point_contact=self.offloading,
+            description=f"Trip {number}",
+            trip_number=number,
+            transporter=self.transporter,
+        )
+        for name in events:
+            Event.objects.create_event(name=name, trip=trip, triggered_by=self.admin)
+        for points in ratings:
+            Rating.objects.create_rating(
+                reviewer=self.cargo_owner, trip=trip, body="Good service", points=points
+            )
+        if invoice:
+            TripInvoice.objects.create_trip_invoice(
+                trip=trip,
+                charges={
+                    "per_tonne": "1",
+                    "per_km_per_tonne": "1",
+                    "per_truck_load": "1",
+                },
+                description=f"Invoice of trip {number}",
+            )
+        return trip
+
+    def test_trip_list_costs_the_same_for_one_and_many_trips(self):
+        self.create_trip(1, events=("A",), ratings=(4,))
+        with CaptureQueriesContext(connection) as one_trip:
+            response = self.client.get(reverse("trip-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["trips"]), 1)
+
+        for number in range(2, 12):
+            self.create_trip(
+                number, events=("A", "L", "S", "O"), ratings=(3, 5), invoice=True
+            )
+        with self.assertNumQueries(len(one_trip)):
+            response = self.client.get(reverse("trip-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["trips"]), 11)
+
+    def test_trip_detail_queries_do_not_grow_with_its_events_and_ratings(self):
+        bare = self.create_trip(1)
+        with CaptureQueriesContext(connection) as bare_trip:
+            response = self.client.get(reverse("trip-detail", args=[bare.pk]))
+        self.assertEqual(response.status_code, 200)
+
+        busy = self.create_trip(
+            2, events=("A", "L", "S", "O", "STP", "O"), ratings=(1, 2, 5), invoice=True
+        )
+        with self.assertNumQueries(len(bare_trip)):
+            response = self.client.get(reverse("trip-detail", args=[busy.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["trip"]["ratings"]), 3)
+        self.assertIsNotNone(response.data["trip"]["invoice"])
+
+    def test_with_details_prefetches_active_events_and_ratings(self):
+        trips = [
+            self.create_trip(number, events=("A", "L", "S"), ratings=(2, 4))
+            for number in range(1, 4)
+        ]
+        deleted_event = trips[0].events.get(name="L")
+        deleted_event.soft_delete(commit=True)
+        deleted_rating = trips[0].ratings.get(points=2)
+        deleted_rating.soft_delete(commit=True)
+
+        with self.assertNumQueries(TRIP_DETAIL_QUERIES):
+            data = TripDetailSerializer(
+                Trip.active_objects.all_objects().with_details().order_by("pk"),
+                many=True,
+            ).data
+
+        self.assertEqual(
+            [event["name"] for event in data[0]["latest_events"]], ["S", "A"]
+        )
+        self.assertEqual([rating["points"] for rating in data[0]["ratings"]], [4])
+        self.assertEqual(
+            [event["name"] for event in data[1]["latest_events"]], ["S", "L", "A"]
+        )
+        self.assertEqual([rating["points"] for rating in data[1]["ratings"]], [4, 2])
@@ -0,0 +1,20 @@
+from django.urls import path
+from trips.views import (
+    TripList,
+    TripDetail,
+    TripEvents,
+    TripTracking,
+    TripRoute,
+    TelematicsIngest,
+    FleetPositions,
+)
+
+urlpatterns = [
+    path("", TripList.as_view(), name="trip-list"),
+    path("fleet/", FleetPositions.as_view(), name="fleet-positions"),
+    path("telematics/", TelematicsIngest.as_view(), name="telematics-ingest"),
+    path("<int:pk>/", TripDetail.as_view(), name="trip-detail"),
+    path("<int:pk>/events/", TripEvents.as_view(), name="trip-events"),
+    path("<int:pk>/tracking/", TripTracking.as_view(), name="trip-tracking"),
+    path("<int:pk>/route/", TripRoute.as_view(), name="trip-route"),
+]
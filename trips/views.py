@@ -1,3 +1,325 @@
-from django.shortcuts import render
+import uuid
 
-# Create your views here.
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_datetime
+from rest_framework import generics, status
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from authentication.roles import RoleFlag, has_role
+from utils.tenancy import get_tenant
+from assets.models import Truck
+from .models import Trip, Event, TrackingPoint, TruckPosition, TRIP_STATES
+from .serializers import EventSerializer, TrackingBatchSerializer, TripDetailSerializer
+from .telematics import get_ping_buffer, parse_pings
+from .routes import get_route, MIN_ZOOM, MAX_ZOOM
+
+# most pings accepted in one device upload
+MAX_PINGS_PER_REQUEST = 500
+# zoom level routes are simplified for when the client does not say
+DEFAULT_ROUTE_ZOOM = 12
+
+
+class TrackingPointPagination(CursorPagination):
+    """keyset pagination over the fixes of a trip, oldest first"""
+
+    ordering = ("recorded_at",)
+    page_size = 500
+    page_size_query_param = "page_size"
+    max_page_size = 5000
+
+    def get_page_links(self):
+        return {"next": self.get_next_link(), "previous": self.get_previous_link()}
+
+
+class TripLookupMixin:
+    """
+    Look up a trip the user can access. Transporters see the trips they
+    carry out, cargo owners can read the trips of their orders.
+    """
+
+    def get_queryset(self):
+        user = self.request.user
+        if has_role(user, RoleFlag.SUPERUSER):
+            return Trip.active_objects.all_objects()
+
+        tenant = get_tenant(self.request)
+        if tenant.is_transporter:
+            return Trip.active_objects.get_transporter_trips(
+                transporter=tenant.transporter
+            )
+        if tenant.is_cargo_owner and self.request.method in SAFE_METHODS:
+            return Trip.active_objects.get_cargo_owner_trips(
+                cargo_owner=tenant.cargo_owner
+            )
+        return Trip.active_objects.none()
+
+    def get_trip(self):
+        trip = get_object_or_404(self.get_queryset(), pk=self.kwargs["pk"])
+        self.check_object_permissions(self.request, trip)
+        return trip
+
+
+class TripList(TripLookupMixin, generics.ListAPIView):
+    """
+    List the trips the user can access, newest first. Filter with
+    `?state=<event name>`, eg `?state=O` for trips on journey, and
+    `?order=<tracking id>`.
+    """
+
+    serializer_class = TripDetailSerializer
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (JSONRenderer,)
+
+    def list(self, request):
+        trips = self.get_queryset()
+
+        state = request.query_params.get("state")
+        if state is not None:
+            if state not in dict(TRIP_STATES):
+                raise ValidationError(
+                    {"state": f"state must be one of {', '.join(dict(TRIP_STATES))}."}
+                )
+            trips = trips.filter(current_state=state)
+
+        order = request.query_params.get("order")
+        if order is not None:
+            try:
+                trips = trips.filter(order__tracking_id=uuid.UUID(order))
+            except ValueError:
+                raise ValidationError({"order": "order must be a tracking id."})
+
+        page = self.paginate_queryset(trips.with_details())
+        serializer = self.serializer_class(page, many=True)
+        response = {"trips": serializer.data, "message": "Trips returned successfully"}
+        response.update(self.paginator.get_page_links())
+        return Response(response, status.HTTP_200_OK)
+
+
+class TripDetail(TripLookupMixin, generics.RetrieveAPIView):
+    """return a trip with its order, truck, depots, contacts and events"""
+
+    serializer_class = TripDetailSerializer
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (JSONRenderer,)
+
+    def get_queryset(self):
+        return super().get_queryset().with_details()
+
+    def retrieve(self, request, pk):
+        serializer = self.serializer_class(self.get_trip())
+        response = {"trip": serializer.data, "message": "Trip returned successfully"}
+        return Response(response, status.HTTP_200_OK)
+
+
+class TripEvents(TripLookupMixin, generics.ListCreateAPIView):
+    """list the events of a trip and move it on to its next state"""
+
+    serializer_class = EventSerializer
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (JSONRenderer,)
+
+    def list(self, request, pk):
+        trip = self.get_trip()
+        page = self.paginate_queryset(
+            Event.active_objects.all_objects().filter(trip=trip)
+        )
+        serializer = self.serializer_class(page, many=True)
+        response = {
+            "events": serializer.data,
+            "current_state": trip.current_state,
+            "message": "Trip events returned successfully",
+        }
+        response.update(self.paginator.get_page_links())
+        return Response(response, status.HTTP_200_OK)
+
+    def post(self, request, pk):
+        trip = self.get_trip()
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            event = Event.objects.create_event(
+                trip=trip, triggered_by=request.user, **serializer.validated_data
+            )
+        except DjangoValidationError as exc:
+            raise ValidationError(exc.args[0]) from exc
+
+        response = {
+            "event": self.serializer_class(event).data,
+            "current_state": event.trip.current_state,
+            "status": event.trip.status,
+            "message": "Trip event recorded successfully",
+        }
+        return Response(response, status.HTTP_201_CREATED)
+
+
+class TripTracking(TripLookupMixin, generics.GenericAPIView):
+    """upload GPS fixes of a trip and read them back by time window"""
+
+    serializer_class = TrackingBatchSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = TrackingPointPagination
+    renderer_classes = (JSONRenderer,)
+
+    def get_time(self, name):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        time = parse_datetime(value)
+        if time is None:
+            raise ValidationError({name: f"{name} must be an ISO 8601 date time."})
+        return time
+
+    def get(self, request, pk):
+        trip = self.get_trip()
+        points = TrackingPoint.objects.get_track(
+            trip, start=self.get_time("start"), end=self.get_time("end")
+        ).values("recorded_at", "latitude", "longitude", "speed")
+
+        page = self.paginate_queryset(points)
+        response = {
+            "points": page,
+            "message": "Tracking points returned successfully",
+        }
+        response.update(self.paginator.get_page_links())
+        return Response(response, status.HTTP_200_OK)
+
+    def post(self, request, pk):
+        trip = self.get_trip()
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        points = serializer.validated_data["points"]
+        TrackingPoint.objects.ingest(trip, points)
+        response = {
+            "received": len(points),
+            "message": "Tracking points saved successfully",
+        }
+        return Response(response, status.HTTP_201_CREATED)
+
+
+class TripRoute(TripLookupMixin, generics.GenericAPIView):
+    """
+    Return the route of a trip simplified for a map zoom level, as an
+    encoded polyline.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (JSONRenderer,)
+
+    def get(self, request, pk):
+        zoom = request.query_params.get("zoom", DEFAULT_ROUTE_ZOOM)
+        try:
+            zoom = int(zoom)
+        except ValueError:
+            raise ValidationError({"zoom": "zoom must be a whole number."})
+        if not MIN_ZOOM <= zoom <= MAX_ZOOM:
+            raise ValidationError(
+                {"zoom": f"zoom must be between {MIN_ZOOM} and {MAX_ZOOM}."}
+            )
+
+        response = {
+            "route": get_route(self.get_trip(), zoom),
+            "message": "Trip route returned successfully",
+        }
+        return Response(response, status.HTTP_200_OK)
+
+
+class TelematicsIngest(generics.GenericAPIView):
+    """
+    Accept position pings from tracked trucks. Pings are buffered and written
+    in bulk, so they show up in trip tracks a few seconds later.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (JSONRenderer,)
+
+    def get_tracked_trucks(self, truck_ids):
+        """return the ids of the tracked trucks the user may report for"""
+        trucks = Truck.active_objects.all_objects().filter(
+            pk__in=truck_ids, tracking=True
+        )
+        if not has_role(self.request.user, RoleFlag.SUPERUSER):
+            trucks = trucks.filter(owned_by=get_tenant(self.request).transporter)
+        return set(trucks.values_list("pk", flat=True))
+
+    def post(self, request):
+        items = request.data.get("pings") if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items:
+            raise ValidationError({"pings": "Expected a non-empty list of pings."})
+        if len(items) > MAX_PINGS_PER_REQUEST:
+            raise ValidationError(
+                {
+                    "pings": f"No more than {MAX_PINGS_PER_REQUEST} pings can be sent at once."
+                }
+            )
+
+        pings, errors = parse_pings(items)
+        tracked = self.get_tracked_trucks({ping["truck_id"] for ping in pings})
+        accepted = [ping for ping in pings if ping["truck_id"] in tracked]
+        if len(accepted) != len(pings):
+            # map the rejected pings back to their position in the upload
+            valid = [index for index in range(len(items)) if index not in errors]
+            for index, ping in zip(valid, pings):
+                if ping["truck_id"] not in tracked:
+                    errors[index] = "Truck is not a tracked truck of your company."
+
+        if accepted:
+            get_ping_buffer().add(accepted)
+
+        response = {
+            "accepted": len(accepted),
+            "rejected": errors,
+            "message": "Pings received successfully",
+        }
+        return Response(response, status.HTTP_202_ACCEPTED)
+
+
+class FleetPositions(generics.GenericAPIView):
+    """
+    Return every truck of a transporter with its last known position, for
+    the dispatcher map. Admins pick the transporter with `?transporter=<id>`.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    pagination_class = None
+    renderer_classes = (JSONRenderer,)
+
+    def get_transporter_id(self):
+        if has_role(self.request.user, RoleFlag.SUPERUSER):
+            transporter = self.request.query_params.get("transporter")
+            if transporter is None or not transporter.isdigit():
+                raise ValidationError({"transporter": "Provide a transporter id."})
+            return int(transporter)
+
+        transporter = get_tenant(self.request).transporter
+        if transporter is None:
+            raise PermissionDenied("you must be a transporter to view a fleet")
+        return transporter.pk
+
+    def get(self, request):
+        trucks = list(
+            Truck.active_objects.get_personal_assets(owned_by=self.get_transporter_id())
+            .order_by("pk")
+            .values("id", "reg_no", "type", "tracking")
+        )
+        positions = TruckPosition.objects.get_positions(truck["id"] for truck in trucks)
+        for truck in trucks:
+            position = positions.get(truck["id"])
+            truck["position"] = position and {
+                "trip": position["trip_id"],
+                "recorded_at": position["recorded_at"],
+                "latitude": position["latitude"],
+                "longitude": position["longitude"],
+                "speed": position["speed"],
+            }
+
+        response = {
+            "trucks": trucks,
+            "message": "Fleet positions returned successfully",
+        }
+        return Response(response, status.HTTP_200_OK)
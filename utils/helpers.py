@@ -1,12 +1,12 @@
 import random
 import string
+import codecs
 import csv
-import io
+import threading
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db.utils import IntegrityError
 from rest_framework_simplejwt.tokens import RefreshToken, TokenError
-import africastalking
-from logisticts.settings import AF_USERNAME, APIKEY
 
 
 def enforce_all_required_arguments_are_truthy(kwargs, required_args):
@@ -85,22 +85,69 @@ def random_password(self, N=10):
 
 def read_csv(csv_file):
     """
-    Takes a csv in memory file object and returns an iterable with each csv line
+    Takes an uploaded csv file and returns an iterable with each csv line.
+    The file is decoded line by line as it is read, so large uploads are never
+    held in memory as a whole.
     """
-    data_set = csv_file.read().decode("UTF-8")
-    io_string = io.StringIO(data_set)
-    next(io_string)  # jump header line
-    return csv.reader(io_string, delimiter=",")
+    reader = csv.reader(codecs.iterdecode(csv_file, "UTF-8"), delimiter=",")
+    next(reader, None)  # jump header line
+    return reader
 
 
-# Initialize SDK for sending sms
-username = AF_USERNAME
-api_key = APIKEY
-africastalking.initialize(username, api_key)
+_sms_client = None
+_sms_client_lock = threading.Lock()
+
+
+def get_sms_client():
+    """
+    Return the Africa's Talking SMS service. The SDK is imported and
+    initialized the first time an sms is sent rather than when this module is
+    imported, so processes that never send sms don't pay for it.
+    """
+    global _sms_client
+
+    if _sms_client is None:
+        with _sms_client_lock:
+            if _sms_client is None:
+                import africastalking
+
+                africastalking.initialize(settings.AF_USERNAME, settings.APIKEY)
+                _sms_client = africastalking.SMS
+    return _sms_client
 
 
 def send_sms(message, recipients):
     """send sms notifications"""
-    sms = africastalking.SMS
+    sms = get_sms_client()
     sender = "softsearch"
     return sms.send(message, recipients, sender)
+
+
+def send_sms_batch(messages, batch_size=None):
+    """
+    Send many sms with as few gateway requests as possible. `messages` is an
+    iterable of `(message, recipients)`; messages with the same text are
+    merged into one send to all their (deduplicated) recipients, split in
+    requests of at most `batch_size` (SMS_BATCH_SIZE by default) recipients.
+
+    Returns `{message: {recipient: exception}}` with the recipients of every
+    request the gateway failed. A failed request does not stop the others,
+    so the recipients of the requests that went through are not sent the
+    message again when the failed ones are retried.
+    """
+    batch_size = batch_size or settings.SMS_BATCH_SIZE
+
+    recipients_by_message = {}
+    for message, recipients in messages:
+        recipients_by_message.setdefault(message, {}).update(dict.fromkeys(recipients))
+
+    failures = {}
+    for message, recipients in recipients_by_message.items():
+        recipients = list(recipients)
+        for start in range(0, len(recipients), batch_size):
+            batch = recipients[start : start + batch_size]
+            try:
+                send_sms(message, batch)
+            except Exception as exc:
+                failures.setdefault(message, {}).update(dict.fromkeys(batch, exc))
+    return failures
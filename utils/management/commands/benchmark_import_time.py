@@ -0,0 +1,98 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def parse_importtime(output):
+    """
+    Parse the `-X importtime` report into {module: (self_us, cumulative_us)}.
+    """
+
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        modules[module.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure how long importing a module (logisticts.wsgi by default) takes "
+        "in a fresh interpreter with `python -X importtime`, and append the "
+        "result to a JSON lines history file to track startup cost over time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--module", default="logisticts.wsgi")
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="number of runs, the fastest one is reported",
+        )
+        parser.add_argument(
+            "--top", type=int, default=15, help="number of slowest modules to list"
+        )
+        parser.add_argument(
+            "--history",
+            default=os.path.join(settings.BASE_DIR, "import_time_history.jsonl"),
+            help="file the results are appended to, pass '' to skip",
+        )
+
+    def handle(self, *args, **options):
+        module = options["module"]
+
+        runs = [self.measure(module) for _ in range(max(options["repeat"], 1))]
+        modules = min(runs, key=lambda run: run[module][1])
+        total_us = modules[module][1]
+
+        self.stdout.write(f"import {module}: {total_us / 1000:.1f} ms")
+        slowest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)
+        for name, (self_us, cumulative_us) in slowest[: options["top"]]:
+            self.stdout.write(
+                f"  {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms cumulative  {name}"
+            )
+
+        if options["history"]:
+            record = {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "commit": self.git_commit(),
+                "module": module,
+                "total_us": total_us,
+                "runs_us": [run[module][1] for run in runs],
+                "slowest": {name: self_us for name, (self_us, _) in slowest[:5]},
+            }
+            with open(options["history"], "a") as history:
+                history.write(json.dumps(record) + "\n")
+
+    def measure(self, module):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=settings.BASE_DIR,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        modules = parse_importtime(result.stderr)
+        if result.returncode != 0 or module not in modules:
+            raise CommandError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+        return modules
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                universal_newlines=True,
+            ).stdout.strip()
+        except OSError:
+            return None
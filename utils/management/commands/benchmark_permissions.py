@@ -0,0 +1,110 @@
+import timeit
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from authentication.models import User, Role
+from utils.permissions import (
+    IsTransporterOrAdmin,
+    IsAdminOrCargoOwner,
+    IsShyperAdmin,
+    IsAdminOrAssetOwner,
+    IsComponyAdminOrDirectorOrStaffReadOnly,
+)
+
+# the checks a typical request runs, written the way they were before roles were
+# resolved from the role_id column.
+LEGACY_CHECKS = (
+    lambda user: str(user.role) == "transporter-director"
+    or str(user.role) == "superuser"
+    or str(user.role) == "admin",
+    lambda user: str(user.role) == "cargo-owner-director"
+    or str(user.role) == "superuser",
+    lambda user: user.is_authenticated and str(user.role) == "superuser",
+    lambda user: user.is_authenticated
+    and (
+        str(user.role) == "transporter-director"
+        or str(user.role) == "superuser"
+        or str(user.role) == "admin"
+    ),
+    lambda user: str(user.role) == "transporter-director"
+    or str(user.role) == "cargo-owner-director"
+    or str(user.role) == "admin"
+    or user.is_superuser,
+)
+
+CHECKS = (
+    IsTransporterOrAdmin(),
+    IsAdminOrCargoOwner(),
+    IsShyperAdmin(),
+    IsAdminOrAssetOwner(),
+    IsComponyAdminOrDirectorOrStaffReadOnly(),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the cost of evaluating a request's role-based permission checks "
+        "with string comparisons on user.role versus RoleFlag masks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=100000)
+        parser.add_argument(
+            "--user",
+            type=int,
+            help="pk of a user to also measure lazy Role loading against the database",
+        )
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+
+        user = User(pk=0, role=Role(title="admin"))
+        request = SimpleNamespace(user=user, method="POST")
+
+        self.report(
+            "legacy, Role already loaded",
+            iterations,
+            lambda: [check(user) for check in LEGACY_CHECKS],
+        )
+        self.report(
+            "role flags",
+            iterations,
+            lambda: [check.has_permission(request, None) for check in CHECKS],
+        )
+
+        if options["user"] is None:
+            return
+
+        db_user = User.objects.get(pk=options["user"])
+        db_request = SimpleNamespace(user=db_user, method="POST")
+
+        def legacy_fresh_user():
+            # every request gets a new user instance, so the Role is loaded again
+            db_user._state.fields_cache.pop("role", None)
+            return [check(db_user) for check in LEGACY_CHECKS]
+
+        self.report(
+            "legacy, Role loaded per request",
+            min(iterations, 1000),
+            legacy_fresh_user,
+            count_queries=True,
+        )
+        self.report(
+            "role flags, no Role loaded",
+            iterations,
+            lambda: [check.has_permission(db_request, None) for check in CHECKS],
+            count_queries=True,
+        )
+
+    def report(self, label, iterations, func, count_queries=False):
+        message = f"{label}: "
+        if count_queries:
+            with CaptureQueriesContext(connection) as queries:
+                func()
+            message += f"{len(queries)} queries, "
+
+        seconds = timeit.timeit(func, number=iterations)
+        self.stdout.write(message + f"{seconds / iterations * 1e6:.2f} us per request")
@@ -0,0 +1,131 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination over `(created_at, id)`, newest first. The cursor holds
+    both values of the row a page ends on and the next page is fetched with
+    `WHERE created_at < c OR (created_at = c AND id < i)`, which the
+    `(-created_at, -id)` index serves directly. Rows created at the same
+    instant, eg by a bulk create, are paged by id rather than by an offset,
+    so however many share a timestamp none are skipped or repeated.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = None if self.cursor is None else self.cursor.position
+
+        # previous pages are read backwards from the cursor, then flipped
+        fields = [field.lstrip("-") for field in self.ordering]
+        descending = [field.startswith("-") != reverse for field in self.ordering]
+        queryset = queryset.order_by(
+            *(f"-{field}" if desc else field for field, desc in zip(fields, descending))
+        )
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_keyset_filter(queryset.model, fields, descending, position)
+            )
+
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        has_more = len(results) > len(self.page)
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        # an empty page keeps the cursor's position in both directions
+        self.next_position = self.previous_position = position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_keyset_filter(self, model, fields, descending, position):
+        """
+        Return the condition matching the rows after `position` in the
+        ordering: a lower first field, or an equal first field and a lower
+        second one and so on, with the comparisons flipped for ascending
+        fields.
+        """
+
+        try:
+            values = [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(fields, position)
+            ]
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        equal = {}
+        for field, desc, value in zip(fields, descending, values):
+            lookup = "lt" if desc else "gt"
+            condition |= Q(**equal, **{f"{field}__{lookup}": value})
+            equal[field] = value
+        return condition
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+
+        # `super` only reads the first value of the position, it holds one
+        # per ordering field
+        position = cursor.position.split(",")
+        if len(position) != len(self.ordering) or cursor.offset:
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=cursor.reverse, position=position)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        position = self.next_position
+        if self.page:
+            position = self._get_position_from_instance(self.page[-1], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+
+        position = self.previous_position
+        if self.page:
+            position = self._get_position_from_instance(self.page[0], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def encode_cursor(self, cursor):
+        if cursor.position is not None:
+            cursor = cursor._replace(position=",".join(cursor.position))
+        return super().encode_cursor(cursor)
+
+    def _get_position_from_instance(self, instance, ordering):
+        return [
+            super(CreatedAtCursorPagination, self)._get_position_from_instance(
+                instance, [field]
+            )
+            for field in ordering
+        ]
+
+    def get_page_links(self):
+        """
+        Return the links to the next and previous pages, for views that build
+        their own response body.
+        """
+
+        return {"next": self.get_next_link(), "previous": self.get_previous_link()}
@@ -1,6 +1,7 @@
 from rest_framework import permissions
-from companies.models import TransporterCompany, CargoOwnerCompany, Company
 from rest_framework.permissions import SAFE_METHODS
+from authentication.roles import RoleFlag, has_role
+from utils.tenancy import get_tenant
 
 
 class IsAdminOrReadOnly(permissions.BasePermission):
@@ -14,7 +15,7 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         if request.method in SAFE_METHODS:
             return True
         else:
-            return str(request.user.role) == "superuser"
+            return has_role(request.user, RoleFlag.SUPERUSER)
 
 
 class IsAllowedToOrder(permissions.BasePermission):
@@ -25,7 +26,7 @@ class IsAllowedToOrder(permissions.BasePermission):
     message = "you must be a cargo Owner to permform this"
 
     def has_permission(self, request, view):
-        return request.user.role == "carogo-owner-director"
+        return has_role(request.user, RoleFlag.CARGO_OWNER_DIRECTOR)
 
 
 class IsTransporterOrAdmin(permissions.BasePermission):
@@ -36,13 +37,9 @@ class IsTransporterOrAdmin(permissions.BasePermission):
     message = "you must be a transporter or superuser to perform this"
 
     def has_permission(self, request, view):
-        if str(request.user.role) == "staff" and request.method in SAFE_METHODS:
+        if has_role(request.user, RoleFlag.STAFF) and request.method in SAFE_METHODS:
             return True
-        return (
-            str(request.user.role) == "transporter-director"
-            or str(request.user.role) == "superuser"
-            or str(request.user.role) == "admin"
-        )
+        return has_role(request.user, RoleFlag.FLEET_MANAGERS)
 
 
 class IsTransporterEmployee(permissions.BasePermission):
@@ -57,27 +54,21 @@ class IsTransporterEmployee(permissions.BasePermission):
             return True
         if (
             str(company.category) == "transporter"
-            and str(user.role) == "staff"
+            and has_role(user, RoleFlag.STAFF)
             and request.method in SAFE_METHODS
         ):
             return True
         if str(company.category) == "transporter":
-            return (
-                str(user.role) == "transporter-director"
-                or str(request.user.role) == "admin"
-            )
+            return has_role(user, RoleFlag.TRANSPORTER_MANAGERS)
 
     def has_object_permission(self, request, view, obj):
         company = request.user.employer
         if request.user.is_superuser:
             return True
         if str(company.category) == "transporter":
-            transporter = TransporterCompany.objects.get(company=company)
-            return (
-                obj.owned_by == transporter
-                and str(request.user.role) == "transporter-director"
-                or obj.owned_by == transporter
-                and str(request.user.role) == "admin"
+            transporter = get_tenant(request).transporter
+            return obj.owned_by == transporter and has_role(
+                request.user, RoleFlag.TRANSPORTER_MANAGERS
             )
 
 
@@ -92,10 +83,7 @@ class IsAdminOrCargoOwner(permissions.BasePermission):
         if request.method in SAFE_METHODS:
             return True
         else:
-            return (
-                str(request.user.role) == "cargo-owner-director"
-                or str(request.user.role) == "superuser"
-            )
+            return has_role(request.user, RoleFlag.CARGO_MANAGERS)
 
     def has_object_permission(self, request, view, obj):
         """allow only owner or admin to delete and uptade depots"""
@@ -108,7 +96,9 @@ class IsShyperAdmin(permissions.BasePermission):
     message = "you must be shyper admin to perform this"
 
     def has_permission(self, request, view):
-        return request.user.is_authenticated and str(request.user.role) == "superuser"
+        return request.user.is_authenticated and has_role(
+            request.user, RoleFlag.SUPERUSER
+        )
 
 
 class IsShyperEmployee(permissions.BasePermission):
@@ -164,8 +154,7 @@ class IsAdminOrCargoOwnerEmployee(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         """allow only owners and their employess or admin to delete and uptade rates """
         if request.user.is_superuser == False:
-            company = request.user.employer
-            cargo_company = CargoOwnerCompany.objects.get(company=company)
+            cargo_company = get_tenant(request).cargo_owner
             return obj.created_by == cargo_company
         return request.user.is_superuser
 
@@ -182,18 +171,14 @@ class IsAdminOrCargoOwnerRates(permissions.BasePermission):
         if request.method in SAFE_METHODS:
             return True
         else:
-            return (
-                str(request.user.role) == "cargo-owner-director"
-                or str(request.user.role) == "superuser"
-            )
+            return has_role(request.user, RoleFlag.CARGO_MANAGERS)
 
     def has_object_permission(self, request, view, obj):
         """allow only owner or admin to delete and uptade depots"""
         if request.method in SAFE_METHODS:
             return True
-        return (
-            obj.created_by.company_director == request.user
-            or str(request.user.role) == "superuser"
+        return obj.created_by.company_director == request.user or has_role(
+            request.user, RoleFlag.SUPERUSER
         )
 
 
@@ -205,14 +190,13 @@ class IsCargoOwner(permissions.BasePermission):
     message = "You must be a cargo owner or admin"
 
     def has_permission(self, request, view):
-        return (
-            request.user.is_authenticated
-            and str(request.user.role) == "cargo-owner-director"
+        return request.user.is_authenticated and has_role(
+            request.user, RoleFlag.CARGO_OWNER_DIRECTOR
         )
 
     def has_object_permission(self, request, view, obj):
         """allow only owner or admin to delete and update depots"""
-        return obj.owner == request.user or str(request.user.role) == "superuser"
+        return obj.owner == request.user or has_role(request.user, RoleFlag.SUPERUSER)
 
 
 class IsAdminOrAssetOwner(permissions.BasePermission):
@@ -224,26 +208,20 @@ class IsAdminOrAssetOwner(permissions.BasePermission):
 
     def has_permission(self, request, view):
 
-        if str(request.user.role) == "staff" and request.method in SAFE_METHODS:
+        if has_role(request.user, RoleFlag.STAFF) and request.method in SAFE_METHODS:
             return True
 
-        return request.user.is_authenticated and (
-            str(request.user.role) == "transporter-director"
-            or str(request.user.role) == "superuser"
-            or str(request.user.role) == "admin"
+        return request.user.is_authenticated and has_role(
+            request.user, RoleFlag.FLEET_MANAGERS
         )
 
     def has_object_permission(self, request, view, obj):
         user = request.user
-        if str(user.role) == "transporter-director":
-            company = Company.objects.get(company_director=user)
-            transporter = TransporterCompany.objects.get(company=company)
-
-        if str(user.role) == "admin" or str(user.role) == "staff":
-            company = user.employer
-            transporter = TransporterCompany.objects.get(company=company)
+        transporter = get_tenant(request).transporter
 
-        return obj.owned_by == transporter or user.is_superuser
+        return (
+            transporter is not None and obj.owned_by == transporter
+        ) or user.is_superuser
 
 
 class IsComponyAdminOrDirectorOrStaffReadOnly(permissions.BasePermission):
@@ -255,24 +233,13 @@ class IsComponyAdminOrDirectorOrStaffReadOnly(permissions.BasePermission):
 
     def has_permission(self, request, view):
         user = request.user
-        if str(user.role) == "staff" and request.method in SAFE_METHODS:
+        if has_role(user, RoleFlag.STAFF) and request.method in SAFE_METHODS:
             return True
-        return (
-            str(user.role) == "transporter-director"
-            or str(user.role) == "cargo-owner-director"
-            or str(user.role) == "admin"
-            or user.is_superuser
-        )
+        return has_role(user, RoleFlag.COMPANY_MANAGERS) or user.is_superuser
 
     def has_object_permission(self, request, view, obj):
         user = request.user
-        if (
-            str(user.role) == "transporter-director"
-            or str(user.role) == "cargo-owner-director"
-        ):
-            company = Company.objects.get(company_director=user)
-        else:
-            company = user.employer
+        company = get_tenant(request).company
         return obj.employer == company or user.is_superuser
 
 
@@ -286,16 +253,9 @@ class IsOwnerOrAdmin(permissions.BasePermission):
         if request.method in SAFE_METHODS and request.user.is_authenticated:
             return True
 
-        if (
-            str(user.role) == "transporter-director"
-            or str(user.role) == "cargo-owner-director"
-        ):
-            company = Company.objects.get(company_director=user)
-            return obj.user.employer == company
-
-        if str(user.role) == "admin":
-            company = user.employer
-            return obj.user.employer == company
+        if has_role(user, RoleFlag.COMPANY_MANAGERS):
+            company = get_tenant(request).company
+            return obj.user.employer_id == company.pk
 
         return obj.user == user or user.is_superuser
 
@@ -319,7 +279,6 @@ class IsCommodityOwner(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         """allow only owners and their employess or admin to delete and uptade their commodity """
         if request.user.is_superuser == False:
-            company = request.user.employer
-            cargo_company = CargoOwnerCompany.objects.get(company=company)
+            cargo_company = get_tenant(request).cargo_owner
             return obj.created_by == cargo_company
         return request.user.is_superuser
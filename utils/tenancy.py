@@ -0,0 +1,61 @@
+from django.core.exceptions import ObjectDoesNotExist
+
+
+class TenantContext:
+    """
+    Holds the company data of the user making a request.
+
+    The user is expected to have been loaded with `User.objects.with_tenant()`
+    so that the role, the employer and its cargo owner/transporter subtype are
+    already cached on the instance. Resolving them here then costs no queries
+    and the result is shared by views, serializers and permission classes.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.company = getattr(user, "employer", None)
+        self.cargo_owner = self._active_subtype("cargoownercompany")
+        self.transporter = self._active_subtype("transportercompany")
+
+    def _active_subtype(self, related_name):
+        """
+        Return the cargo owner or transporter company attached to the employer,
+        or None when the employer has no such (active) subtype.
+        """
+
+        if self.company is None:
+            return None
+
+        try:
+            subtype = getattr(self.company, related_name)
+        except ObjectDoesNotExist:
+            return None
+
+        return None if subtype.is_deleted else subtype
+
+    @property
+    def category(self):
+        return self.company.category if self.company else None
+
+    @property
+    def is_cargo_owner(self):
+        return self.cargo_owner is not None
+
+    @property
+    def is_transporter(self):
+        return self.transporter is not None
+
+
+def get_tenant(request):
+    """
+    Return the tenant context of the request, building it from `request.user`
+    the first time it is needed.
+    """
+
+    tenant = getattr(request, "tenant", None)
+
+    if tenant is None or tenant.user is not request.user:
+        tenant = TenantContext(request.user)
+        request.tenant = tenant
+
+    return tenant
@@ -0,0 +1,48 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Return the process wide thread pool used for background jobs, creating it
+    the first time it is needed.
+    """
+
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.BACKGROUND_WORKERS,
+                    thread_name_prefix="background",
+                )
+    return _executor
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background job %s failed", func.__name__)
+    finally:
+        # each worker thread has its own connection, don't leave it open
+        connection.close()
+
+
+def submit_on_commit(func, *args, **kwargs):
+    """
+    Run `func` on the background thread pool once the current transaction
+    commits, so that the job can see the rows the request created.
+    """
+
+    transaction.on_commit(lambda: get_executor().submit(_run, func, args, kwargs))